@@ -10,20 +10,19 @@ import { Select, Space, Tag } from 'antd';
 import { CalendarOutlined, GlobalOutlined } from '@ant-design/icons';
 import { useLocation } from '@umijs/max';
 import { useYear, YearSelection } from '@/contexts/YearContext';
-import { loadTimeEntries, getAvailableYears, getDataSource } from '@/services/personametryService';
+import { loadAvailableYears, getDataSource } from '@/services/personametryService';
 
 const GlobalYearSelector: React.FC = () => {
   const { selectedYear, setSelectedYear, availableYears, setAvailableYears, isAllTime } = useYear();
   const location = useLocation();
   const isAllTimePage = location.pathname === '/alltime';
 
-  // Load available years on mount
+  // Load available years on mount (from the partition manifest, no entries fetched)
   useEffect(() => {
     const fetchYears = async () => {
       try {
         const source = getDataSource();
-        const data = await loadTimeEntries(source);
-        const years = getAvailableYears(data.entries);
+        const years = await loadAvailableYears(source);
         setAvailableYears(years);
       } catch (error) {
         console.error('Failed to load available years:', error);
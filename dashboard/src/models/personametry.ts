@@ -157,6 +157,161 @@ export interface TimeEntriesData {
   entries: TimeEntry[];
 }
 
+/**
+ * One year file in the partitioned store (written by the ETL)
+ */
+export interface DataPartition {
+  key: string; // Partition year, e.g. "2025"
+  file: string; // File name relative to the manifest
+  columnarFile?: string; // Arrow IPC copy for analysis scripts (not used by the dashboard)
+  compactFile?: string; // Dictionary-encoded copy (CompactEntriesData), loaded instead of `file`
+  recordCount: number;
+  dateRange: {
+    start: string;
+    end: string;
+  };
+  contentHash: string;
+}
+
+/**
+ * Dictionary-encoded partition (timeentries_<year>.compact.json, written by the ETL's
+ * compact_store.py). One array per field; text fields hold indexes into `strings`
+ * (-1 = null). Fields derived from `date` and `notes` are not stored.
+ */
+export interface CompactEntriesData {
+  format: 'personametry-compact';
+  version: number; // Schema version (COMPACT_SCHEMA_VERSION)
+  metadata: { partition?: string };
+  count: number;
+  strings: string[];
+  columns: {
+    date: number[]; // Days since 1970-01-01
+    hours: number[];
+    external_id: (number | string | null)[];
+    [field: string]: (number | string | null)[];
+  };
+}
+
+/**
+ * Manifest of the year-partitioned store (manifest.json)
+ */
+export interface PartitionManifest extends DataMetadata {
+  version: number;
+  partitioning: 'year';
+  partitions: DataPartition[];
+}
+
+export type RollupGrain = 'day' | 'week' | 'month' | 'year';
+export type RollupDimension = 'prioritisedPersona' | 'metaWorkLife' | 'personaTier2';
+
+/**
+ * Period-aligned totals (index i belongs to periods[i])
+ */
+export interface RollupSeries {
+  hours: number[];
+  entries: number[];
+}
+
+/**
+ * Precomputed aggregate cube (data/rollups/rollup_<grain>.json, written by the ETL)
+ */
+export interface RollupCube {
+  version: number;
+  grain: RollupGrain;
+  periods: string[]; // "YYYY-MM-DD" | "YYYY-Www" (ISO) | "YYYY-MM" | "YYYY"
+  weekStart?: string[]; // Monday of each ISO week (week grain only)
+  total: RollupSeries;
+  dimensions: Record<RollupDimension, Record<string, RollupSeries>>;
+  recordCount: number;
+  dateRange: {
+    start: string;
+    end: string;
+  };
+  sourceHash: string;
+}
+
+/**
+ * Clock-time series precomputed by the ETL (data/rollups/intervals.json, written by intervals.py).
+ * Times are minutes after midnight; per-date arrays align with `dates`.
+ */
+export interface IntervalAnalytics {
+  version: number;
+  dates: string[]; // "YYYY-MM-DD", every day with entries
+  personas: Record<string, { firstStart: (number | null)[]; lastEnd: (number | null)[] }>;
+  coverage: { overlapMinutes: number[]; gapMinutes: number[] };
+  work: {
+    persona: string;
+    lateDays: {
+      thresholdMinutes: number;
+      byYear: Record<string, number[]>; // Late day counts, Monday..Sunday
+      byWeek: { periods: string[]; counts: number[] }; // "YYYY-Www" (entry year + weekNum)
+    };
+  };
+  sleep: {
+    persona: string;
+    nightThresholdMinutes: number;
+    nights: { wakeDate: string[]; bedtime: number[]; wakeup: number[]; minutes: number[] };
+    siestas: Record<string, { count: number; weekday: number; weekend: number; minutes: number }>;
+  };
+  recordCount: number;
+  dateRange: {
+    start: string;
+    end: string;
+  };
+  sourceHash: string;
+}
+
+export type StreakDimension = 'prioritisedPersona' | 'personaTier2';
+
+/**
+ * A run of consecutive active days (dates inclusive)
+ */
+export interface ActivityRun {
+  length: number;
+  start: string;
+  end: string;
+}
+
+/**
+ * Run-length encoded days: run i covers length[i] days from start[i]
+ */
+export interface RunList {
+  start: string[];
+  length: number[];
+}
+
+/**
+ * Activity streaks precomputed by the ETL (data/rollups/streaks.json, written by streaks.py)
+ */
+export interface ActivityStreaks {
+  version: number;
+  lastDate: string;
+  dimensions: Record<
+    StreakDimension,
+    Record<
+      string,
+      {
+        runs: RunList; // Run-length encoding of active days
+        histogram: { lengths: number[]; counts: number[] }; // Runs per run length
+        longest: ActivityRun;
+        current: ActivityRun | null; // Alive at lastDate (ended on it or the day before)
+      }
+    >
+  >;
+  // Runs behind the Work page's burnout streaks (single days included)
+  workload: {
+    persona: string;
+    highWorkload: RunList; // P3 days with >= 10h logged
+    lateEnd: RunList; // P3 days ending at or after 21:00
+  };
+  recordCount: number;
+  dateRange: {
+    start: string;
+    end: string;
+  };
+  sourceHash: string;
+}
+
 // ============================================
 // CONSTANTS - Persona configuration
 // ============================================
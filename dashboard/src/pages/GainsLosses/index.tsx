@@ -20,7 +20,7 @@ import {
 import { useYear } from '@/contexts/YearContext';
 import { 
   loadTimeEntries, 
-  getAvailableYears, 
+  loadAvailableYears, 
   calculateYoYComparison,
   getDataSource,
   formatHours,
@@ -37,21 +37,29 @@ const GainsLossesPage: React.FC = () => {
   const { selectedYear, setAvailableYears, isAllTime } = useYear();
 
   useEffect(() => {
-    const fetchData = async () => {
-      try {
-        const source = getDataSource();
-        const data = await loadTimeEntries(source);
+    loadAvailableYears(getDataSource())
+      .then(setAvailableYears)
+      .catch((err) => setError(err instanceof Error ? err.message : 'Failed to load data'));
+  }, [setAvailableYears]);
+
+  // Only the two compared years are loaded (just their partitions on a partitioned source)
+  useEffect(() => {
+    if (isAllTime) {
+      setLoading(false);
+      return;
+    }
+    const year = selectedYear as number;
+    setLoading(true);
+    loadTimeEntries(getDataSource(), [year, year - 1])
+      .then((data) => {
         setEntries(data.entries);
-        const years = getAvailableYears(data.entries);
-        setAvailableYears(years);
         setLoading(false);
-      } catch (err) {
+      })
+      .catch((err) => {
         setError(err instanceof Error ? err.message : 'Failed to load data');
         setLoading(false);
-      }
-    };
-    fetchData();
-  }, [setAvailableYears]);
+      });
+  }, [selectedYear, isAllTime]);
 
   // If All Time mode, show info message
   if (!loading && !error && isAllTime) {
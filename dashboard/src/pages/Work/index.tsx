@@ -3,9 +3,14 @@ import { Col, Row, Card, Statistic, Tag } from 'antd';
 import React, { useEffect, useState } from 'react';
 import {
   calculateWorkPatterns,
+  workPatternsFromRollups,
   loadTimeEntries,
-  getAvailableYears,
+  loadAvailableYears,
   getDataSource,
+  loadRollup,
+  loadIntervals,
+  loadStreaks,
+  workloadStreaksFromRuns,
   WorkPatternAnalysis,
 } from '@/services/personametryService';
 import WorkHeatmap from '@/components/charts/WorkHeatmap';
@@ -17,37 +22,38 @@ import { useYear } from '@/contexts/YearContext';
 
 const WorkPage: React.FC = () => {
   const [loading, setLoading] = useState<boolean>(true);
-  const [fullAnalysis, setFullAnalysis] = useState<WorkPatternAnalysis | null>(null);
-  const [yearAnalysis, setYearAnalysis] = useState<WorkPatternAnalysis | null>(null);
-  const [allEntries, setAllEntries] = useState<any[]>([]);
+  const [analysis, setAnalysis] = useState<WorkPatternAnalysis | null>(null);
 
   // Use global year context
   const { selectedYear, setAvailableYears, isAllTime } = useYear();
 
+  useEffect(() => {
+    loadAvailableYears(getDataSource())
+      .then(setAvailableYears)
+      .catch((error) => console.error('Failed to load available years:', error));
+  }, [setAvailableYears]);
+
   useEffect(() => {
     async function fetchData() {
       try {
         setLoading(true);
         const source = getDataSource();
-        const data = await loadTimeEntries(source);
-        const entries = data.entries;
-        setAllEntries(entries);
-        
-        const availableYears = getAvailableYears(entries);
-        setAvailableYears(availableYears);
-        
-        // 1. Full History for Heatmap (always computed)
-        const history = calculateWorkPatterns(entries); 
-        setFullAnalysis(history);
-        
-        // 2. Initial Year Analysis (if not All Time)
-        if (!isAllTime && typeof selectedYear === 'number') {
-          const yearly = calculateWorkPatterns(entries, selectedYear);
-          setYearAnalysis(yearly);
+        const year = isAllTime ? undefined : (selectedYear as number);
+        const [dayCube, monthCube, intervals, streaks] = await Promise.all([
+          loadRollup('day', source),
+          loadRollup('month', source),
+          loadIntervals(source),
+          loadStreaks(source),
+        ]);
+
+        if (dayCube && monthCube && intervals && streaks) {
+          const workloadStreaks = workloadStreaksFromRuns(streaks, year);
+          setAnalysis(workPatternsFromRollups(dayCube, monthCube, intervals, workloadStreaks, year));
         } else {
-          setYearAnalysis(history);
+          // No precomputed files for this source: derive everything from its entries
+          const data = await loadTimeEntries(source, year ? [year] : undefined);
+          setAnalysis(calculateWorkPatterns(data.entries, year));
         }
-        
       } catch (error) {
         console.error('Failed to fetch data:', error);
       } finally {
@@ -55,29 +61,15 @@ const WorkPage: React.FC = () => {
       }
     }
     fetchData();
-  }, [setAvailableYears]);
-
-  // Recompute year analysis when selectedYear changes
-  useEffect(() => {
-    if (allEntries.length > 0) {
-      if (isAllTime) {
-        // All Time - use full analysis
-        const history = calculateWorkPatterns(allEntries);
-        setYearAnalysis(history);
-      } else if (typeof selectedYear === 'number') {
-        const yearly = calculateWorkPatterns(allEntries, selectedYear);
-        setYearAnalysis(yearly);
-      }
-    }
-  }, [selectedYear, allEntries, isAllTime]);
+  }, [selectedYear, isAllTime]);
 
-  if (!fullAnalysis || !yearAnalysis) return null;
+  if (!analysis) return null;
 
   // Display suffix
   const titleSuffix = isAllTime ? 'All Time' : selectedYear.toString();
 
   // Check if we have data for the selected context
-  const hasData = yearAnalysis.stats.avgDailyHours > 0 || yearAnalysis.stats.totalLateDays > 0;
+  const hasData = analysis.stats.avgDailyHours > 0 || analysis.stats.totalLateDays > 0;
 
   return (
     <PageContainer
@@ -97,7 +89,7 @@ const WorkPage: React.FC = () => {
           <Card>
             <Statistic
               title={`Late Days ${isAllTime ? '(All Time)' : `in ${selectedYear}`} (> 7 PM)`}
-              value={yearAnalysis.stats.totalLateDays}
+              value={analysis.stats.totalLateDays}
               prefix={<ClockCircleOutlined />}
               valueStyle={{ color: hasData ? '#cf1322' : '#999' }}
             />
@@ -107,7 +99,7 @@ const WorkPage: React.FC = () => {
           <Card>
             <Statistic
               title={`Max Streak ${isAllTime ? '(All Time)' : `in ${selectedYear}`} (Days)`}
-              value={yearAnalysis.stats.maxStreakLength}
+              value={analysis.stats.maxStreakLength}
               prefix={<FireOutlined />}
               valueStyle={{ color: hasData ? '#d48806' : '#999' }}
             />
@@ -117,7 +109,7 @@ const WorkPage: React.FC = () => {
           <Card>
             <Statistic
               title="Avg Daily Hours"
-              value={yearAnalysis.stats.avgDailyHours}
+              value={analysis.stats.avgDailyHours}
               precision={1}
               prefix={<ThunderboltOutlined />}
               suffix="h"
@@ -129,7 +121,7 @@ const WorkPage: React.FC = () => {
           <Card>
             <Statistic
               title="Avg Weekly Hours"
-              value={yearAnalysis.stats.avgWeeklyHours}
+              value={analysis.stats.avgWeeklyHours}
               precision={1}
               prefix={<ThunderboltOutlined />}
               suffix="h"
@@ -141,7 +133,7 @@ const WorkPage: React.FC = () => {
           <Card>
             <Statistic
               title="Avg Monthly Hours"
-              value={yearAnalysis.stats.avgMonthlyHours}
+              value={analysis.stats.avgMonthlyHours}
               precision={1}
               prefix={<ThunderboltOutlined />}
               suffix="h"
@@ -171,7 +163,7 @@ const WorkPage: React.FC = () => {
         <Row gutter={[16, 16]} style={{ marginBottom: 24 }}>
           <Col span={24}>
             <WorkHeatmap 
-              data={isAllTime ? fullAnalysis.workIntensityHeatmap : yearAnalysis.workIntensityHeatmap} 
+              data={analysis.workIntensityHeatmap} 
               height={480} 
             />
           </Col>
@@ -182,14 +174,14 @@ const WorkPage: React.FC = () => {
       {hasData && (
         <Row gutter={[16, 16]}>
           <Col xs={24} md={12}>
-            <LateNightChart data={yearAnalysis.lateDayFrequency.byDayOfWeek} height={350} />
+            <LateNightChart data={analysis.lateDayFrequency.byDayOfWeek} height={350} />
           </Col>
           <Col xs={24} md={12}>
-            {yearAnalysis && (
+            {analysis && (
               <StreakHistogram 
                 data={[
-                  ...yearAnalysis.workloadStreaks.highWorkload.map(s => ({ value: s.length, type: 'High Workload (>10h)' })),
-                  ...yearAnalysis.workloadStreaks.lateEnd.map(s => ({ value: s.length, type: 'Late End (>9pm)' }))
+                  ...analysis.workloadStreaks.highWorkload.map(s => ({ value: s.length, type: 'High Workload (>10h)' })),
+                  ...analysis.workloadStreaks.lateEnd.map(s => ({ value: s.length, type: 'Late End (>9pm)' }))
                 ]} 
                 height={350} 
               />
@@ -202,7 +194,7 @@ const WorkPage: React.FC = () => {
       {hasData && (
         <Row gutter={[16, 16]} style={{ marginTop: 24 }}>
           <Col span={24}>
-             <WorkDistributionChart data={yearAnalysis.distribution} />
+             <WorkDistributionChart data={analysis.distribution} />
           </Col>
         </Row>
       )}
@@ -1,5 +1,20 @@
 
-import { loadTimeEntries, clearCache } from './personametryService';
+import {
+  loadTimeEntries,
+  loadAvailableYears,
+  clearCache,
+  loadRollup,
+  rollupByYear,
+  rollupByMonth,
+  rollupByWeek,
+  loadIntervals,
+  lateDaysFromIntervals,
+  workPatternsFromRollups,
+  calculateWorkPatterns,
+  loadStreaks,
+  workloadStreaksFromRuns,
+  decodeCompactEntries,
+} from './personametryService';
 
 // Mock global fetch
 global.fetch = jest.fn();
@@ -17,7 +32,7 @@ describe('personametryService', () => {
       text: async () => JSON.stringify(mockData),
     });
 
-    const result = await loadTimeEntries('harvest');
+    const result = await loadTimeEntries('quicksight');
     expect(result).toEqual(mockData);
   });
 
@@ -43,7 +58,7 @@ describe('personametryService', () => {
       text: async () => malformedJson,
     });
 
-    const result = await loadTimeEntries('harvest');
+    const result = await loadTimeEntries('quicksight');
     expect(result).toEqual(expectedData);
   });
   
@@ -55,6 +70,264 @@ describe('personametryService', () => {
       text: async () => reallyBadJson,
     });
 
-    await expect(loadTimeEntries('harvest')).rejects.toThrow();
+    await expect(loadTimeEntries('quicksight')).rejects.toThrow();
+  });
+
+  it('should not fall back to a single Harvest file', async () => {
+    (global.fetch as jest.Mock).mockResolvedValue({
+      ok: true,
+      text: async () => JSON.stringify({ entries: [], metadata: { generatedAt: '2026-01-01' } }),
+    });
+
+    await expect(loadTimeEntries('harvest')).rejects.toThrow('No partition manifest');
+    expect(global.fetch).toHaveBeenCalledTimes(1); // The manifest only
+  });
+
+  it('should load year partitions listed in the manifest', async () => {
+    const partition = (year: number) => ({
+      entries: [{ date: `${year}-06-01`, year, hours: 1 }],
+      metadata: { partition: `${year}` },
+    });
+    const manifest = {
+      generatedAt: '2026-01-01',
+      recordCount: 2,
+      dateRange: { start: '2025-06-01', end: '2026-06-01' },
+      source: 'harvest_api_sync_v2',
+      version: 1,
+      partitioning: 'year',
+      partitions: [
+        { key: '2026', file: 'timeentries_2026.json', recordCount: 1, dateRange: { start: '2026-06-01', end: '2026-06-01' }, contentHash: 'a' },
+        { key: '2025', file: 'timeentries_2025.json', recordCount: 1, dateRange: { start: '2025-06-01', end: '2025-06-01' }, contentHash: 'b' },
+      ],
+    };
+    const files: Record<string, unknown> = {
+      'data/timeentries_harvest/manifest.json': manifest,
+      'data/timeentries_harvest/timeentries_2026.json': partition(2026),
+      'data/timeentries_harvest/timeentries_2025.json': partition(2025),
+    };
+    (global.fetch as jest.Mock).mockImplementation(async (path: string) => ({
+      ok: path in files,
+      text: async () => JSON.stringify(files[path]),
+    }));
+
+    expect(await loadAvailableYears('harvest')).toEqual([2026, 2025]);
+    expect(global.fetch).toHaveBeenCalledTimes(1); // Manifest only, no partitions
+
+    const recent = await loadTimeEntries('harvest', [2026]);
+    expect(recent.entries.map((e) => e.year)).toEqual([2026]);
+    expect(global.fetch).not.toHaveBeenCalledWith('data/timeentries_harvest/timeentries_2025.json', expect.anything());
+
+    const all = await loadTimeEntries('harvest');
+    expect(all.entries.map((e) => e.year)).toEqual([2026, 2025]);
+    expect(all.metadata.dateRange).toEqual(manifest.dateRange);
+    // 2026 partition is reused from the first call
+    expect(global.fetch).toHaveBeenCalledTimes(5);
+  });
+
+  // Written by compact_store.compact_payload (data/etl) for a 2021-01-03 work entry and a 2025-12-29 sleep entry
+  const compact = {
+    format: 'personametry-compact',
+    version: 1,
+    metadata: { partition: 'x' },
+    count: 2,
+    strings: ['', '[Work] Meetings', '[Individual] Sleep', 'Work', 'Life', 'P3 Professional',
+      'P0 Life Constraints (Sleep)', 'Work Time', 'Sleep', '9:00', '10:30', 'standup', 'working'],
+    columns: {
+      date: [18630, 20451], hours: [1.5, 7.0], external_id: [2300000001, null],
+      task: [1, 2], normalisedTask: [1, 2], metaWorkLife: [3, 4], prioritisedPersona: [5, 6],
+      personaTier2: [7, 8], startedAt: [9, 0], endedAt: [10, 0], notes: [11, 0],
+      socialContext: [-1, -1], socialEntity: [-1, -1], meTimeBreakdown: [-1, -1], commuteContext: [12, -1],
+    },
+  };
+
+  it('should decode compact partitions into full entries', () => {
+    const [work, sleep] = decodeCompactEntries(compact as never);
+    expect(work).toEqual({
+      date: '2021-01-03', year: 2021, month: 1, day: 3, dayOfWeek: '_07 Sunday', monthName: 'Jan',
+      monthNum: 1, weekNum: 53, typeOfDay: 'Weekend', task: '[Work] Meetings', normalisedTask: '[Work] Meetings',
+      metaWorkLife: 'Work', prioritisedPersona: 'P3 Professional', personaTier2: 'Work Time', hours: 1.5,
+      startedAt: '9:00', endedAt: '10:30', notes: 'standup', notesClean: 'standup', socialContext: null,
+      socialEntity: null, meTimeBreakdown: null, commuteContext: 'working', external_id: '2300000001',
+    });
+    expect(sleep).toMatchObject({ date: '2025-12-29', dayOfWeek: '_01 Monday', weekNum: 1, typeOfDay: 'Weekday', notes: '', notesClean: null, commuteContext: null });
+    expect(sleep).not.toHaveProperty('external_id');
+    expect(() => decodeCompactEntries({ ...compact, version: 2 } as never)).toThrow('Unsupported');
+  });
+
+  it('should prefer the compact file and fall back to JSON for unknown versions', async () => {
+    const manifest = {
+      generatedAt: '2026-01-01',
+      recordCount: 3,
+      dateRange: { start: '2021-01-03', end: '2026-06-01' },
+      source: 'harvest_api_sync_v2',
+      version: 1,
+      partitioning: 'year',
+      partitions: [
+        { key: '2026', file: 'timeentries_2026.json', compactFile: 'timeentries_2026.compact.json', recordCount: 1, dateRange: { start: '2026-06-01', end: '2026-06-01' }, contentHash: 'a' },
+        { key: '2025', file: 'timeentries_2025.json', compactFile: 'timeentries_2025.compact.json', recordCount: 2, dateRange: { start: '2021-01-03', end: '2025-12-29' }, contentHash: 'b' },
+      ],
+    };
+    const files: Record<string, unknown> = {
+      'data/timeentries_harvest/manifest.json': manifest,
+      'data/timeentries_harvest/timeentries_2026.compact.json': { ...compact, version: 99 },
+      'data/timeentries_harvest/timeentries_2026.json': { entries: [{ date: '2026-06-01', year: 2026, hours: 1 }], metadata: {} },
+      'data/timeentries_harvest/timeentries_2025.compact.json': compact,
+    };
+    (global.fetch as jest.Mock).mockImplementation(async (path: string) => ({
+      ok: path in files,
+      text: async () => JSON.stringify(files[path]),
+    }));
+
+    const data = await loadTimeEntries('harvest');
+    expect(data.entries.map((e) => e.date)).toEqual(['2026-06-01', '2021-01-03', '2025-12-29']);
+    expect(global.fetch).not.toHaveBeenCalledWith('data/timeentries_harvest/timeentries_2025.json', expect.anything());
+  });
+
+  it('should turn rollup cubes into the groupBy shapes', async () => {
+    const series = (hours: number[], entries: number[]) => ({ hours, entries });
+    const month = {
+      version: 1,
+      grain: 'month',
+      periods: ['2025-12', '2026-01'],
+      total: series([10, 4.5], [3, 2]),
+      dimensions: {
+        prioritisedPersona: { 'P3 Professional': series([8, 0], [2, 0]) },
+        metaWorkLife: {},
+        personaTier2: {},
+      },
+      recordCount: 5,
+      dateRange: { start: '2025-12-01', end: '2026-01-31' },
+      sourceHash: 'sha256:x',
+    };
+    (global.fetch as jest.Mock).mockImplementation(async (path: string) => ({
+      ok: path === 'data/rollups/rollup_month.json',
+      statusText: 'Not Found',
+      text: async () => JSON.stringify(month),
+    }));
+
+    const cube = await loadRollup('month', 'harvest');
+    expect(rollupByMonth(cube!)).toEqual([
+      { year: 2025, month: 12, monthName: 'Dec', hours: 10 },
+      { year: 2026, month: 1, monthName: 'Jan', hours: 4.5 },
+    ]);
+    expect(rollupByMonth(cube!, 'prioritisedPersona', 'P3 Professional')).toEqual([
+      { year: 2025, month: 12, monthName: 'Dec', hours: 8 },
+    ]);
+    expect(await loadRollup('year', 'harvest')).toBeNull();
+    expect(await loadRollup('month', 'quicksight')).toBeNull();
+
+    const year = { ...month, grain: 'year', periods: ['2025', '2026'] } as typeof month;
+    expect(Array.from(rollupByYear(year as never).entries())).toEqual([[2025, 10], [2026, 4.5]]);
+    const week = { ...month, grain: 'week', periods: ['2025-W52', '2026-W01'], weekStart: ['2025-12-22', '2025-12-29'] };
+    expect(rollupByWeek(week as never)[1]).toEqual({ year: 2026, week: 1, hours: 4.5, startDate: '2025-12-29' });
+  });
+
+  it('should read late days from the interval series', async () => {
+    const intervals = {
+      version: 1,
+      dates: ['2025-12-29', '2026-01-05'],
+      personas: {},
+      coverage: { overlapMinutes: [0, 0], gapMinutes: [0, 0] },
+      work: {
+        persona: 'P3 Professional',
+        lateDays: {
+          thresholdMinutes: 1140,
+          byYear: { '2025': [1, 0, 0, 0, 0, 0, 0], '2026': [1, 1, 0, 0, 0, 0, 0] },
+          byWeek: { periods: ['2025-W01', '2026-W02'], counts: [1, 2] },
+        },
+      },
+    };
+    (global.fetch as jest.Mock).mockImplementation(async (path: string) => ({
+      ok: path === 'data/rollups/intervals.json',
+      statusText: 'Not Found',
+      text: async () => JSON.stringify(intervals),
+    }));
+
+    const loaded = await loadIntervals('harvest');
+    expect(lateDaysFromIntervals(loaded!).byDayOfWeek.slice(0, 3)).toEqual([
+      { day: 'Monday', count: 2 },
+      { day: 'Tuesday', count: 1 },
+      { day: 'Wednesday', count: 0 },
+    ]);
+    expect(lateDaysFromIntervals(loaded!, 2026).byWeek).toEqual([{ week: 2, count: 2 }]);
+    expect(await loadIntervals('quicksight')).toBeNull();
+  });
+
+  it('should derive the work patterns from the rollups like from the entries', () => {
+    const p3 = (date: string, year: number, monthNum: number, weekNum: number, dayOfWeek: string, hours: number, endedAt: string) =>
+      ({ date, year, monthNum, weekNum, dayOfWeek, hours, endedAt, prioritisedPersona: 'P3 Professional' }) as never;
+    const entries = [
+      p3('2025-12-29', 2025, 12, 1, '_01 Monday', 11, '21:30'),
+      p3('2025-12-30', 2025, 12, 1, '_02 Tuesday', 10.5, '22:00'),
+      p3('2026-01-05', 2026, 1, 2, '_01 Monday', 4, '17:00'),
+    ];
+    const series = (hours: number[], entries: number[]) => ({ hours, entries });
+    const cube = (grain: string, periods: string[], hours: number[]) => ({
+      version: 1,
+      grain,
+      periods,
+      total: series(hours, hours.map(() => 1)),
+      dimensions: {
+        prioritisedPersona: { 'P3 Professional': series(hours, hours.map(() => 1)) },
+        metaWorkLife: {},
+        personaTier2: {},
+      },
+      recordCount: 3,
+      dateRange: { start: '2025-12-29', end: '2026-01-05' },
+      sourceHash: 'sha256:x',
+    }) as never;
+    const day = cube('day', ['2025-12-29', '2025-12-30', '2026-01-05'], [11, 10.5, 4]);
+    const month = cube('month', ['2025-12', '2026-01'], [21.5, 4]);
+    const intervals = {
+      work: {
+        persona: 'P3 Professional',
+        lateDays: {
+          thresholdMinutes: 1140,
+          byYear: { '2025': [1, 1, 0, 0, 0, 0, 0] },
+          byWeek: { periods: ['2025-W01'], counts: [2] },
+        },
+      },
+    } as never;
+
+    for (const year of [undefined, 2025, 2026]) {
+      const expected = calculateWorkPatterns(entries, year);
+      expect(workPatternsFromRollups(day, month, intervals, expected.workloadStreaks, year)).toEqual(expected);
+    }
+  });
+
+  it('should turn the precomputed workload runs into work streaks', async () => {
+    const p3 = (date: string, hours: number, endedAt: string) =>
+      ({ date, year: Number(date.slice(0, 4)), hours, endedAt, prioritisedPersona: 'P3 Professional' }) as never;
+    const entries = [
+      p3('2025-12-30', 11, '21:30'),
+      p3('2025-12-31', 10, '22:00'),
+      p3('2026-01-01', 12, '21:00'),
+      p3('2026-01-02', 3, '17:00'),
+      p3('2026-01-05', 10, '18:00'),
+    ];
+    const streaks = {
+      version: 2,
+      lastDate: '2026-01-05',
+      dimensions: { prioritisedPersona: {}, personaTier2: {} },
+      workload: {
+        persona: 'P3 Professional',
+        highWorkload: { start: ['2025-12-30', '2026-01-05'], length: [3, 1] },
+        lateEnd: { start: ['2025-12-30'], length: [3] },
+      },
+    };
+    (global.fetch as jest.Mock).mockImplementation(async (path: string) => ({
+      ok: path === 'data/rollups/streaks.json',
+      statusText: 'Not Found',
+      text: async () => JSON.stringify(streaks),
+    }));
+
+    const loaded = await loadStreaks('harvest');
+    for (const year of [undefined, 2025, 2026]) {
+      expect(workloadStreaksFromRuns(loaded!, year)).toEqual(calculateWorkPatterns(entries, year).workloadStreaks);
+    }
+    expect(workloadStreaksFromRuns(loaded!, 2025).highWorkload).toEqual([
+      { length: 2, startDate: '2025-12-30', endDate: '2025-12-31', type: 'HighWorkload' },
+    ]);
+    expect(await loadStreaks('quicksight')).toBeNull();
   });
 });
@@ -7,11 +7,20 @@
 import type {
   TimeEntry,
   TimeEntriesData,
+  CompactEntriesData,
+  DataPartition,
+  PartitionManifest,
   PersonaSummary,
   YearlyComparison,
   MonthlyTrend,
   WeeklyTrend,
   PeriodSummary,
+  RollupCube,
+  RollupGrain,
+  RollupDimension,
+  IntervalAnalytics,
+  ActivityStreaks,
+  RunList,
 } from '@/models/personametry';
 import { MetaWorkLife, PERSONA_COLORS, PERSONA_SHORT_NAMES } from '@/models/personametry';
 import dayjs from 'dayjs';
@@ -28,9 +37,20 @@ dayjs.extend(isoWeek);
 
 export type DataSource = 'quicksight' | 'harvest';
 
-const DATA_SOURCE_PATHS: Record<DataSource, string> = {
+// Sources exported as one file
+const DATA_SOURCE_PATHS: Partial<Record<DataSource, string>> = {
   quicksight: 'data/timeentries.json',
-  harvest: 'data/timeentries_harvest.json',
+};
+
+// Year-partitioned store (one file per year + manifest). Harvest data only
+// exists in this form: the single-file export was retired.
+const PARTITION_MANIFEST_PATHS: Partial<Record<DataSource, string>> = {
+  harvest: 'data/timeentries_harvest/manifest.json',
+};
+
+// Aggregate cubes precomputed by the ETL (kilobytes instead of the full entry history)
+const ROLLUP_DIRS: Partial<Record<DataSource, string>> = {
+  harvest: 'data/rollups/',
 };
 
 let cachedData: Record<DataSource, TimeEntriesData | null> = {
@@ -38,6 +58,12 @@ let cachedData: Record<DataSource, TimeEntriesData | null> = {
   harvest: null,
 };
 
+// Per-file cache so year-scoped loads share partitions with full loads
+let cachedPartitions = new Map<string, Promise<TimeEntry[]>>();
+
+// Rollup-directory files (cubes, intervals, streaks) by path
+let cachedRollups = new Map<string, Promise<unknown>>();
+
 let currentDataSource: DataSource = 'harvest'; // Default to Harvest (bypasses QuickSight)
 
 /**
@@ -55,36 +81,226 @@ export function getDataSource(): DataSource {
 }
 
 /**
- * Load time entries from specified data source
+ * Fetch and parse a JSON data file.
+ * Robust loading: Handle cases where JSON might contain NaN (invalid JSON).
  */
-export async function loadTimeEntries(source?: DataSource): Promise<TimeEntriesData> {
+async function fetchJson<T>(path: string, label: string): Promise<T> {
+  const response = await fetch(path, { cache: 'no-store' });
+  if (!response.ok) {
+    throw new Error(`Failed to load time entries from ${label}: ${response.statusText}`);
+  }
+
+  // Attempt standard JSON parse first for performance
+  const text = await response.text();
+  try {
+    return JSON.parse(text);
+  } catch (e) {
+    // Fallback: Fix NaNs if present (e.g. from Python/Pandas dumps)
+    console.warn(`Initial JSON parse failed for ${label}, attempting recovery...`, e);
+    // Regex detects ": NaN" or ":NaN" and replaces with ": null"
+    const sanitized = text.replace(/:\s*NaN/g, ': null');
+    return JSON.parse(sanitized);
+  }
+}
+
+/**
+ * Load the partition manifest for a source, or null if it has none
+ */
+export async function loadPartitionManifest(source?: DataSource): Promise<PartitionManifest | null> {
   const dataSource = source ?? currentDataSource;
-  
-  if (cachedData[dataSource]) {
-    return cachedData[dataSource]!;
+  const path = PARTITION_MANIFEST_PATHS[dataSource];
+  if (!path) return null;
+
+  try {
+    const manifest = await fetchJson<PartitionManifest>(path, dataSource);
+    return Array.isArray(manifest?.partitions) ? manifest : null;
+  } catch {
+    return null;
+  }
+}
+
+// ============================================
+// COMPACT PARTITIONS - Dictionary-encoded payload
+// ============================================
+
+export const COMPACT_FORMAT = 'personametry-compact';
+export const COMPACT_SCHEMA_VERSION = 1;
+
+// Text fields stored as string-table codes (compact_store.STRING_COLUMNS)
+const COMPACT_STRING_COLUMNS = [
+  'task',
+  'normalisedTask',
+  'metaWorkLife',
+  'prioritisedPersona',
+  'personaTier2',
+  'startedAt',
+  'endedAt',
+  'notes',
+  'socialContext',
+  'socialEntity',
+  'meTimeBreakdown',
+  'commuteContext',
+] as const;
+
+const DAY_NAMES = ['_01 Monday', '_02 Tuesday', '_03 Wednesday', '_04 Thursday', '_05 Friday', '_06 Saturday', '_07 Sunday'];
+const MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
+const MS_PER_DAY = 86_400_000;
+
+/**
+ * The date fields the ETL derives for a day number (days since 1970-01-01, UTC)
+ */
+function compactDateFields(days: number) {
+  const date = new Date(days * MS_PER_DAY);
+  const weekday = (date.getUTCDay() + 6) % 7; // Monday = 0
+  // ISO week: counted in the year that holds this week's Thursday
+  const thursday = new Date((days - weekday + 3) * MS_PER_DAY);
+  const weekNum = Math.floor((thursday.getTime() - Date.UTC(thursday.getUTCFullYear(), 0, 1)) / MS_PER_DAY / 7) + 1;
+  const month = date.getUTCMonth() + 1;
+  return {
+    date: date.toISOString().slice(0, 10),
+    year: date.getUTCFullYear(),
+    month,
+    day: date.getUTCDate(),
+    dayOfWeek: DAY_NAMES[weekday],
+    monthName: MONTH_NAMES[month - 1],
+    monthNum: month,
+    weekNum,
+    typeOfDay: (weekday >= 5 ? 'Weekend' : 'Weekday') as TimeEntry['typeOfDay'],
+  };
+}
+
+export function isSupportedCompact(payload: CompactEntriesData): boolean {
+  return payload?.format === COMPACT_FORMAT && payload.version === COMPACT_SCHEMA_VERSION;
+}
+
+/**
+ * Decode a compact partition into the same entries as its JSON file
+ */
+export function decodeCompactEntries(payload: CompactEntriesData): TimeEntry[] {
+  if (!isSupportedCompact(payload)) {
+    throw new Error(`Unsupported compact format: ${payload?.format} v${payload?.version}`);
+  }
+  const { strings, columns, count } = payload;
+  const textColumns = COMPACT_STRING_COLUMNS.map((field) => [field, columns[field] as number[]] as const);
+  const dayFields = new Map<number, ReturnType<typeof compactDateFields>>();
+  const entries = new Array<TimeEntry>(count);
+
+  for (let i = 0; i < count; i++) {
+    const day = columns.date[i];
+    let fields = dayFields.get(day);
+    if (!fields) {
+      fields = compactDateFields(day);
+      dayFields.set(day, fields);
+    }
+    const entry: Record<string, unknown> = { ...fields, hours: columns.hours[i] };
+    for (const [field, codes] of textColumns) {
+      const code = codes[i];
+      entry[field] = code < 0 ? null : strings[code];
+    }
+    entry.notesClean = entry.notes === null || entry.notes === '' ? null : entry.notes;
+    const externalId = columns.external_id[i];
+    if (externalId !== null) {
+      entry.external_id = String(externalId);
+    }
+    entries[i] = entry as unknown as TimeEntry;
+  }
+  return entries;
+}
+
+/**
+ * Entries of one partition: the compact file when listed (and of a known
+ * schema version), the full JSON file otherwise
+ */
+function fetchPartitionEntries(baseDir: string, partition: DataPartition, dataSource: DataSource): Promise<TimeEntry[]> {
+  const full = () =>
+    fetchJson<TimeEntriesData>(baseDir + partition.file, dataSource).then((data) => data.entries);
+  if (!partition.compactFile) {
+    return full();
   }
+  return fetchJson<CompactEntriesData>(baseDir + partition.compactFile, dataSource)
+    .then((payload) => (isSupportedCompact(payload) ? decodeCompactEntries(payload) : null))
+    .catch((err) => {
+      console.warn(`Compact partition ${partition.compactFile} unavailable, loading ${partition.file}`, err);
+      return null;
+    })
+    .then((entries) => entries ?? full());
+}
+
+/**
+ * Load entries from the partitions covering `years` (all partitions if omitted)
+ */
+async function loadPartitionedEntries(
+  manifest: PartitionManifest,
+  manifestPath: string,
+  dataSource: DataSource,
+  years?: number[],
+): Promise<TimeEntriesData> {
+  const baseDir = manifestPath.slice(0, manifestPath.lastIndexOf('/') + 1);
+  const wanted = years ? new Set(years.map(String)) : null;
+  const partitions = manifest.partitions.filter((p) => !wanted || wanted.has(p.key));
+
+  const chunks = await Promise.all(
+    partitions.map((partition) => {
+      // Content hash in the cache key: a re-synced partition is fetched fresh
+      const cacheKey = `${baseDir}${partition.file}#${partition.contentHash}`;
+      if (!cachedPartitions.has(cacheKey)) {
+        const request = fetchPartitionEntries(baseDir, partition, dataSource);
+        request.catch(() => cachedPartitions.delete(cacheKey));
+        cachedPartitions.set(cacheKey, request);
+      }
+      return cachedPartitions.get(cacheKey)!;
+    }),
+  );
+
+  // Partitions are listed newest first, each sorted by date descending
+  const entries = ([] as TimeEntry[]).concat(...chunks);
+  const starts = partitions.map((p) => p.dateRange.start).filter(Boolean).sort();
+  const ends = partitions.map((p) => p.dateRange.end).filter(Boolean).sort();
+
+  return {
+    metadata: {
+      generatedAt: manifest.generatedAt,
+      recordCount: entries.length,
+      dateRange: wanted
+        ? { start: starts[0], end: ends[ends.length - 1] }
+        : manifest.dateRange,
+      source: manifest.source,
+    },
+    entries,
+  };
+}
+
+/**
+ * Load time entries from specified data source.
+ * Pass `years` to fetch only those year partitions (when the source is partitioned).
+ */
+export async function loadTimeEntries(
+  source?: DataSource,
+  years?: number[],
+): Promise<TimeEntriesData> {
+  const dataSource = source ?? currentDataSource;
   
-  /* 
-   * Robust loading: Handle cases where JSON might contain NaN (invalid JSON).
-   */
-  const path = DATA_SOURCE_PATHS[dataSource];
-  const response = await fetch(path, { cache: 'no-store' });
-  if (!response.ok) {
-    throw new Error(`Failed to load time entries from ${dataSource}: ${response.statusText}`);
+  if (cachedData[dataSource]) {
+    return selectYears(cachedData[dataSource]!, years);
   }
   
   try {
-    // Attempt standard JSON parse first for performance
-    const text = await response.text();
-    try {
-      cachedData[dataSource] = JSON.parse(text);
-    } catch (e) {
-      // Fallback: Fix NaNs if present (e.g. from Python/Pandas dumps)
-      console.warn(`Initial JSON parse failed for ${dataSource}, attempting recovery...`, e);
-      // Regex detects ": NaN" or ":NaN" and replaces with ": null"
-      const sanitized = text.replace(/:\s*NaN/g, ': null'); 
-      cachedData[dataSource] = JSON.parse(sanitized);
+    const manifest = await loadPartitionManifest(dataSource);
+    let data: TimeEntriesData;
+    const singleFile = DATA_SOURCE_PATHS[dataSource];
+    if (manifest) {
+      const manifestPath = PARTITION_MANIFEST_PATHS[dataSource]!;
+      data = await loadPartitionedEntries(manifest, manifestPath, dataSource, years);
+    } else if (singleFile) {
+      data = await fetchJson<TimeEntriesData>(singleFile, dataSource);
+    } else {
+      throw new Error(`No partition manifest found for ${dataSource}`);
     }
+
+    if (manifest && years) {
+      return data; // Partial load: served from the partition cache, not the full-data cache
+    }
+    cachedData[dataSource] = data;
   } catch (err) {
     console.error(`Critical error traversing JSON for ${dataSource}`, err);
     notification.error({
@@ -95,7 +311,34 @@ export async function loadTimeEntries(source?: DataSource): Promise<TimeEntriesD
     throw err;
   }
   
-  return cachedData[dataSource]!;
+  return selectYears(cachedData[dataSource]!, years);
+}
+
+/**
+ * Years with entries, newest first. Read from the partition manifest when the
+ * source is partitioned, so no entries are fetched.
+ */
+export async function loadAvailableYears(source?: DataSource): Promise<number[]> {
+  const dataSource = source ?? currentDataSource;
+  if (!cachedData[dataSource]) {
+    const manifest = await loadPartitionManifest(dataSource);
+    if (manifest) {
+      return manifest.partitions
+        .filter((p) => p.recordCount > 0)
+        .map((p) => Number(p.key))
+        .sort((a, b) => b - a);
+    }
+  }
+  return getAvailableYears((await loadTimeEntries(dataSource)).entries);
+}
+
+/**
+ * Restrict already-loaded data to `years` (no-op when years is omitted)
+ */
+function selectYears(data: TimeEntriesData, years?: number[]): TimeEntriesData {
+  if (!years) return data;
+  const wanted = new Set(years);
+  return { ...data, entries: data.entries.filter((e) => wanted.has(e.year)) };
 }
 
 /**
@@ -112,6 +355,205 @@ export function getLastRefreshedTime(): string | null {
  */
 export function clearCache(): void {
   cachedData = { quicksight: null, harvest: null };
+  cachedPartitions = new Map();
+  cachedRollups = new Map();
+}
+
+/**
+ * Load a precomputed rollup cube, or null if the source has none (callers then
+ * aggregate raw entries instead)
+ */
+export async function loadRollup(grain: RollupGrain, source?: DataSource): Promise<RollupCube | null> {
+  return loadRollupFile<RollupCube>(`rollup_${grain}.json`, source);
+}
+
+/**
+ * A file from the source's rollup directory, or null if it has none / the fetch fails
+ */
+function loadRollupFile<T>(file: string, source?: DataSource): Promise<T | null> {
+  const dataSource = source ?? currentDataSource;
+  const dir = ROLLUP_DIRS[dataSource];
+  if (!dir) return Promise.resolve(null);
+
+  const path = `${dir}${file}`;
+  if (!cachedRollups.has(path)) {
+    cachedRollups.set(
+      path,
+      fetchJson<T>(path, dataSource).catch(() => {
+        cachedRollups.delete(path);
+        return null;
+      }),
+    );
+  }
+  return cachedRollups.get(path)! as Promise<T | null>;
+}
+
+/**
+ * Series for the whole cube, or for one value of a dimension (zeros if the value never occurs)
+ */
+function rollupSeries(cube: RollupCube, dimension?: RollupDimension, value?: string) {
+  if (!dimension || value === undefined) return cube.total;
+  return (
+    cube.dimensions[dimension]?.[value] ?? {
+      hours: cube.periods.map(() => 0),
+      entries: cube.periods.map(() => 0),
+    }
+  );
+}
+
+/**
+ * groupByYear() from a year cube
+ */
+export function rollupByYear(cube: RollupCube, dimension?: RollupDimension, value?: string): Map<number, number> {
+  const series = rollupSeries(cube, dimension, value);
+  const yearlyHours = new Map<number, number>();
+  cube.periods.forEach((period, i) => {
+    if (series.entries[i] > 0) yearlyHours.set(Number(period), series.hours[i]);
+  });
+  return yearlyHours;
+}
+
+/**
+ * groupByMonth() from a month cube
+ */
+export function rollupByMonth(cube: RollupCube, dimension?: RollupDimension, value?: string): MonthlyTrend[] {
+  const series = rollupSeries(cube, dimension, value);
+  const trends: MonthlyTrend[] = [];
+  cube.periods.forEach((period, i) => {
+    if (series.entries[i] === 0) return;
+    const [year, month] = period.split('-').map(Number);
+    trends.push({
+      year,
+      month,
+      monthName: dayjs(`${period}-01`).format('MMM'),
+      hours: series.hours[i],
+    });
+  });
+  return trends;
+}
+
+/**
+ * groupByWeek() from a week cube
+ */
+export function rollupByWeek(cube: RollupCube, dimension?: RollupDimension, value?: string): WeeklyTrend[] {
+  const series = rollupSeries(cube, dimension, value);
+  const trends: WeeklyTrend[] = [];
+  cube.periods.forEach((period, i) => {
+    if (series.entries[i] === 0) return;
+    const [year, week] = period.split('-W').map(Number);
+    trends.push({ year, week, hours: series.hours[i], startDate: cube.weekStart?.[i] ?? '' });
+  });
+  return trends;
+}
+
+/**
+ * Load the precomputed clock-time series (late days, sleep spans), or null if the
+ * source has none (callers then parse startedAt/endedAt from raw entries instead)
+ */
+export async function loadIntervals(source?: DataSource): Promise<IntervalAnalytics | null> {
+  return loadRollupFile<IntervalAnalytics>('intervals.json', source);
+}
+
+/**
+ * Load the precomputed activity streaks per persona / personaTier2, or null if the source has none
+ */
+export async function loadStreaks(source?: DataSource): Promise<ActivityStreaks | null> {
+  return loadRollupFile<ActivityStreaks>('streaks.json', source);
+}
+
+/**
+ * calculateWorkPatterns().workloadStreaks from the precomputed workload runs (all years,
+ * or one: runs are clipped to the year, like streaks over that year's entries)
+ */
+export function workloadStreaksFromRuns(
+  streaks: ActivityStreaks,
+  year?: number,
+): WorkPatternAnalysis['workloadStreaks'] {
+  const toStreaks = (runs: RunList, type: Streak['type']): Streak[] =>
+    runs.start.flatMap((start, i) => {
+      let first = dayjs(start);
+      let last = first.add(runs.length[i] - 1, 'day');
+      if (year) {
+        if (first.year() > year || last.year() < year) return [];
+        if (first.year() < year) first = dayjs(`${year}-01-01`);
+        if (last.year() > year) last = dayjs(`${year}-12-31`);
+      }
+      const length = last.diff(first, 'day') + 1;
+      return length >= 2
+        ? [{ length, startDate: first.format('YYYY-MM-DD'), endDate: last.format('YYYY-MM-DD'), type }]
+        : [];
+    });
+  return {
+    highWorkload: toStreaks(streaks.workload.highWorkload, 'HighWorkload'),
+    lateEnd: toStreaks(streaks.workload.lateEnd, 'LateEnd'),
+    challenging: [],
+  };
+}
+
+/**
+ * calculateWorkPatterns().lateDayFrequency from the interval series (all years, or one)
+ */
+export function lateDaysFromIntervals(
+  intervals: IntervalAnalytics,
+  year?: number,
+): WorkPatternAnalysis['lateDayFrequency'] {
+  const { byYear, byWeek } = intervals.work.lateDays;
+  const years = year ? [String(year)] : Object.keys(byYear);
+  const DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'];
+  return {
+    byDayOfWeek: DAYS.map((day, i) => ({
+      day,
+      count: years.reduce((sum, y) => sum + (byYear[y]?.[i] ?? 0), 0),
+    })),
+    byWeek: byWeek.periods
+      .map((period, i) => ({ period, count: byWeek.counts[i] }))
+      .filter(({ period }) => !year || period.startsWith(`${year}-W`))
+      .map(({ period, count }) => ({ week: Number(period.split('-W')[1]), count })),
+  };
+}
+
+/**
+ * calculateWorkPatterns() from the day / month cubes and the interval series (all years,
+ * or one). Only the workload streaks need raw entries, so the caller passes them in.
+ */
+export function workPatternsFromRollups(
+  dayCube: RollupCube,
+  monthCube: RollupCube,
+  intervals: IntervalAnalytics,
+  workloadStreaks: WorkPatternAnalysis['workloadStreaks'],
+  year?: number,
+): WorkPatternAnalysis {
+  const inYear = (y: number) => !year || y === year;
+  const days = rollupSeries(dayCube, 'prioritisedPersona', 'P3 Professional');
+  const dailyData = dayCube.periods
+    .map((date, i) => ({ date, hours: days.hours[i], entries: days.entries[i] }))
+    .filter((d) => d.entries > 0 && inYear(Number(d.date.slice(0, 4))));
+  const workIntensityHeatmap = rollupByMonth(monthCube, 'prioritisedPersona', 'P3 Professional')
+    .filter((m) => inYear(m.year))
+    .map(({ year: y, month, hours }) => ({ year: y, month, hours }));
+  const lateDayFrequency = lateDaysFromIntervals(intervals, year);
+
+  // Active weeks keyed like the entries' (year, weekNum): calendar year + ISO week
+  const activeWeeks = new Set(dailyData.map((d) => `${d.date.slice(0, 4)}-${dayjs(d.date).isoWeek()}`)).size;
+  const totalHours = dailyData.reduce((sum, d) => sum + d.hours, 0);
+
+  return {
+    workIntensityHeatmap,
+    lateDayFrequency,
+    workloadStreaks,
+    stats: {
+      totalLateDays: lateDayFrequency.byDayOfWeek.reduce((sum, d) => sum + d.count, 0),
+      maxStreakLength: Math.max(
+        ...workloadStreaks.highWorkload.map((s) => s.length),
+        ...workloadStreaks.lateEnd.map((s) => s.length),
+        0,
+      ),
+      avgDailyHours: dailyData.length > 0 ? totalHours / dailyData.length : 0,
+      avgWeeklyHours: activeWeeks > 0 ? totalHours / activeWeeks : 0,
+      avgMonthlyHours: workIntensityHeatmap.length > 0 ? totalHours / workIntensityHeatmap.length : 0,
+    },
+    distribution: calculateDistribution(dailyData),
+  };
 }
 
 /**
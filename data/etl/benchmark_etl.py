@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Benchmark Suite
+---------------------------------
+Times the ETL stages on synthetic Harvest data (synthetic_harvest.py) at
+multiples of a base row count, and compares against a stored baseline.
+
+Stages:
+    xlsx_transform  apply_transformations() on an XLSX-shaped frame
+    transform       transform_api_data() on API entries
+    db_rebuild      EntryDB.rebuild() of the whole history (a missing or stale database)
+    db_merge        a week of edits + new rows upserted through DatabaseMerge (what the sync runs)
+    save            save_data() into a temporary partition store
+
+Each (stage, scale) runs in a fresh interpreter, so peak RSS is that stage's
+high-water mark (its synthetic inputs included) rather than the whole suite's.
+Reported per stage: wall time (best of --repeat), rows/s and peak RSS. Results that are more than REGRESSION_TOLERANCE slower (or
+bigger) than the baseline are flagged.
+
+Usage:
+    python benchmark_etl.py                         # 1x, 10x, 100x of BASE_ROWS
+    python benchmark_etl.py --scales 1 10 --stages transform db_merge
+    python benchmark_etl.py --update-baseline       # record benchmarks/baseline.json
+    python benchmark_etl.py --check                 # exit 1 on regressions (CI)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from unittest.mock import patch
+
+from entry_db import EntryDB
+from instrumentation import peak_rss_mb
+from json_writer import write_json_atomic
+
+BASELINE_FILE = Path(__file__).parent / "benchmarks" / "baseline.json"
+BASE_ROWS = 3500  # ~1 year of tracking
+SCALES = (1, 10, 100)
+STAGES = ("xlsx_transform", "transform", "db_rebuild", "db_merge", "save")
+REPEAT = 5
+REGRESSION_TOLERANCE = 0.25
+EDIT_DAYS = 7  # db_merge batch: every entry of the last week re-sent, plus a week of new days
+
+
+def prepare(stage, rows, workdir):
+    """
+    Build the input for `stage` and return (run, row_count). Only run() is
+    timed, and it leaves its inputs untouched so it can be repeated.
+    """
+    import harvest_api_sync as api
+    from harvest_to_json import apply_transformations
+    from synthetic_harvest import ENTRIES_PER_DAY, generate_entries, xlsx_frame
+
+    entries = generate_entries(rows)
+    if stage == "xlsx_transform":
+        df = xlsx_frame(entries)
+        return lambda: apply_transformations(df.copy()), rows
+    if stage == "transform":
+        return lambda: api.transform_api_data(entries, verbose=False), rows
+
+    records = api.transform_api_data(entries, verbose=False).to_dict('records')
+    if stage == "db_rebuild":
+        db = EntryDB(Path(workdir) / "entries.sqlite")
+        return lambda: db.rebuild(records, api.build_composite_key, "benchmark"), rows
+    if stage == "db_merge":
+        week = EDIT_DAYS * ENTRIES_PER_DAY
+        edits = [dict(e, notes=f"edited {e['id']}") for e in entries[:week]]
+        new = generate_entries(week, seed=1, start_id=2 * 10**9)
+        batch = api.transform_api_data(new + edits, verbose=False)
+        db = EntryDB(Path(workdir) / "entries.sqlite")
+        db.rebuild(records, api.build_composite_key, "benchmark")
+
+        def run():
+            merge = api.DatabaseMerge(db)
+            merge.add(batch)
+            merge.finish()
+            merge.rollback()  # Leaves the history as prepared for the next repeat
+        return run, rows
+    if stage == "save":
+        def run():
+            with patch.object(api, "STORE_DIR", Path(workdir) / "store"), \
+                    patch.object(api, "DASHBOARD_DATA_DIR", Path(workdir) / "dashboard"):
+                api.save_data(records)
+        return run, rows
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def run_stage(stage, rows, repeat=REPEAT):
+    """Time `stage` on `rows` synthetic entries (best of `repeat`). Returns a result dict."""
+    times = []
+    with tempfile.TemporaryDirectory() as workdir:
+        run, count = prepare(stage, rows, workdir)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                run()
+            times.append(time.perf_counter() - start)
+    wall = min(times)
+    return {
+        "stage": stage,
+        "rows": count,
+        "wallSeconds": round(wall, 4),
+        "rowsPerSecond": round(count / wall) if wall else None,
+        "peakRssMb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_isolated(stage, rows, repeat=REPEAT):
+    """run_stage() in a freshly spawned interpreter (clean peak RSS)."""
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(run_stage, stage, rows, repeat).result()
+
+
+def result_key(stage, scale):
+    return f"{stage}@{scale}x"
+
+
+def compare(result, baseline):
+    """Regression messages for one result against its baseline entry."""
+    if not baseline:
+        return []
+    problems = []
+    if result["rowsPerSecond"] < baseline["rowsPerSecond"] * (1 - REGRESSION_TOLERANCE):
+        problems.append(f"{result['rowsPerSecond']:,} rows/s vs {baseline['rowsPerSecond']:,} baseline")
+    if result["peakRssMb"] > baseline["peakRssMb"] * (1 + REGRESSION_TOLERANCE):
+        problems.append(f"{result['peakRssMb']} MB peak vs {baseline['peakRssMb']} MB baseline")
+    return problems
+
+
+def load_baseline(path):
+    if not Path(path).exists():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ETL stages on synthetic Harvest data")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES),
+                        help=f"Multiples of --base-rows to run (default: {' '.join(map(str, SCALES))})")
+    parser.add_argument("--base-rows", type=int, default=BASE_ROWS,
+                        help=f"Rows at 1x (default: {BASE_ROWS}, about a year of tracking)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Runs per stage; the fastest is kept")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store these results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any stage regressed")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    baseline = load_baseline(args.baseline)
+    if baseline and baseline.get("baseRows") != args.base_rows:
+        print(f"⚠️  Baseline was recorded with --base-rows {baseline.get('baseRows')}; not comparing.")
+        baseline = None
+    baseline_results = (baseline or {}).get("results", {})
+
+    print(f"⏱️  Benchmarking {len(args.stages)} stages at {', '.join(f'{s}x' for s in args.scales)} "
+          f"({args.base_rows:,} rows at 1x, best of {args.repeat})")
+    print(f"{'stage':<16}{'scale':>6}{'rows':>10}{'wall s':>10}{'rows/s':>12}{'peak MB':>10}")
+
+    results = {}
+    regressions = []
+    for scale in args.scales:
+        for stage in args.stages:
+            result = run_isolated(stage, args.base_rows * scale, args.repeat)
+            key = result_key(stage, scale)
+            results[key] = result
+            problems = compare(result, baseline_results.get(key))
+            regressions.extend(f"{key}: {problem}" for problem in problems)
+            print(f"{stage:<16}{scale:>5}x{result['rows']:>10,}{result['wallSeconds']:>10.3f}"
+                  f"{result['rowsPerSecond']:>12,}{result['peakRssMb']:>10.1f}"
+                  f"{'  🐌' if problems else ''}")
+
+    if baseline is None:
+        print("ℹ️  No baseline to compare against (run with --update-baseline to record one).")
+    elif regressions:
+        print(f"\n🐌 {len(regressions)} regression(s) beyond {REGRESSION_TOLERANCE:.0%}:")
+        for regression in regressions:
+            print(f"   - {regression}")
+    else:
+        print(f"\n✅ No regressions beyond {REGRESSION_TOLERANCE:.0%} of {args.baseline.name}")
+
+    if args.update_baseline:
+        merged = {**baseline_results, **results} if baseline else results
+        write_json_atomic(args.baseline, {
+            "generatedAt": datetime.now().isoformat(timespec="seconds"),
+            "machine": machine_info(),
+            "baseRows": args.base_rows,
+            "repeat": args.repeat,
+            "results": {key: merged[key] for key in sorted(merged)},
+        })
+        print(f"💾 Baseline written to {args.baseline}")
+
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Columnar Entry Files
+--------------------------------------
+Writes time entries as Arrow IPC files (`.arrow`) next to the JSON outputs,
+for analysis scripts that want a DataFrame rather than a list of dicts.
+
+- Fixed schema (ENTRY_SCHEMA) so every file / partition concatenates cleanly
+- Repetitive text fields (tasks, personas, day/month names, contexts) are
+  dictionary-encoded and load as pandas categoricals
+- Files are uncompressed, so load_entries_frame() memory-maps them and reads
+  the columns without copying or parsing
+- Run metadata (source, generatedAt, ...) is stored in the schema metadata
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow as pa
+
+from json_writer import FILE_MODE
+
+COLUMNAR_SUFFIX = ".arrow"
+METADATA_KEY = b"personametry"
+
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+ENTRY_SCHEMA = pa.schema([
+    ("date", pa.string()),
+    ("year", pa.int16()),
+    ("month", pa.int8()),
+    ("day", pa.int8()),
+    ("dayOfWeek", CATEGORY),
+    ("monthName", CATEGORY),
+    ("monthNum", pa.int8()),
+    ("weekNum", pa.int8()),
+    ("typeOfDay", CATEGORY),
+    ("task", CATEGORY),
+    ("normalisedTask", CATEGORY),
+    ("metaWorkLife", CATEGORY),
+    ("prioritisedPersona", CATEGORY),
+    ("personaTier2", CATEGORY),
+    ("hours", pa.float64()),
+    ("startedAt", pa.string()),
+    ("endedAt", pa.string()),
+    ("notes", pa.string()),
+    ("notesClean", pa.string()),
+    ("socialContext", CATEGORY),
+    ("socialEntity", CATEGORY),
+    ("meTimeBreakdown", CATEGORY),
+    ("commuteContext", CATEGORY),
+    ("external_id", pa.string()),
+])
+
+
+def columnar_path(json_path) -> Path:
+    """The .arrow file that sits next to a JSON output."""
+    return Path(json_path).with_suffix(COLUMNAR_SUFFIX)
+
+
+def _column(records, field):
+    values = [record.get(field.name) for record in records]
+    if pa.types.is_string(field.type) or pa.types.is_dictionary(field.type):
+        # Same coercion as json.dump(default=str), e.g. datetime.time from Excel
+        values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+        array = pa.array(values, pa.string())
+        return array.dictionary_encode() if pa.types.is_dictionary(field.type) else array
+    return pa.array(values, field.type)
+
+
+def entries_table(records, metadata=None):
+    """Build an Arrow table with ENTRY_SCHEMA from entry dicts (missing fields are null)."""
+    schema = ENTRY_SCHEMA
+    if metadata:
+        schema = schema.with_metadata({METADATA_KEY: json.dumps(metadata, default=str)})
+    return pa.Table.from_arrays([_column(records, field) for field in ENTRY_SCHEMA], schema=schema)
+
+
+def write_columnar(path, records, metadata=None):
+    """Write entries to an Arrow IPC file via temp file + rename. Returns the path."""
+    return write_table(path, entries_table(records, metadata))
+
+
+def write_table(path, table):
+    """Write any Arrow table to an IPC file via temp file + rename. Returns the path."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_name, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.chmod(tmp_name, FILE_MODE)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def read_table(path, columns=None):
+    """Memory-map an Arrow IPC file (zero-copy); optionally keep only `columns`."""
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    return table.select(columns) if columns else table
+
+
+def read_metadata(path):
+    """Run metadata stored with the file ({} if none)."""
+    schema = pa.ipc.open_file(pa.memory_map(str(path), 'r')).schema
+    raw = (schema.metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def load_entries_frame(source, columns=None, keys=None):
+    """
+    Load entries as a pandas DataFrame from an .arrow file, a JSON output with
+    an .arrow sibling, or a partition store directory (all partitions, or those
+    named in `keys`, in manifest order). Dictionary-encoded fields become
+    categoricals.
+
+    Store partitions written before Arrow files existed are read from their
+    JSON instead (they gain an Arrow file the next time they are rewritten).
+    """
+    from partition_store import load_manifest, load_partitions
+
+    source = Path(source)
+    tables = []
+    if source.is_dir():
+        manifest = load_manifest(source)
+        for partition in manifest["partitions"]:
+            if keys is not None and partition["key"] not in keys:
+                continue
+            if partition.get("columnarFile"):
+                tables.append(read_table(source / partition["columnarFile"], columns))
+            else:
+                table = entries_table(load_partitions(source, manifest, [partition["key"]]))
+                tables.append(table.select(columns) if columns else table)
+    else:
+        tables.append(read_table(columnar_path(source), columns))
+
+    if not tables:  # No partition selected
+        table = entries_table([])
+        tables.append(table.select(columns) if columns else table)
+    tables = [table.replace_schema_metadata(None) for table in tables]
+    return pa.concat_tables(tables).to_pandas()
+
+
+def timed_load(source, columns=None):
+    """load_entries_frame() plus a one-line load-time report (for analysis scripts)."""
+    start = time.perf_counter()
+    df = load_entries_frame(source, columns)
+    label = source if Path(source).is_dir() else columnar_path(source)
+    print(f"⏱️  Loaded {len(df)} entries in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"(memory-mapped Arrow: {label})")
+    return df
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Compact Entry Files
+-------------------------------------
+Writes time entries as dictionary-encoded column arrays (`.compact.json`)
+next to the JSON partitions, for the dashboard to download instead of the
+full entry objects (decoded by decodeCompactEntries in personametryService.ts).
+
+Schema (COMPACT_VERSION 1):
+    {
+      "format": "personametry-compact",
+      "version": 1,
+      "metadata": {"partition": "2025"},
+      "count": 3,
+      "strings": ["P3 Professional", "Work", ...],   # most frequent first
+      "columns": {
+        "date": [20089, ...],            # days since 1970-01-01
+        "hours": [1.5, ...],
+        "external_id": [123, "abc", null, ...],   # ints where the ID is numeric
+        "task": [0, 3, -1, ...],         # index into strings, -1 = null
+        ...                              # every STRING_COLUMNS field
+      }
+    }
+
+- Text fields share one string table, so a persona or task name is stored
+  once per file however many entries and columns repeat it
+- year, month, day, dayOfWeek, monthName, monthNum, weekNum, typeOfDay and
+  notesClean are not stored: they are functions of `date` / `notes`
+  (DERIVED_COLUMNS) and the decoder recomputes them
+- compact_payload() returns None for rows whose derived fields do not match
+  the recomputed ones; such a partition is simply served as plain JSON
+"""
+
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+from json_writer import write_json_atomic
+
+COMPACT_FORMAT = "personametry-compact"
+COMPACT_VERSION = 1
+COMPACT_SUFFIX = ".compact.json"
+
+EPOCH = date(1970, 1, 1)
+
+STRING_COLUMNS = [
+    "task", "normalisedTask", "metaWorkLife", "prioritisedPersona", "personaTier2",
+    "startedAt", "endedAt", "notes",
+    "socialContext", "socialEntity", "meTimeBreakdown", "commuteContext",
+]
+
+DERIVED_COLUMNS = [
+    "year", "month", "day", "dayOfWeek", "monthName", "monthNum", "weekNum", "typeOfDay", "notesClean",
+]
+
+# Same labels as harvest_to_json (DAY_OF_WEEK_MAPPING / MONTH_NAMES / WEEKEND_DAYS)
+DAY_NAMES = ['_01 Monday', '_02 Tuesday', '_03 Wednesday', '_04 Thursday', '_05 Friday', '_06 Saturday', '_07 Sunday']
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def compact_path(json_path):
+    """The .compact.json file that sits next to a JSON partition."""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.name[:-len(".json")] + COMPACT_SUFFIX)
+
+
+def date_fields(iso_date):
+    """The date-derived entry fields for an ISO date (as apply_transformations computes them)."""
+    value = date.fromisoformat(iso_date)
+    weekday = value.weekday()
+    return {
+        "year": value.year,
+        "month": value.month,
+        "day": value.day,
+        "dayOfWeek": DAY_NAMES[weekday],
+        "monthName": MONTH_NAMES[value.month - 1],
+        "monthNum": value.month,
+        "weekNum": value.isocalendar()[1],
+        "typeOfDay": "Weekend" if weekday >= 5 else "Weekday",
+    }
+
+
+def notes_clean(notes):
+    return None if notes is None or notes == "" else str(notes)
+
+
+def _text(value):
+    # Same coercion as json.dump(default=str), e.g. datetime.time from Excel
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+def _derivable(records):
+    fields = {}
+    for record in records:
+        iso_date = record["date"]
+        if iso_date not in fields:
+            fields[iso_date] = date_fields(iso_date)
+        for column, value in fields[iso_date].items():
+            if column in record and record[column] != value:
+                return False
+        if "notesClean" in record and record["notesClean"] != notes_clean(record.get("notes")):
+            return False
+    return True
+
+
+def _id_value(value):
+    if value is None:
+        return None
+    text = str(value)
+    return int(text) if text.isdigit() and str(int(text)) == text else text
+
+
+def compact_payload(records, metadata=None):
+    """Encode entry dicts as a COMPACT_VERSION payload, or None if they do not round-trip."""
+    if not _derivable(records):
+        return None
+
+    texts = {column: [_text(record.get(column)) for record in records] for column in STRING_COLUMNS}
+    counts = Counter(value for values in texts.values() for value in values if value is not None)
+    strings = [value for value, _ in counts.most_common()]  # Ties keep first-seen order
+    codes = {value: code for code, value in enumerate(strings)}
+
+    columns = {
+        "date": [(date.fromisoformat(record["date"]) - EPOCH).days for record in records],
+        "hours": [record.get("hours") for record in records],
+        "external_id": [_id_value(record.get("external_id")) for record in records],
+    }
+    for column in STRING_COLUMNS:
+        columns[column] = [-1 if value is None else codes[value] for value in texts[column]]
+
+    return {
+        "format": COMPACT_FORMAT,
+        "version": COMPACT_VERSION,
+        "metadata": metadata or {},
+        "count": len(records),
+        "strings": strings,
+        "columns": columns,
+    }
+
+
+def decode_compact(payload):
+    """Entry dicts from a compact payload (the reference for the dashboard's decoder)."""
+    if payload.get("format") != COMPACT_FORMAT or payload.get("version") != COMPACT_VERSION:
+        raise ValueError(f"Unsupported compact format: {payload.get('format')} v{payload.get('version')}")
+
+    strings = payload["strings"]
+    columns = payload["columns"]
+    days = {}
+    entries = []
+    for i in range(payload["count"]):
+        day = columns["date"][i]
+        if day not in days:
+            iso_date = (EPOCH + timedelta(days=day)).isoformat()
+            days[day] = {"date": iso_date, **date_fields(iso_date)}
+        entry = dict(days[day])
+        for column in STRING_COLUMNS:
+            code = columns[column][i]
+            entry[column] = None if code < 0 else strings[code]
+        entry["hours"] = columns["hours"][i]
+        entry["notesClean"] = notes_clean(entry["notes"])
+        record_id = columns["external_id"][i]
+        if record_id is not None:
+            entry["external_id"] = str(record_id)
+        entries.append(entry)
+    return entries
+
+
+def write_compact(path, records, metadata=None):
+    """Write the compact file for `records` (temp file + rename). Returns the path, or None if not encodable."""
+    payload = compact_payload(records, metadata)
+    if payload is None:
+        return None
+    write_json_atomic(path, payload, indent=None, separators=(",", ":"))
+    return path
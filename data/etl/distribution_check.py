@@ -1,13 +1,10 @@
-import json
-import pandas as pd
 import numpy as np
 import scipy.stats as stats
+from columnar_store import timed_load
 
-# Load data
-with open('data/processed/timeentries_harvest.json', 'r') as f:
-    data = json.load(f)
-
-df = pd.DataFrame(data['entries'])
+# Load data (all year partitions, memory-mapped Arrow files)
+STORE_DIR = 'data/processed/timeentries_harvest'
+df = timed_load(STORE_DIR, columns=['date', 'prioritisedPersona', 'hours'])
 
 # Filter for P0 (Sleep) and P3 (Work)
 p0_df = df[df['prioritisedPersona'] == 'P0 Life Constraints (Sleep)']
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: SQLite Entry Database
+---------------------------------------
+The sync's system of record: every entry of the Harvest store in one indexed
+SQLite table (stdlib sqlite3, no server). The sync upserts each API page into
+it inside one transaction; the year partitions (JSON + Arrow), dashboard
+files and rollups are exported from it.
+
+- Indexes on external_id (unique), date, the Hybrid Deduplication composite
+  key and (prioritisedPersona, date), so lookback, dedup and ad-hoc analysis
+  are index lookups rather than scans of the JSON files
+- Each entry is kept verbatim (`entry`, the JSON the partition files hold)
+  next to the columns queries filter on; other fields are reachable with
+  json_extract(entry, '$.field')
+- `seq` is insertion order: exports sort by date (newest first), then seq,
+  so re-fetched and new entries follow the stored ones of their day
+- The database is stamped with the generatedAt of the manifest it matches.
+  Git carries the exported partitions, not the database (CI keeps it in the
+  Actions cache under that stamp), so a missing or stale database is rebuilt
+  from them
+
+Ad-hoc use:
+    sqlite3 data/processed/timeentries_harvest.sqlite \\
+        "SELECT year, SUM(hours) FROM entries WHERE prioritisedPersona = 'P3 Professional' GROUP BY year"
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+DB_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    seq INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    external_id TEXT,
+    composite_key TEXT NOT NULL,
+    year INTEGER,
+    task TEXT,
+    prioritisedPersona TEXT,
+    hours REAL,
+    startedAt TEXT,
+    endedAt TEXT,
+    entry TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS entries_external_id ON entries (external_id) WHERE external_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS entries_date ON entries (date);
+CREATE INDEX IF NOT EXISTS entries_composite_key ON entries (composite_key);
+CREATE INDEX IF NOT EXISTS entries_persona ON entries (prioritisedPersona, date);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+INSERT = """
+INSERT INTO entries (date, external_id, composite_key, year, task, prioritisedPersona, hours, startedAt, endedAt, entry)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+CHUNK = 500  # Parameters per IN (...) query (SQLite allows 999 on old builds)
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), CHUNK):
+        yield values[start:start + CHUNK]
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def key_text(composite_key):
+    """Stored form of a composite key tuple (its fields are strings)."""
+    return "\x1f".join(composite_key)
+
+
+def _row(record, composite_key):
+    record_id = record.get('external_id')
+    return (
+        record['date'],
+        str(record_id) if record_id else None,
+        key_text(composite_key),
+        record.get('year'),
+        record.get('task'),
+        record.get('prioritisedPersona'),
+        record.get('hours'),
+        _text(record.get('startedAt')),
+        _text(record.get('endedAt')),
+        json.dumps(record, default=str, allow_nan=False),
+    )
+
+
+def _date_range(key):
+    """Bounds of partition `key` (a year) for `date BETWEEN ? AND ?`."""
+    return str(key), f"{key}\uffff"
+
+
+class EntryDB:
+    """A connection to the entry database; transactions are explicit (begin/commit/rollback)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), isolation_level=None)
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        if self.meta("version") not in (None, str(DB_VERSION)):
+            self.conn.executescript("DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS meta;")
+        self.conn.executescript(SCHEMA)
+        if self.meta("version") is None:
+            self.set_meta("version", DB_VERSION)
+
+    def close(self):
+        self.conn.close()
+
+    # --- transactions / metadata ---
+
+    def begin(self):
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        if self.conn.in_transaction:
+            self.conn.execute("COMMIT")
+
+    def rollback(self):
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+
+    def meta(self, key):
+        try:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError:  # Not created yet
+            return None
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, _text(value)))
+
+    @property
+    def stamp(self):
+        """generatedAt of the manifest this database matches (None if never stamped)."""
+        return self.meta("generatedAt")
+
+    def rebuild(self, records, key_of, stamp):
+        """Replace all entries with `records` (store order) in one transaction."""
+        self.begin()
+        try:
+            self.conn.execute("DELETE FROM entries")
+            self.insert((record, key_of(record)) for record in records)
+            self.set_meta("generatedAt", stamp)
+            self.commit()
+        except BaseException:
+            self.rollback()
+            raise
+
+    # --- writes ---
+
+    def insert(self, rows):
+        """Append (record, composite_key) pairs; new seq values sort after same-date rows."""
+        self.conn.executemany(INSERT, (_row(record, composite_key) for record, composite_key in rows))
+
+    def _delete(self, where, params):
+        """Delete matching rows; returns their dates."""
+        dates = [row[0] for row in self.conn.execute(f"SELECT date FROM entries WHERE {where}", params)]
+        if dates:
+            self.conn.execute(f"DELETE FROM entries WHERE {where}", params)
+        return dates
+
+    def delete_ids(self, ids):
+        """Delete entries by external_id; returns the dates of the deleted rows."""
+        dates = []
+        for chunk in _chunks(ids):
+            dates += self._delete(f"external_id IN ({','.join('?' * len(chunk))})", chunk)
+        return dates
+
+    def delete_legacy(self, composite_keys, max_seq):
+        """Delete rows without an external_id matching `composite_keys` (only seq <= max_seq)."""
+        dates = []
+        for chunk in _chunks(key_text(key) for key in composite_keys):
+            where = f"composite_key IN ({','.join('?' * len(chunk))}) AND external_id IS NULL AND seq <= ?"
+            dates += self._delete(where, [*chunk, max_seq])
+        return dates
+
+    # --- reads ---
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def count_kept(self, max_seq):
+        """(legacy, modern): rows stored up to `max_seq` still present, without / with an external_id."""
+        legacy = self.conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE seq <= ? AND external_id IS NULL", (max_seq,)).fetchone()[0]
+        modern = self.conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE seq <= ? AND external_id IS NOT NULL", (max_seq,)).fetchone()[0]
+        return legacy, modern
+
+    def max_seq(self):
+        return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM entries").fetchone()[0]
+
+    def max_date(self):
+        """Latest entry date (index lookup)."""
+        return self.conn.execute("SELECT MAX(date) FROM entries").fetchone()[0]
+
+    def dates_of(self, ids):
+        """{external_id: date} for the given IDs that are stored."""
+        found = {}
+        for chunk in _chunks(ids):
+            marks = ",".join("?" * len(chunk))
+            found.update(self.conn.execute(
+                f"SELECT external_id, date FROM entries WHERE external_id IN ({marks})", chunk))
+        return found
+
+    def ids(self):
+        """{external_id: date} for every entry that has an ID."""
+        return dict(self.conn.execute(
+            "SELECT external_id, date FROM entries WHERE external_id IS NOT NULL"))
+
+    def partition(self, key):
+        """Entries of partition `key` as dicts, in store order (date descending, then seq)."""
+        rows = self.conn.execute(
+            "SELECT entry FROM entries WHERE date BETWEEN ? AND ? ORDER BY date DESC, seq",
+            _date_range(key))
+        return [json.loads(row[0]) for row in rows]
+
+    def query(self, sql, params=()):
+        """Run an ad-hoc read query; returns the rows."""
+        return self.conn.execute(sql, params).fetchall()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Fetch Checkpoints
+-----------------------------------
+Spills every Harvest API page to disk as it arrives, so a fetch that fails
+part-way (page 40 of a multi-year backfill or reconciliation) resumes on the
+next run instead of starting again from page 1.
+
+    data/processed/fetch_checkpoint/
+        <query id>/
+            cursor.json         # query, params, total entries, pages spilled so far
+            page_00001.json     # one API page (time_entries + paging fields)
+
+- A checkpoint belongs to one query (from / updated_since) against one store
+  version (manifest generatedAt); any other run ignores it
+- The request parameters, including the `to` date, are taken from the cursor
+  on resume, so page numbers refer to the same result set
+- Pages listed in the cursor are replayed from disk (no API request); the
+  rest are fetched and spilled. A page is listed only after its file is written
+- If a fresh page reports a different total_entries than the spilled ones,
+  entries were added or removed since and page boundaries moved: the fetch
+  starts again from a fresh page 1 and requests every page up to its new
+  total_pages (the merge is an upsert, so re-feeding is harmless)
+- The sync clears all checkpoints once a run succeeds
+"""
+
+import hashlib
+import json
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from json_writer import write_json_atomic
+
+CURSOR_NAME = "cursor.json"
+PAGE_FIELDS = ("time_entries", "total_pages", "total_entries", "next_page")
+
+
+def checkpoint_id(query, store=None):
+    """Directory name for a query against a store version."""
+    identity = json.dumps({"query": query, "store": store}, sort_keys=True)
+    return hashlib.sha256(identity.encode()).hexdigest()[:16]
+
+
+def clear_checkpoints(root):
+    """Remove every checkpoint (after a successful run)."""
+    shutil.rmtree(root, ignore_errors=True)
+
+
+class PageCheckpoint:
+    """Spilled pages and cursor of one fetch. Thread-safe (pages are saved from fetch workers)."""
+
+    def __init__(self, root, query, store=None):
+        self.query = dict(query)
+        self.store = store
+        self.dir = Path(root) / checkpoint_id(self.query, store)
+        self.cursor = None
+        self.replayed = []  # Pages served from disk this run
+        self.shifted = False  # A fresh page disagreed with the spilled total_entries
+        self.lock = threading.Lock()
+
+        cursor_path = self.dir / CURSOR_NAME
+        if cursor_path.exists():
+            with open(cursor_path, "r") as f:
+                self.cursor = json.load(f)
+
+    @property
+    def pages(self):
+        return set(self.cursor["pages"]) if self.cursor else set()
+
+    def open(self, params):
+        """Request parameters to use: the stored ones when resuming, else `params` (recorded)."""
+        if self.cursor:
+            print(f"♻️  Resuming from checkpoint: {len(self.cursor['pages'])} pages already fetched "
+                  f"({self.cursor['createdAt']})")
+            return dict(self.cursor["params"])
+        self.cursor = {
+            "query": self.query,
+            "store": self.store,
+            "params": dict(params),
+            "totalEntries": None,
+            "pages": [],
+            "createdAt": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._write_cursor()
+        return dict(params)
+
+    def _page_path(self, page):
+        return self.dir / f"page_{page:05d}.json"
+
+    def _write_cursor(self):
+        write_json_atomic(self.dir / CURSOR_NAME, self.cursor, indent=None)
+
+    def load(self, page):
+        """The spilled response of `page`, or None if it still has to be fetched."""
+        if page not in self.pages:
+            return None
+        with open(self._page_path(page), "r") as f:
+            data = json.load(f)
+        with self.lock:
+            self.replayed.append(page)
+        return data
+
+    def save(self, page, data):
+        """Spill a fetched page, then list it in the cursor."""
+        data = {field: data.get(field) for field in PAGE_FIELDS}
+        write_json_atomic(self._page_path(page), data, indent=None)
+        with self.lock:
+            total = data.get("total_entries")
+            if self.cursor["totalEntries"] is None:
+                self.cursor["totalEntries"] = total
+            elif total is not None and total != self.cursor["totalEntries"]:
+                self.shifted = True
+            self.cursor["pages"] = sorted(set(self.cursor["pages"]) | {page})
+            self._write_cursor()
+
+    def restart(self):
+        """
+        True if the result set changed since the replayed pages were spilled:
+        the cursor is emptied and the caller fetches every page again, starting
+        from a fresh page 1 (whose total_pages may have grown).
+        """
+        if not (self.shifted and self.replayed):
+            return False
+        print("⚠️ Harvest results changed since the checkpoint. Re-fetching all pages...")
+        with self.lock:
+            self.replayed, self.shifted = [], False
+            self.cursor["pages"] = []
+            self.cursor["totalEntries"] = None
+            self._write_cursor()
+        return True
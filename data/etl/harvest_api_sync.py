@@ -4,49 +4,151 @@ Personametry ETL: Harvest API Sync
 ----------------------------------
 Automated incremental sync from Harvest API v2.
 Features:
-- Incremental fetch (from last sync date)
-- Deduplication (composite key)
-- Rate limit handling (exponential backoff)
+- Change data capture: only entries updated since the stored high-water mark
+  (Harvest `updated_since`) are fetched; first run falls back to a 7-day lookback
+- Weekly ID reconciliation to detect entries deleted in Harvest: the last 90 days
+  plus one rotating 90-day slice of older history per run
+- Deduplication (composite key) as transactional upserts into an indexed SQLite
+  entry database (entry_db.py), from which the JSON / Arrow partitions are exported
+- Rate limit handling (rolling 15 s request window + Retry-After)
+- Concurrent page fetching over a pooled session for backfills
+- Fetched pages are checkpointed to disk; a failed run resumes from the last
+  good page instead of page 1 (fetch_checkpoint.py)
+- Optional asyncio client (harvest_async.py) with an adaptive limiter
 - Reuses existing transformation logic
+- Year-partitioned store: only partitions touched by the changes are read, and only
+  those whose entries actually changed are rewritten (nothing at all on no-change days)
+- Rebuilds the aggregate rollup cubes (rollups.py) after each save, and updates the
+  activity streaks (streaks.py) for the changed date window only
+- Flags overlapping entries and large unlogged gaps across the full history
+  (interval_issues.json, see intervals.find_interval_issues)
+- Per-stage timing / memory / API metrics appended to sync_runs.jsonl (instrumentation.py)
+- --remap re-derives persona columns of stored history after mapping changes (remap.py)
 
 Usage:
     export HARVEST_ACCESS_TOKEN="your_token"
     export HARVEST_ACCOUNT_ID="your_account_id"
-    python harvest_api_sync.py
+    python harvest_api_sync.py [--workers N] [--client {threads,async}] [--reconcile]
+    python harvest_api_sync.py --remap   # after editing the mappings in harvest_to_json.py (no API calls)
 """
 
 import os
 import json
 import time
+import random
+import argparse
+import threading
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
-from harvest_to_json import (
-    normalise_task,
-    get_prioritised_persona,
-    get_meta_work_life,
-    get_persona_tier2,
-    get_tx_day,
-    get_type_of_day,
-    get_week_num,
-    get_social_context,
-    get_social_entity,
-    get_me_time_breakdown,
-    get_commute_context,
-    clean_notes,
-    MONTH_NAMES
+from entry_db import EntryDB
+from fetch_checkpoint import PageCheckpoint, clear_checkpoints
+from harvest_to_json import apply_transformations, mapping_hash
+from instrumentation import RunReport
+from json_writer import mirror_file, null_constant, write_json_atomic
+from columnar_store import load_entries_frame
+from remap import remap_records, stale_partitions
+from rollups import source_hash, write_rollups
+from intervals import find_interval_issues, interval_frame, write_intervals
+from streaks import write_streaks
+from partition_store import (
+    load_manifest,
+    load_partitions,
+    partition_key,
+    group_by_partition,
+    entries_digest,
+    write_partitions
 )
 
 # Configuration
 DATA_DIR = Path(__file__).parent.parent / "processed"
-OUTPUT_FILE = DATA_DIR / "timeentries_harvest.json"
+OUTPUT_FILE = DATA_DIR / "timeentries_harvest.json"  # Retired single-file store, only read to migrate it
+STORE_DIR = DATA_DIR / "timeentries_harvest"  # Year-partitioned store (one file per year + manifest)
+DB_FILE = DATA_DIR / "timeentries_harvest.sqlite"  # Indexed entry database the store is exported from
+ROLLUP_DIR = DATA_DIR / "rollups"  # Precomputed day/week/month/year cubes for the dashboard
+RUN_REPORT_FILE = DATA_DIR / "sync_runs.jsonl"  # One JSON line of per-stage metrics per run
+ISSUES_FILE = DATA_DIR / "interval_issues.json"  # Overlapping entries / unlogged gaps found by the last sync
+CHECKPOINT_DIR = DATA_DIR / "fetch_checkpoint"  # API pages spilled by a run that has not completed yet
+COMPACT_EXPORT = True  # Also write each partition dictionary-encoded for the dashboard (compact_store.py)
+# Dashboard Public Asset, resolved relative to this script (data/etl/harvest_api_sync.py)
+# script dir (etl) -> parent (data) -> parent (root) -> dashboard...
+DASHBOARD_DATA_DIR = Path(__file__).resolve().parent.parent.parent / 'dashboard' / 'public' / 'data'
 
 # API Config
 HARVEST_API_URL = "https://api.harvestapp.com/v2/time_entries"
 USER_AGENT = "Personametry Integration (github.com/khanmjk/personametry)"
 MAX_RETRIES = 5
 BASE_DELAY = 2  # seconds
+RATE_LIMIT_REQUESTS = 100  # Harvest allows 100 requests...
+RATE_LIMIT_PERIOD = 15  # ...per 15 seconds
+FETCH_WORKERS = 4  # Concurrent page requests on multi-page fetches
+
+# Change Data Capture
+LOOKBACK_DAYS = 7  # Bootstrap window when no updated_at high-water mark is stored yet
+RECONCILE_INTERVAL_DAYS = 7  # How often to compare stored IDs with Harvest (deletions)
+RECONCILE_RECENT_DAYS = 90  # Always reconciled: where deletions usually happen
+RECONCILE_SLICE_DAYS = 90  # Older history reconciled per run, walking back and wrapping
+
+class RequestWindow:
+    """
+    Send times of the requests in the last `period` seconds. Harvest counts
+    requests per rolling window, so at most `capacity` may fall in any
+    `period`: a bucket that starts full would allow twice that in the first one.
+    Not locked; callers serialise access.
+    """
+
+    def __init__(self, capacity=RATE_LIMIT_REQUESTS, period=RATE_LIMIT_PERIOD):
+        self.capacity = capacity
+        self.period = period
+        self.sent = deque()
+
+    def wait_time(self, now):
+        """Seconds until another request fits in the window (0 if it does now)."""
+        while self.sent and self.sent[0] <= now - self.period:
+            self.sent.popleft()
+        if len(self.sent) < self.capacity:
+            return 0.0
+        return self.sent[0] + self.period - now
+
+    def record(self, now):
+        self.sent.append(now)
+
+class RateLimiter:
+    """
+    Thread-safe limiter: at most `capacity` requests in any `period` seconds.
+    pause() blocks all callers until a server-imposed Retry-After has elapsed.
+    """
+
+    def __init__(self, capacity=RATE_LIMIT_REQUESTS, period=RATE_LIMIT_PERIOD):
+        self.window = RequestWindow(capacity, period)
+        self.resume_at = 0.0
+        self.waited = 0.0  # Total seconds callers spent blocked (for reporting)
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                delay = max(self.resume_at - now, self.window.wait_time(now))
+                if delay <= 0:
+                    self.window.record(now)
+                    return
+                self.waited += delay
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """Stop issuing requests for `seconds` (e.g. from a 429 Retry-After header)."""
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter: uniform in [0, BASE_DELAY * 2**attempt] seconds."""
+    return random.uniform(0, BASE_DELAY * 2 ** attempt)
 
 def get_auth_headers():
     """Get headers from environment variables."""
@@ -63,53 +165,166 @@ def get_auth_headers():
         "Content-Type": "application/json"
     }
 
-def fetch_time_entries(from_date):
-    """Fetch time entries from Harvest API with pagination and backoff."""
-    headers = get_auth_headers()
-    params = {
-        "from": from_date,
-        "to": datetime.now().strftime("%Y-%m-%d"),
-        "page": 1,
-        "per_page": 100
-    }
-    
-    all_entries = []
-    
-    print(f"🔄 Fetching data from Harvest since {from_date}...")
-    
+def fetch_page(session, headers, params, page, limiter, stats=None):
+    """
+    Fetch one page, waiting on the rate limiter and honouring Retry-After.
+
+    Connection errors and 5xx responses are retried up to MAX_RETRIES times
+    with exponential backoff; 429s wait for Retry-After and do not count.
+    `stats` (instrumentation.FetchStats) receives page latencies and retries.
+    """
+    attempt = 0
     while True:
+        limiter.acquire()
+        start = time.perf_counter()
         try:
-            response = requests.get(HARVEST_API_URL, headers=headers, params=params)
-            
+            response = session.get(HARVEST_API_URL, headers=headers, params={**params, "page": page})
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+        else:
             if response.status_code == 429:
-                retry_after = int(response.headers.get("Retry-After", 15))
+                retry_after = int(response.headers.get("Retry-After", RATE_LIMIT_PERIOD))
                 print(f"⚠️ Rate limited. Waiting {retry_after}s...")
-                time.sleep(retry_after)
+                limiter.pause(retry_after)
+                if stats:
+                    stats.record_retry(throttled=True)
                 continue
-                
-            response.raise_for_status()
-            data = response.json()
-            
-            entries = data.get("time_entries", [])
-            all_entries.extend(entries)
-            
-            print(f"  - Page {params['page']}: Fetched {len(entries)} entries")
-            
-            if data.get("next_page"):
-                params["page"] = data["next_page"]
-                # Polite delay between pages
-                time.sleep(0.5)
-            else:
-                break
-                
-        except requests.exceptions.RequestException as e:
-            print(f"❌ API Error: {e}")
-            raise
+            if response.status_code < 500:
+                response.raise_for_status()
+                data = response.json()
+                if stats:
+                    stats.record_page(time.perf_counter() - start)
+                return data
+            error = requests.exceptions.HTTPError(f"{response.status_code} Server Error", response=response)
 
-    print(f"✅ Total fetched: {len(all_entries)} entries")
-    return all_entries
+        if attempt >= MAX_RETRIES:
+            raise error
+        if stats:
+            stats.record_retry()
+        delay = backoff_delay(attempt)
+        attempt += 1
+        print(f"⚠️ Page {page} failed ({error}). Retry {attempt}/{MAX_RETRIES} in {delay:.1f}s...")
+        time.sleep(delay)
 
-def transform_api_data(entries):
+def time_entry_params(from_date=None, updated_since=None, to_date=None):
+    """
+    Query parameters for /v2/time_entries.
+
+    `from_date` selects by spent date (up to `to_date`, default today);
+    `updated_since` selects entries created or modified after an updated_at
+    timestamp.
+    """
+    params = {"per_page": 100}
+    if from_date:
+        params["from"] = from_date
+        params["to"] = to_date or datetime.now().strftime("%Y-%m-%d")
+    if updated_since:
+        params["updated_since"] = updated_since
+    return params
+
+def describe_query(params):
+    if "updated_since" in params:
+        return f"updated since {params['updated_since']}"
+    return f"from {params['from']} to {params['to']}"
+
+def iter_time_entry_pages(from_date=None, workers=FETCH_WORKERS, updated_since=None, stats=None,
+                          checkpoint=None, to_date=None):
+    """
+    Yield the time entries of each API page, in page order, as pages arrive.
+
+    Page 1 is fetched first to learn `total_pages`; the remaining pages are
+    then fetched concurrently by up to `workers` threads sharing one pooled
+    session and one rate limiter. At most 2 * `workers` pages are fetched
+    ahead of the consumer, so memory stays bounded by a few pages.
+    `stats` (instrumentation.FetchStats) collects latencies and limiter waits.
+    With a `checkpoint` (fetch_checkpoint.PageCheckpoint) each page is spilled
+    to disk as it arrives and pages spilled by an earlier run are replayed.
+    """
+    headers = get_auth_headers()
+    params = time_entry_params(from_date, updated_since, to_date)
+    if checkpoint:
+        params = checkpoint.open(params)
+    workers = max(workers, 1)
+    
+    total = 0
+    limiter = RateLimiter()
+    
+    print(f"🔄 Fetching data from Harvest {describe_query(params)}...")
+    
+    try:
+        with requests.Session() as session:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            def get_page(page, replay=True):
+                data = checkpoint.load(page) if checkpoint and replay else None
+                if data is None:
+                    data = fetch_page(session, headers, params, page, limiter, stats)
+                    if checkpoint:
+                        checkpoint.save(page, data)
+                return data
+
+            def fetch_all(replay=True):
+                """(page, response) for every page of the query, in page order."""
+                data = get_page(1, replay)
+                yield 1, data
+
+                total_pages = data.get("total_pages")
+                if total_pages:
+                    pages = iter(range(2, total_pages + 1))
+                    submit = lambda page: (page, pool.submit(get_page, page, replay))
+                    with ThreadPoolExecutor(max_workers=workers) as pool:
+                        pending = deque(submit(page) for page in islice(pages, 2 * workers))
+                        while pending:
+                            page, future = pending.popleft()
+                            data = future.result()
+                            next_page = next(pages, None)
+                            if next_page is not None:
+                                pending.append(submit(next_page))
+                            yield page, data
+                else:
+                    # No page count in the response: follow next_page links one at a time
+                    while data.get("next_page"):
+                        page = data["next_page"]
+                        data = get_page(page, replay)
+                        yield page, data
+
+            def deliver(responses):
+                nonlocal total
+                for page, data in responses:
+                    entries = data.get("time_entries", [])
+                    total += len(entries)
+                    print(f"  - Page {page}: Fetched {len(entries)} entries")
+                    yield entries
+
+            yield from deliver(fetch_all())
+            # Page boundaries moved since the checkpoint: fetch everything again from a
+            # fresh page 1, so pages past the old total_pages are requested too
+            if checkpoint and checkpoint.restart():
+                yield from deliver(fetch_all(replay=False))
+
+    except requests.exceptions.RequestException as e:
+        print(f"❌ API Error: {e}")
+        raise
+
+    if checkpoint and checkpoint.replayed:
+        print(f"♻️  Replayed {len(checkpoint.replayed)} pages from the checkpoint (no API requests)")
+    if limiter.waited:
+        print(f"⏳ Rate limiter waits: {limiter.waited:.1f}s")
+    if stats:
+        stats.record_wait(limiter.waited)
+    print(f"✅ Total fetched: {total} entries")
+
+def fetch_time_entries(from_date=None, workers=FETCH_WORKERS, updated_since=None):
+    """Fetch all matching time entries from Harvest API as one list (in page order)."""
+    return [
+        entry
+        for page in iter_time_entry_pages(from_date, workers, updated_since)
+        for entry in page
+    ]
+
+def transform_api_data(entries, verbose=True):
     """Transform API JSON response to DataFrame matching internal schema."""
     if not entries:
         return pd.DataFrame()
@@ -138,50 +353,10 @@ def transform_api_data(entries):
     df = pd.DataFrame(rows)
     
     # Apply existing transformations (same as harvest_to_json.py)
-    print("\nApplying transformations...")
-    
-    # Parse date
-    df['date'] = pd.to_datetime(df['Date'])
-    
-    # Date components
-    df['year'] = df['date'].dt.year
-    df['month'] = df['date'].dt.month
-    df['day'] = df['date'].dt.day
-    df['isoDate'] = df['date'].dt.strftime('%Y-%m-%d')
-    df['monthName'] = df['date'].dt.month.map(lambda m: MONTH_NAMES[m - 1])
-    df['monthNum'] = df['date'].dt.month
-    df['weekNum'] = df['date'].apply(get_week_num)
-    df['dayOfWeek'] = df['date'].apply(get_tx_day)
-    df['typeOfDay'] = df['dayOfWeek'].apply(get_type_of_day)
+    if verbose:
+        print("\nApplying transformations...")
     
-    # Task normalization
-    df['normalisedTask'] = df['Task'].apply(normalise_task)
-    
-    # Persona mappings
-    df['prioritisedPersona'] = df['normalisedTask'].apply(get_prioritised_persona)
-    df['metaWorkLife'] = df['prioritisedPersona'].apply(get_meta_work_life)
-    df['personaTier2'] = df['normalisedTask'].apply(get_persona_tier2)
-    
-    # Social context
-    df['socialContext'] = df.apply(
-        lambda row: get_social_context(row['personaTier2'], row['Notes']), axis=1
-    )
-    df['socialEntity'] = df.apply(
-        lambda row: get_social_entity(row['personaTier2'], row['Notes']), axis=1
-    )
-    
-    # Me Time breakdown
-    df['meTimeBreakdown'] = df.apply(
-        lambda row: get_me_time_breakdown(row['personaTier2'], row['normalisedTask']), axis=1
-    )
-    
-    # Commute context
-    df['commuteContext'] = df.apply(
-        lambda row: get_commute_context(row['personaTier2'], row['Notes']), axis=1
-    )
-    
-    # Clean notes
-    df['notesClean'] = df['Notes'].apply(clean_notes)
+    apply_transformations(df)
     
     # Handle Start/End times
     df['startedAt'] = df['Started At'].fillna("").astype(str).replace("nan", "")
@@ -215,28 +390,164 @@ def transform_api_data(entries):
         'external_id': 'external_id'
     }
     
-    return df[list(output_columns.keys())].rename(columns=output_columns)
+    output = df[list(output_columns.keys())].rename(columns=output_columns)
+
+    # Records come out JSON-ready, so nothing downstream walks every record again
+    return nans_to_none(output)
+
+def nans_to_none(frame):
+    """NaN -> None once per column, only for columns that have gaps (the rest keep their dtypes)."""
+    missing = frame.isna().any()
+    for column in missing.index[missing]:
+        frame[column] = frame[column].astype(object).where(frame[column].notna(), None)
+    return frame
+
+def clean_nans(value):
+    """
+    Recursively replace NaN with None for JSON compliance.
+
+    Only for ad-hoc payloads: entries are normalised column-wise by
+    nans_to_none in transform_api_data, and stored partitions load NaN
+    tokens as None.
+    """
+    if isinstance(value, float):
+        if value != value:  # checks for NaN
+            return None
+        return value
+    if isinstance(value, dict):
+        return {k: clean_nans(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [clean_nans(v) for v in value]
+    return value
 
 def load_existing_data():
-    """Load existing JSON data and determine last sync date."""
-    if not OUTPUT_FILE.exists():
+    """Load the partition manifest and determine last sync date (no entries are read)."""
+    manifest = load_manifest(STORE_DIR)
+
+    if manifest is None and OUTPUT_FILE.exists():
+        manifest = migrate_legacy_file()
+
+    if manifest is None:
         print("⚠️ No existing data found. Using default start date.")
-        return [], "2024-01-01"
-        
+        return None, "2024-01-01"
+
+    last_date = manifest["dateRange"]["end"] or "2024-01-01"
+    print(f"📂 Found {manifest['recordCount']} existing entries in "
+          f"{len(manifest['partitions'])} partitions. Last date: {last_date}")
+    return manifest, last_date
+
+def migrate_legacy_file():
+    """One-off split of the legacy single JSON file into year partitions."""
     with open(OUTPUT_FILE, 'r') as f:
-        data = json.load(f)
-        
-    entries = data.get("entries", [])
-    
-    # Find max date
-    if entries:
-        dates = [e['date'] for e in entries]
-        last_date = max(dates)
-    else:
-        last_date = "2024-01-01"
-        
-    print(f"📂 Loaded {len(entries)} existing entries. Last date: {last_date}")
-    return entries, last_date
+        entries = json.load(f, parse_constant=null_constant).get("entries", [])
+    if not entries:
+        return None
+
+    print(f"📦 Migrating {len(entries)} entries from {OUTPUT_FILE.name} to {STORE_DIR}...")
+    entries.sort(key=lambda x: x['date'], reverse=True)
+    return save_data(entries)
+
+def open_entry_db(manifest):
+    """
+    The entry database, rebuilt from the partitions when it does not match the
+    manifest (fresh checkout, XLSX rebuild, --remap, interrupted run).
+    """
+    db = EntryDB(DB_FILE)
+    stamp = manifest.get("generatedAt") if manifest else None
+    if db.stamp != stamp or (stamp is None and db.count()):
+        print("🔧 Entry database missing or stale. Rebuilding from the partitions...")
+        keys = [p["key"] for p in manifest["partitions"]] if manifest else []
+        records = chain.from_iterable(load_partitions(STORE_DIR, manifest, [key]) for key in keys)
+        db.rebuild(records, build_composite_key, stamp)
+    return db
+
+def sync_state(manifest):
+    """CDC state persisted in the manifest: {"updatedSince", "lastReconciledAt"}."""
+    return dict((manifest or {}).get("sync") or {})
+
+def high_water_mark(entries, current=None):
+    """Latest updated_at among fetched entries (ISO 8601 UTC strings compare in order)."""
+    marks = [e["updated_at"] for e in entries if e.get("updated_at")]
+    if current:
+        marks.append(current)
+    return max(marks) if marks else None
+
+def sync_state_changed(old, new):
+    """
+    Whether a run that changed no entries should still persist its CDC state:
+    only for a first high-water mark or a new reconciliation time. A mark that
+    merely moved forward is not worth a write (and a commit); the next run
+    re-fetches those few unchanged entries.
+    """
+    if new.get("lastReconciledAt") != old.get("lastReconciledAt"):
+        return True
+    return bool(new.get("updatedSince")) and not old.get("updatedSince")
+
+def reconciliation_due(state, now=None):
+    last = state.get("lastReconciledAt")
+    if not last:
+        return True
+    now = now or datetime.now()
+    return now - datetime.fromisoformat(last) >= timedelta(days=RECONCILE_INTERVAL_DAYS)
+
+def reconcile_windows(stored, state, today=None):
+    """
+    Date windows to reconcile this run, and the cursor to store for the next.
+
+    The last RECONCILE_RECENT_DAYS are always checked. Older API history is
+    covered one RECONCILE_SLICE_DAYS slice per run, walking back from the
+    stored cursor (`state["reconcileBefore"]`, the start of the previous
+    slice) and wrapping to the recent window once the oldest stored date is
+    reached. The cursor is None when nothing is older than the recent window.
+    """
+    if not stored:
+        return [], None
+
+    today = today or datetime.now().date()
+    oldest = datetime.strptime(min(stored.values()), "%Y-%m-%d").date()
+    recent_start = today - timedelta(days=RECONCILE_RECENT_DAYS - 1)
+    windows = [(max(recent_start, oldest), today)]
+    if oldest >= recent_start:
+        return _format_windows(windows), None
+
+    cursor = state.get("reconcileBefore")
+    before = datetime.strptime(cursor, "%Y-%m-%d").date() if cursor else recent_start
+    if before <= oldest or before > recent_start:
+        before = recent_start
+    end = before - timedelta(days=1)
+    start = max(end - timedelta(days=RECONCILE_SLICE_DAYS - 1), oldest)
+    windows.append((start, end))
+    return _format_windows(windows), start.strftime("%Y-%m-%d")
+
+def _format_windows(windows):
+    return [(start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")) for start, end in windows]
+
+def find_deleted_ids(stored, fetch_pages, windows, live_ids=()):
+    """
+    IDs held in the store that Harvest no longer returns.
+
+    `stored` maps external_id -> date (EntryDB.ids()). For each (start, end)
+    window of reconcile_windows() that holds stored IDs, pages through that
+    date range (`fetch_pages` is called with from_date/to_date) keeping only
+    the IDs, and compares ID sets. Only stored IDs inside a fetched window are
+    candidates; legacy rows without an ID are never touched. `live_ids`
+    (entries fetched this run) are never reported, even if their date moved
+    out of the window.
+    """
+    candidates = set()
+    live = set(live_ids)
+    for start, end in windows:
+        in_window = {record_id for record_id, date in stored.items() if start <= date <= end}
+        if not in_window:
+            continue
+        fetched = {str(entry["id"]) for page in fetch_pages(from_date=start, to_date=end) for entry in page}
+        if not fetched:
+            print(f"⚠️ Reconciliation returned no entries for {start}..{end}. Skipping that window.")
+            continue
+        candidates |= in_window
+        live |= fetched
+
+    return candidates - live
 
 def normalise_time_value(value):
     if value is None:
@@ -269,183 +580,435 @@ def build_composite_key(row):
 
     return (date, task, hours, started, ended, notes)
 
-def merge_and_deduplicate(existing, new_df):
+def _new_rows(merge, new_df):
     """
-    Merge new data with existing using Hybrid Deduplication.
-    1. Modern Records (With ID): Validated by 'external_id'. Updates replace old versions.
-    2. Legacy Records (No ID): Preserved unless a composite key match exists in the new batch.
+    [(record, external_id, composite_key)] of a batch, minus rows already seen
+    this run: by external_id, or by composite key for rows without one (first
+    occurrence wins). Updates merge.new_ids / new_keys and the duplicate counters.
     """
-    if new_df.empty:
-        return existing
-
-    new_records = new_df.to_dict('records')
-
-    new_ids = set()
-    new_keys = set()
-    deduped_new_records = []
-    duplicate_new_ids = 0
-    duplicate_new_keys = 0
-
-    for record in new_records:
+    rows = []
+    for record in new_df.to_dict('records'):
         record_id = str(record.get('external_id')) if record.get('external_id') else None
         composite_key = build_composite_key(record)
 
         if record_id:
-            if record_id in new_ids:
-                duplicate_new_ids += 1
+            if record_id in merge.new_ids:
+                merge.duplicate_new_ids += 1
                 continue
-            new_ids.add(record_id)
+            merge.new_ids.add(record_id)
         else:
-            if composite_key in new_keys:
-                duplicate_new_keys += 1
+            if composite_key in merge.new_keys:
+                merge.duplicate_new_keys += 1
                 continue
 
-        new_keys.add(composite_key)
-        deduped_new_records.append(record)
-    
-    final_list = []
-    
-    # 1. Process Existing Records
-    legacy_count = 0
-    overwritten_count = 0
-    preserved_count = 0
-    legacy_overlap_count = 0
-    
-    for row in existing:
-        row_id = str(row.get('external_id')) if row.get('external_id') else None
-        
-        if row_id and row_id in new_ids:
-            # This existing record has an ID that is ALSO in the new batch.
-            # SKIP it here (we will add the FRESH version from new_records later).
-            overwritten_count += 1
-            continue
-
-        if not row_id:
-            composite_key = build_composite_key(row)
-            if composite_key in new_keys:
-                legacy_overlap_count += 1
-                continue
+        merge.new_keys.add(composite_key)
+        rows.append((record, record_id, composite_key))
+    return rows
 
-        # Otherwise keep it (Legacy, or Modern record not in current fetch window)
-        final_list.append(row)
-        if not row_id:
-            legacy_count += 1
-        else:
-            preserved_count += 1
-            
-    # 2. Add New Records (All of them - since we skipped their older versions above)
-    final_list.extend(deduped_new_records)
-    
+def _print_merge_stats(merge, handled, legacy_count, preserved_count, final_count):
     print(f"\n📊 Hybrid Deduplication Stats:")
-    print(f"   - Existing Handled:   {len(existing)}")
-    print(f"   - Overwritten (ID):   {overwritten_count} (Old versions replaced by fresh API data)")
+    print(f"   - Existing Handled:   {handled}")
+    print(f"   - Overwritten (ID):   {merge.overwritten_count} (Old versions replaced by fresh API data)")
     print(f"   - Preserved (Legacy): {legacy_count}")
     print(f"   - Preserved (Modern): {preserved_count}")
-    print(f"   - Legacy Overlap:     {legacy_overlap_count} (Legacy rows removed via composite key)")
-    print(f"   - New Batch Added:    {len(deduped_new_records)}")
-    print(f"   - Duplicate New IDs:  {duplicate_new_ids}")
-    print(f"   - Duplicate New Keys: {duplicate_new_keys}")
-    print(f"   - Final Total:        {len(final_list)}")
-
-    # Sort by date descending
-    final_list.sort(key=lambda x: x['date'], reverse=True)
-    
-    return final_list
+    print(f"   - Legacy Overlap:     {merge.legacy_overlap_count} (Legacy rows removed via composite key)")
+    print(f"   - New Batch Added:    {merge.added_count}")
+    print(f"   - Duplicate New IDs:  {merge.duplicate_new_ids}")
+    print(f"   - Duplicate New Keys: {merge.duplicate_new_keys}")
+    print(f"   - Final Total:        {final_count}")
 
-def clean_nans(value):
-    """Recursively replace NaN/Description with None for JSON compliance."""
-    if isinstance(value, float):
-        if value != value:  # checks for NaN
-            return None
-        return value
-    if isinstance(value, dict):
-        return {k: clean_nans(v) for k, v in value.items()}
-    if isinstance(value, list):
-        return [clean_nans(v) for v in value]
-    return value
+class DatabaseMerge:
+    """
+    Hybrid Deduplication as upserts into the entry database (entry_db.EntryDB).
 
-def save_data(records):
-    """Save records to JSON with updated metadata."""
-    if not records:
-        return
-        
-    dates = [r['date'] for r in records if r['date']]
-    
-    # Sanitize records to remove NaN values (which break JSON)
-    clean_records = clean_nans(records)
-    
-    output = {
-        "metadata": {
-            "generatedAt": datetime.now().isoformat(),
-            "recordCount": len(clean_records),
-            "dateRange": {
-                "start": min(dates) if dates else None,
-                "end": max(dates) if dates else None
-            },
-            "source": "harvest_api_sync_v2",
-            "etlVersion": "harvest_api_sync v1.0",
-            "note": "Incremental sync from Harvest API + Manual History"
-        },
-        "entries": clean_records
+    1. Modern Records (With ID): Validated by 'external_id'. Updates replace old versions.
+    2. Legacy Records (No ID): Preserved unless a composite key match exists in the new batch.
+
+    Stored versions and legacy overlaps are found through the external_id /
+    composite key indexes, and every batch is written into one open
+    transaction: commit() makes the whole run durable at once, rollback()
+    discards it (nothing changed, or the export failed). partition(key)
+    returns a partition as it was before the run, for changed_partitions().
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.before = {}  # key -> rows before this run (captured before the first write)
+        self.new_ids = set()
+        self.new_keys = set()
+        self.added_count = 0
+        self.duplicate_new_ids = 0
+        self.duplicate_new_keys = 0
+        self.overwritten_count = 0
+        self.legacy_overlap_count = 0
+        self.deleted_count = 0
+        self.dates = set()  # Entry dates written or removed by this run
+        db.begin()
+        self.max_seq = db.max_seq()  # Rows with a higher seq were added by this run
+        self.existing_count = db.count()
+
+    @property
+    def keys(self):
+        """Partitions touched so far (the ones finish() returns rows for)."""
+        return sorted(self.before, reverse=True)
+
+    def partition(self, key):
+        """Rows of partition `key` as they were before this run."""
+        if key not in self.before:
+            self.before[key] = self.db.partition(key)
+        return self.before[key]
+
+    def _touch(self, dates):
+        for date in dates:
+            self.dates.add(date)
+            self.partition(partition_key(date))
+
+    @property
+    def date_window(self):
+        """(first, last) entry date touched so far, or None."""
+        return (min(self.dates), max(self.dates)) if self.dates else None
+
+    def add(self, new_df):
+        """Upsert one batch of transformed rows (a DataFrame)."""
+        if new_df is None or new_df.empty:
+            return
+
+        batch = _new_rows(self, new_df)
+        batch_ids = [record_id for _, record_id, _ in batch if record_id]
+        # Legacy overlaps share their new row's date, so these cover every partition written
+        self._touch(chain(self.db.dates_of(batch_ids).values(), (record['date'] for record, _, _ in batch)))
+
+        self.overwritten_count += len(self.db.delete_ids(batch_ids))
+        self.legacy_overlap_count += len(self.db.delete_legacy(
+            (composite_key for _, _, composite_key in batch), self.max_seq))
+        self.db.insert((record, composite_key) for record, _, composite_key in batch)
+        self.added_count += len(batch)
+
+    def delete(self, ids):
+        """Delete entries removed in Harvest (ID reconciliation)."""
+        if not ids:
+            return
+        self._touch(self.db.dates_of(ids).values())
+        self.deleted_count += len(self.db.delete_ids(ids))
+        print(f"🗑️  Removed {self.deleted_count} entries deleted in Harvest")
+
+    def finish(self):
+        """
+        The touched partitions as they are now (store order), concatenated.
+
+        The printed stats cover the whole store, like the full-scan merge did.
+        """
+        final_list = [row for key in self.keys for row in self.db.partition(key)]
+
+        legacy_count, preserved_count = self.db.count_kept(self.max_seq)
+        _print_merge_stats(self, self.existing_count, legacy_count, preserved_count, self.db.count())
+        return final_list
+
+    def commit(self, stamp):
+        """Make the run durable; `stamp` is the generatedAt of the manifest just written."""
+        self.db.set_meta("generatedAt", stamp)
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+def changed_partitions(merge, records):
+    """
+    Touched partitions whose merged entries differ from the stored ones.
+
+    Compares order-independent digests of each partition before and after the
+    merge, so re-sent entries that are identical to the stored version (same
+    external_id and fields) do not count as changes. Returns (keys, records
+    restricted to those partitions).
+    """
+    groups = group_by_partition(records)
+    changed = [
+        key for key in merge.keys
+        if entries_digest(groups.get(key, [])) != entries_digest(merge.partition(key))
+    ]
+    return changed, [record for key in changed for record in groups.get(key, [])]
+
+def save_data(records, manifest=None, keys=(), sync=None, mapping=None):
+    """
+    Write records to the year-partitioned store and mirror changed files to the dashboard.
+
+    `records` must hold every entry of the partitions it touches; `keys` names
+    partitions to rewrite even if they end up empty. `sync` replaces the CDC
+    state and `mapping` the mappingHash stored in the manifest (both kept
+    as-is when None). Returns the new manifest.
+    """
+    if not records and not keys and sync is None and mapping is None:
+        return manifest
+
+    metadata = {
+        "generatedAt": datetime.now().isoformat(),
+        "source": "harvest_api_sync_v2",
+        "etlVersion": "harvest_api_sync v1.0",
+        "note": "Incremental sync from Harvest API + Manual History"
     }
+    sync = sync if sync is not None else sync_state(manifest)
+    if sync:
+        metadata["sync"] = sync
+    mapping = mapping or (manifest or {}).get("mappingHash")
+    if mapping:
+        metadata["mappingHash"] = mapping
     
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
     # PATH A: Primary Database (Processed Data)
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(output, f, indent=2, default=str)
-    print(f"✅ Exported {len(clean_records)} records to {OUTPUT_FILE}")
+    # Entries are already JSON-ready (NaN normalised in transform_api_data / on load)
+    manifest, written = write_partitions(STORE_DIR, manifest, records, keys, metadata, compact=COMPACT_EXPORT)
+    partition_files = {partition["file"] for partition in manifest["partitions"]}
+    rewritten = sum(1 for path in written if path.name in partition_files)  # Not the compact files / manifest
+    print(f"✅ Exported {len(records)} records to {rewritten} partitions in {STORE_DIR}")
 
     # PATH B: Dashboard Public Asset (Dual-Write for Local Dev support)
-    # Allows 'git pull' to update the dev server immediately without ETL steps
-    # Use robust path resolution relative to this script (data/etl/harvest_api_sync.py)
-    # script dir (etl) -> parent (data) -> parent (root) -> dashboard...
-    root_dir = Path(__file__).resolve().parent.parent.parent
-    dashboard_path = root_dir / 'dashboard' / 'public' / 'data' / 'timeentries_harvest.json'
+    # Allows 'git pull' to update the dev server immediately without ETL steps.
+    # Only the rewritten partitions + manifest are hardlinked/copied, never re-serialized.
+    dashboard_dir = DASHBOARD_DATA_DIR / STORE_DIR.name
     
     try:
-        dashboard_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(dashboard_path, 'w') as f:
-            json.dump(output, f, indent=2, default=str)
-        print(f"✅ Synced to Dashboard Public: {dashboard_path}")
+        for path in written:
+            mirror_file(path, dashboard_dir / path.name)
+        print(f"✅ Synced to Dashboard Public: {dashboard_dir}")
     except Exception as e:
         print(f"⚠️  Warning: Could not sync to dashboard public folder: {e}")
         
-    print(f"💾 Saved to {OUTPUT_FILE}")
+    print(f"💾 Saved to {STORE_DIR} ({manifest['recordCount']} total records)")
+    return manifest
+
+def check_intervals(manifest):
+    """
+    Write ISSUES_FILE: entries overlapping each other and unlogged gaps within a
+    day, over the whole store. Times are normalised like the composite key
+    (normalise_time_value) before parsing. Returns the issues.
+    """
+    df = load_entries_frame(STORE_DIR, columns=["date", "external_id", "startedAt", "endedAt"])
+    for column in ("startedAt", "endedAt"):
+        codes, values = pd.factorize(df[column].astype(object), use_na_sentinel=False)
+        normalised = pd.Series([normalise_time_value(None if pd.isna(v) else v) for v in values], dtype=object)
+        df[column] = normalised.to_numpy()[codes] if len(codes) else df[column]
+    issues = find_interval_issues(interval_frame(df))
+
+    overlaps, gaps = len(issues["overlaps"]["date"]), len(issues["gaps"]["date"])
+    write_json_atomic(ISSUES_FILE, {
+        **issues,
+        "counts": {"overlaps": overlaps, "gaps": gaps},
+        "recordCount": manifest["recordCount"],
+        "sourceHash": source_hash(manifest),
+    }, indent=None)
+    if overlaps or gaps:
+        print(f"⚠️ {overlaps} overlapping entries, {gaps} gaps of {issues['gapThresholdMinutes']}+ minutes "
+              f"(see {ISSUES_FILE.name})")
+    else:
+        print("🧭 No overlapping entries or unlogged gaps.")
+    return issues
 
-def main():
+def remap_store(manifest, report):
+    """
+    Re-derive the persona columns of stored entries with the current mappings (--remap).
+
+    Nothing is read beyond the manifest when its mappingHash is current. Otherwise
+    only partitions with rows that now map differently are patched and rewritten
+    (then the rollups); the manifest records the new hash either way. Returns
+    the run status.
+    """
+    current = mapping_hash()
+    if manifest is None:
+        print("⚠️ No stored entries to remap.")
+        return "no-changes"
+    if manifest.get("mappingHash") == current:
+        print(f"✨ Persona mappings unchanged ({current[:19]}…). Nothing to remap.")
+        return "no-changes"
+
+    with report.stage("scan", rows=manifest["recordCount"], partitions=len(manifest["partitions"])):
+        keys = stale_partitions(STORE_DIR, manifest)
+    print(f"🔁 Persona mappings changed. {len(keys)} partition(s) hold entries that map differently.")
+
+    records = []
+    with report.stage("remap") as remap:
+        for key in keys:
+            rows = load_partitions(STORE_DIR, manifest, [key])
+            changed = remap_records(rows)
+            print(f"   - {key}: {changed} of {len(rows)} entries remapped")
+            remap["changed"] = remap.get("changed", 0) + changed
+            records.extend(rows)
+        remap["rows"] = len(records)
+
+    with report.stage("save", rows=len(records), partitions=len(keys)):
+        manifest = save_data(records, manifest, keys, mapping=current)
+    if keys:
+        with report.stage("rollups"):
+            write_rollups(STORE_DIR, ROLLUP_DIR, DASHBOARD_DATA_DIR / ROLLUP_DIR.name)
+        with report.stage("intervals"):
+            write_intervals(STORE_DIR, ROLLUP_DIR, DASHBOARD_DATA_DIR / ROLLUP_DIR.name)
+        with report.stage("streaks"):
+            write_streaks(STORE_DIR, ROLLUP_DIR, DASHBOARD_DATA_DIR / ROLLUP_DIR.name)
+    return "ok" if keys else "no-changes"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental sync from Harvest API v2")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS,
+                        help=f"Concurrent page requests for multi-page fetches (default: {FETCH_WORKERS})")
+    parser.add_argument("--client", choices=["threads", "async"], default="threads",
+                        help="HTTP client: thread pool (requests) or asyncio (aiohttp)")
+    parser.add_argument("--reconcile", action="store_true",
+                        help=f"Check for deleted entries now (otherwise every {RECONCILE_INTERVAL_DAYS} days)")
+    parser.add_argument("--remap", action="store_true",
+                        help="Re-derive persona columns of the stored entries after mapping changes (no API calls)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = RunReport("harvest_api_sync", client=args.client, workers=args.workers,
+                       mode="remap" if args.remap else "sync")
+    if args.client == "async":
+        from harvest_async import iter_time_entry_pages as iter_async_pages
+        client_pages = lambda **query: iter_async_pages(concurrency=args.workers, stats=report.fetch, **query)
+    else:
+        client_pages = lambda **query: iter_time_entry_pages(workers=args.workers, stats=report.fetch, **query)
+
+    # Pages are spilled as they arrive; a checkpoint is only resumed against the store it was taken on
+    checkpoints = []
+    def fetch_pages(**query):
+        checkpoint = PageCheckpoint(CHECKPOINT_DIR, query, store=(manifest or {}).get("generatedAt"))
+        checkpoints.append(checkpoint)
+        return client_pages(checkpoint=checkpoint, **query)
+
+    db = manifest = None
     try:
-        # 1. Load existing state
-        existing_entries, last_sync_date = load_existing_data()
-        
-        # 2. Fetch new data (incremental with safety lookback)
-        # We look back 7 days to cover "forgot to log last week" scenarios.
-        # Calculation: ~10 entries/day * 7 days = ~70 entries = 1 API page.
-        # Rate Limit: 100 reqs/15s. This uses ~1% of quota. Very safe.
-        last_date_obj = datetime.strptime(last_sync_date, "%Y-%m-%d")
-        lookback_date = (last_date_obj - timedelta(days=7)).strftime("%Y-%m-%d")
-        
-        print(f"🗓️  Last sync date: {last_sync_date}")
-        print(f"🔙 Looking back 7 days to: {lookback_date} (Safe overlap window)")
+        if args.remap:
+            with report.stage("load"):
+                manifest, _ = load_existing_data()
+            report.status = remap_store(manifest, report)
+            return
+
+        # 1. Load existing state (the entry database is rebuilt here if it lags the store)
+        with report.stage("load") as load:
+            manifest, last_sync_date = load_existing_data()
+            state = sync_state(manifest)
+            db = open_entry_db(manifest)
+            last_sync_date = db.max_date() or last_sync_date
+            load["rows"] = manifest["recordCount"] if manifest else 0
+        if manifest and manifest.get("mappingHash") != mapping_hash():
+            print("⚠️ Persona mappings differ from the ones the stored entries were derived with. "
+                  "Run with --remap to update the history.")
+
+        # Every page is upserted into one transaction; only the partitions it touches are read
+        merge = DatabaseMerge(db)
         
-        new_raw_entries = fetch_time_entries(lookback_date)
+        # 2. Fetch changed data
+        # With a high-water mark only entries edited since the last run are pulled
+        # (usually a single empty page on quiet days). Without one (first run) we
+        # look back 7 days to cover "forgot to log last week" scenarios.
+        if state.get("updatedSince"):
+            print(f"🔖 High-water mark: entries updated since {state['updatedSince']}")
+            query = {"updated_since": state["updatedSince"]}
+        else:
+            last_date_obj = datetime.strptime(last_sync_date, "%Y-%m-%d")
+            lookback_date = (last_date_obj - timedelta(days=LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+            print(f"🗓️  Last sync date: {last_sync_date}")
+            print(f"🔙 No high-water mark yet. Looking back {LOOKBACK_DAYS} days to: {lookback_date}")
+            query = {"from_date": lookback_date}
+        report.context["query"] = query
+
+        # 3. Transform & Merge each page as it arrives (overlaps with the remaining downloads)
+        fetched = 0
+        for entries in report.timed_iter("fetch", fetch_pages(**query)):
+            fetched += len(entries)
+            report.count("fetch", rows=len(entries), pages=1)
+            mark = high_water_mark(entries, state.get("updatedSince"))
+            if mark:
+                state["updatedSince"] = mark
+            with report.stage("transform", rows=len(entries)):
+                page_df = transform_api_data(entries, verbose=False)
+            with report.stage("merge", rows=len(page_df)):
+                merge.add(page_df)
+
+        # 4. Periodic ID reconciliation (updated_since never reports deletions)
+        deleted_ids = set()
+        if manifest is not None and (args.reconcile or reconciliation_due(state)):
+            with report.stage("reconcile") as reconcile:
+                stored_ids = db.ids()
+                windows, cursor = reconcile_windows(stored_ids, state)
+                print("🔍 Reconciling stored IDs with Harvest: "
+                      + ", ".join(f"{start}..{end}" for start, end in windows))
+                deleted_ids = find_deleted_ids(stored_ids, fetch_pages, windows, merge.new_ids)
+                state["lastReconciledAt"] = datetime.now().isoformat(timespec="seconds")
+                if cursor:
+                    state["reconcileBefore"] = cursor
+                else:
+                    state.pop("reconcileBefore", None)
+                print(f"   - Deleted in Harvest: {len(deleted_ids)}")
+                merge.delete(deleted_ids)
+                reconcile["deleted"] = len(deleted_ids)
         
-        if not new_raw_entries:
-            print("✨ No new data found. Sync complete.")
-            return
+        changed_keys = []
+        if fetched or deleted_ids:
+            with report.stage("merge"):
+                final_records = merge.finish()
+                changed_keys, final_records = changed_partitions(merge, final_records)
 
-        # 3. Transform
-        new_df = transform_api_data(new_raw_entries)
+        # Nothing new, or only entries identical to the stored ones: no entry files,
+        # index, rollups or generatedAt are rewritten, so the workflow has nothing to commit
+        if not changed_keys:
+            merge.rollback()
+            if sync_state_changed(sync_state(manifest), state):
+                with report.stage("save"):
+                    manifest = save_data([], manifest, sync=state)
+                    db.set_meta("generatedAt", manifest["generatedAt"])
+            report.status = "no-changes"
+            if fetched:
+                print(f"✨ {fetched} fetched entries match the stored data. Nothing to write.")
+            else:
+                print("✨ No changes found. Sync complete.")
+            return
         
-        # 4. Merge & Deduplicate
-        final_records = merge_and_deduplicate(existing_entries, new_df)
+        # 5. Export (rewrites only the partitions whose entries changed, then the manifest with
+        # the new mark) and commit the database transaction stamped with that manifest
+        previous_hash = source_hash(manifest) if manifest else None
+        with report.stage("save", rows=len(final_records), partitions=len(changed_keys)):
+            # A store created by this run was derived entirely with the current mappings
+            manifest = save_data(final_records, manifest, changed_keys, sync=state,
+                                 mapping=None if manifest else mapping_hash())
+            merge.commit(manifest["generatedAt"])
+        report.context["recordCount"] = manifest["recordCount"]
         
-        # 5. Save
-        save_data(final_records)
+        # 6. Rollups (aggregate cubes the dashboard loads instead of raw entries)
+        with report.stage("rollups"):
+            write_rollups(STORE_DIR, ROLLUP_DIR, DASHBOARD_DATA_DIR / ROLLUP_DIR.name)
+        # 7. Clock-time series for the Work and Sleep pages
+        with report.stage("intervals"):
+            write_intervals(STORE_DIR, ROLLUP_DIR, DASHBOARD_DATA_DIR / ROLLUP_DIR.name)
+        # 8. Activity streaks: only the dates this run touched are re-read
+        with report.stage("streaks"):
+            write_streaks(STORE_DIR, ROLLUP_DIR, DASHBOARD_DATA_DIR / ROLLUP_DIR.name,
+                          window=merge.date_window, previous_hash=previous_hash)
+        # 9. Validation: overlapping entries / unlogged gaps (reported; they do not fail the sync)
+        with report.stage("validate", rows=manifest["recordCount"]) as validate:
+            issues = check_intervals(manifest)
+            validate["overlaps"] = len(issues["overlaps"]["date"])
+            validate["gaps"] = len(issues["gaps"]["date"])
+        report.status = "ok"
         print("🚀 Sync successfully completed!")
         
     except Exception as e:
+        report.status = "failed"
+        report.context["error"] = str(e)
         print(f"💥 Sync Failed: {e}")
+        if checkpoints:
+            print(f"   Fetched pages are kept in {CHECKPOINT_DIR}; the next run resumes from them.")
         exit(1)
+    finally:
+        if db is not None:
+            db.close()  # Rolls back a transaction that was not committed
+        replayed = sum(len(checkpoint.replayed) for checkpoint in checkpoints)
+        if replayed:
+            report.context["replayedPages"] = replayed
+        if checkpoints and report.status in ("ok", "no-changes"):
+            clear_checkpoints(CHECKPOINT_DIR)
+        try:
+            report.write(RUN_REPORT_FILE)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not write run report: {e}")
 
 if __name__ == "__main__":
     main()
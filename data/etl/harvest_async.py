@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Async Harvest Client
+--------------------------------------
+asyncio/aiohttp alternative to harvest_api_sync.fetch_time_entries, selected
+with `python harvest_api_sync.py --client async`.
+
+- One keep-alive connection pool for the whole fetch
+- Page requests are pipelined: once page 1 reports total_pages a window of
+  page requests is kept in flight, bounded by the limiter below
+- AdaptiveLimiter: rolling window for Harvest's request budget plus a
+  concurrency window that halves on 429 (and waits Retry-After) and grows
+  back one slot at a time while requests succeed
+- Connection errors and 5xx responses retry with exponential backoff + jitter
+  (MAX_RETRIES / BASE_DELAY)
+- Pages are spilled to / replayed from the same fetch checkpoint as the
+  thread client (fetch_checkpoint.py)
+"""
+
+import asyncio
+import queue
+import threading
+from collections import deque
+from itertools import islice
+
+import aiohttp
+
+import harvest_api_sync as api
+
+ASYNC_CONCURRENCY = 8  # Upper bound on in-flight page requests
+
+
+class AdaptiveLimiter:
+    """
+    asyncio rate limiter driven by Harvest's responses.
+
+    At most `capacity` requests go out in any `period` seconds
+    (api.RequestWindow), and at most `limit` are in flight.
+    release(throttled_for=...) after a 429 halves the concurrency window and
+    blocks everyone for Retry-After; each successful release widens it again
+    (additive increase, multiplicative decrease).
+    """
+
+    def __init__(self, max_concurrency=ASYNC_CONCURRENCY,
+                 capacity=api.RATE_LIMIT_REQUESTS, period=api.RATE_LIMIT_PERIOD):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.limit = float(self.max_concurrency)
+        self.window = api.RequestWindow(capacity, period)
+        self.in_flight = 0
+        self.resume_at = 0.0
+        self.throttled = 0  # 429 responses seen (for reporting)
+        self.waited = 0.0
+        self.cond = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait for a concurrency slot and a token."""
+        loop = asyncio.get_running_loop()
+        async with self.cond:
+            while True:
+                now = loop.time()
+                if self.in_flight < int(self.limit):
+                    delay = max(self.resume_at - now, self.window.wait_time(now))
+                    if delay <= 0:
+                        self.window.record(now)
+                        self.in_flight += 1
+                        return
+                else:
+                    delay = None  # Woken by release()
+
+                start = loop.time()
+                try:
+                    await asyncio.wait_for(self.cond.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                self.waited += loop.time() - start
+
+    async def release(self, throttled_for=None):
+        """Return a slot; pass the Retry-After seconds if the request was throttled."""
+        loop = asyncio.get_running_loop()
+        async with self.cond:
+            self.in_flight -= 1
+            if throttled_for is not None:
+                self.throttled += 1
+                self.limit = max(1.0, self.limit / 2)
+                self.resume_at = max(self.resume_at, loop.time() + throttled_for)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.cond.notify_all()
+
+
+async def fetch_page(session, params, page, limiter, stats=None):
+    """Fetch one page; 429s wait for Retry-After, errors back off up to MAX_RETRIES."""
+    attempt = 0
+    while True:
+        await limiter.acquire()
+        throttled_for = None
+        start = asyncio.get_running_loop().time()
+        try:
+            async with session.get(api.HARVEST_API_URL, params={**params, "page": page}) as response:
+                if response.status == 429:
+                    throttled_for = float(response.headers.get("Retry-After", api.RATE_LIMIT_PERIOD))
+                    print(f"⚠️ Rate limited on page {page}. Waiting {throttled_for:g}s...")
+                    if stats:
+                        stats.record_retry(throttled=True)
+                    continue
+                if response.status < 500:
+                    response.raise_for_status()
+                    data = await response.json()
+                    if stats:
+                        stats.record_page(asyncio.get_running_loop().time() - start)
+                    return data
+                error = aiohttp.ClientResponseError(
+                    response.request_info, response.history,
+                    status=response.status, message="Server Error"
+                )
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            error = e
+        finally:
+            await limiter.release(throttled_for)
+
+        if attempt >= api.MAX_RETRIES:
+            raise error
+        if stats:
+            stats.record_retry()
+        delay = api.backoff_delay(attempt)
+        attempt += 1
+        print(f"⚠️ Page {page} failed ({error!r}). Retry {attempt}/{api.MAX_RETRIES} in {delay:.1f}s...")
+        await asyncio.sleep(delay)
+
+
+async def fetch_pages_async(emit, from_date=None, concurrency=ASYNC_CONCURRENCY, updated_since=None,
+                            stats=None, checkpoint=None, to_date=None):
+    """
+    Fetch every page and pass each page's entries to `emit` in page order.
+
+    Once page 1 reports total_pages, up to 2 * `concurrency` page requests
+    are kept in flight (the limiter decides how many actually run), so pages
+    are emitted while later ones are still downloading. `stats`
+    (instrumentation.FetchStats) collects latencies and limiter waits.
+    `checkpoint` (fetch_checkpoint.PageCheckpoint) spills and replays pages.
+    """
+    headers = api.get_auth_headers()
+    params = api.time_entry_params(from_date, updated_since, to_date)
+    if checkpoint:
+        params = checkpoint.open(params)
+    limiter = AdaptiveLimiter(concurrency)
+    total = 0
+
+    print(f"🔄 Fetching data from Harvest {api.describe_query(params)} "
+          f"(async, up to {limiter.max_concurrency} in flight)...")
+
+    async def deliver(page, data):
+        nonlocal total
+        entries = data.get("time_entries", [])
+        total += len(entries)
+        print(f"  - Page {page}: Fetched {len(entries)} entries")
+        await emit(entries)
+
+    connector = aiohttp.TCPConnector(limit=limiter.max_concurrency)
+    try:
+        async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
+
+            async def get_page(page, replay=True):
+                data = checkpoint.load(page) if checkpoint and replay else None
+                if data is None:
+                    data = await fetch_page(session, params, page, limiter, stats)
+                    if checkpoint:
+                        checkpoint.save(page, data)
+                return data
+
+            async def fetch_all(replay=True):
+                data = await get_page(1, replay)
+                await deliver(1, data)
+
+                total_pages = data.get("total_pages")
+                if total_pages:
+                    pages = iter(range(2, total_pages + 1))
+                    spawn = lambda page: (page, asyncio.ensure_future(get_page(page, replay)))
+                    pending = deque(spawn(page) for page in islice(pages, 2 * limiter.max_concurrency))
+                    try:
+                        while pending:
+                            page, task = pending.popleft()
+                            data = await task
+                            next_page = next(pages, None)
+                            if next_page is not None:
+                                pending.append(spawn(next_page))
+                            await deliver(page, data)
+                    except Exception:
+                        # Let the requests already in flight land in the checkpoint
+                        if checkpoint:
+                            await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+                        raise
+                    finally:
+                        for _, task in pending:
+                            task.cancel()
+                else:
+                    # No page count in the response: follow next_page links one at a time
+                    while data.get("next_page"):
+                        page = data["next_page"]
+                        data = await get_page(page, replay)
+                        await deliver(page, data)
+
+            await fetch_all()
+            # Page boundaries moved since the checkpoint: fetch everything again from a
+            # fresh page 1, so pages past the old total_pages are requested too
+            if checkpoint and checkpoint.restart():
+                await fetch_all(replay=False)
+
+    except aiohttp.ClientError as e:
+        print(f"❌ API Error: {e}")
+        raise
+
+    if checkpoint and checkpoint.replayed:
+        print(f"♻️  Replayed {len(checkpoint.replayed)} pages from the checkpoint (no API requests)")
+    if limiter.throttled:
+        print(f"⏳ Throttled {limiter.throttled}x, concurrency settled at {int(limiter.limit)}")
+    if stats:
+        stats.record_wait(limiter.waited)
+    print(f"✅ Total fetched: {total} entries")
+
+
+def iter_time_entry_pages(from_date=None, concurrency=ASYNC_CONCURRENCY, updated_since=None, stats=None,
+                          checkpoint=None, to_date=None):
+    """
+    Blocking page iterator (same contract as harvest_api_sync.iter_time_entry_pages).
+
+    The event loop runs in a background thread and hands pages over through a
+    small queue, so the caller's processing overlaps with the downloads.
+    """
+    pages = queue.Queue(maxsize=2)
+    done = object()
+
+    def run():
+        async def emit(entries):
+            await asyncio.get_running_loop().run_in_executor(None, pages.put, entries)
+        try:
+            asyncio.run(fetch_pages_async(emit, from_date, concurrency, updated_since, stats, checkpoint,
+                                          to_date))
+        except BaseException as e:
+            pages.put(e)
+        else:
+            pages.put(done)
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    while True:
+        item = pages.get()
+        if item is done:
+            break
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+    worker.join()
+
+
+def fetch_time_entries(from_date=None, concurrency=ASYNC_CONCURRENCY, updated_since=None):
+    """Blocking wrapper so the sync script can swap clients with a flag."""
+    entries = []
+
+    async def emit(page):
+        entries.extend(page)
+
+    asyncio.run(fetch_pages_async(emit, from_date, concurrency, updated_since))
+    return entries
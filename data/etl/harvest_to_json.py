@@ -7,23 +7,36 @@ Replicates ALL QuickSight transformation logic to eliminate QuickSight dependenc
 
 Usage:
     python harvest_to_json.py
+    python harvest_to_json.py --workers 4   # transform year chunks across 4 processes
     
 Input:
     ../seedfiles/harvest_time_report_from2015-07-06to2022-07-31.xlsx
 
 Output:
-    ../data/processed/timeentries_harvest.json
+    ../data/processed/timeentries_harvest/  (year-partitioned store, read by the dashboard and the API sync)
+    ../data/processed/rollups/              (aggregate cubes, see rollups.py; intervals.json / streaks.json)
 """
 
 import pandas as pd
+import numpy as np
+import argparse
+import hashlib
 import json
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import re
+from partition_store import write_partitions
+from rollups import write_rollups
+from intervals import write_intervals
+from streaks import write_streaks
+from seed_cache import read_seed_excel
 
 # Configuration
 INPUT_FILE = Path(__file__).parent.parent.parent / "seedfiles" / "harvest_time_report.xlsx"
-OUTPUT_FILE = Path(__file__).parent.parent / "processed" / "timeentries_harvest.json"
+STORE_DIR = Path(__file__).parent.parent / "processed" / "timeentries_harvest"
+ROLLUP_DIR = Path(__file__).parent.parent / "processed" / "rollups"
+COMPACT_EXPORT = True  # Also write each partition dictionary-encoded for the dashboard (compact_store.py)
 
 
 # ============================================
@@ -163,6 +176,23 @@ DAY_OF_WEEK_MAPPING = {
 MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
 
 
+# Columns derived from Task / Notes through the tables above
+PERSONA_COLUMNS = [
+    'normalisedTask', 'prioritisedPersona', 'metaWorkLife', 'personaTier2',
+    'socialContext', 'socialEntity', 'meTimeBreakdown', 'commuteContext',
+]
+
+
+def mapping_hash() -> str:
+    """sha256 over every table PERSONA_COLUMNS are derived from (stored in the manifest)."""
+    tables = [
+        TASK_NORMALIZATION, PERSONA_MAPPING, META_WORK_LIFE_MAPPING, PERSONA_TIER2_MAPPING,
+        ME_TIME_BREAKDOWN_MAPPING, SOCIAL_CONTEXT_KEYWORDS, SOCIAL_ENTITY_KEYWORDS,
+    ]
+    # Keyword lists are first-match-wins, so their order is part of the hash
+    text = json.dumps(tables, ensure_ascii=False)
+    return f"sha256:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
 # ============================================
 # TRANSFORMATION FUNCTIONS
 # ============================================
@@ -265,62 +295,245 @@ def clean_notes(notes) -> str:
     return str(notes)
 
 
+# ============================================
+# VECTORIZED TRANSFORMATIONS
+# ============================================
+
+WEEKEND_DAYS = ['_06 Saturday', '_07 Sunday']
+
+
+def _map_unique(values: pd.Series, func) -> pd.Series:
+    """Apply a scalar mapping once per distinct value and broadcast it back."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    mapped = np.array([func(value) for value in uniques], dtype=object)
+    return pd.Series(mapped[codes], index=values.index, dtype=object)
+
+
+# Date-derived entry columns, held once per day in the calendar dimension
+CALENDAR_COLUMNS = ['year', 'month', 'day', 'isoDate', 'monthName', 'monthNum', 'weekNum', 'dayOfWeek', 'typeOfDay']
+
+_calendar = None  # Memoized by calendar_for() for the life of the process
+EPOCH = pd.Timestamp('1970-01-01')  # One-day calendar for frames without any date
+
+
+def build_calendar(start, end) -> pd.DataFrame:
+    """One row per day from `start` to `end` (DatetimeIndex) with the CALENDAR_COLUMNS."""
+    days = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq='D')
+    calendar = pd.DataFrame(index=days)
+    calendar['year'] = days.year
+    calendar['month'] = days.month
+    calendar['day'] = days.day
+    calendar['isoDate'] = days.strftime('%Y-%m-%d')
+    calendar['monthName'] = calendar['month'].map(dict(enumerate(MONTH_NAMES, start=1)))
+    calendar['monthNum'] = days.month
+    calendar['weekNum'] = days.isocalendar().week.astype('int64')
+    calendar['dayOfWeek'] = calendar.index.weekday.map(DAY_OF_WEEK_MAPPING)
+    calendar['typeOfDay'] = np.where(calendar['dayOfWeek'].isin(WEEKEND_DAYS), 'Weekend', 'Weekday')
+    return calendar
+
+
+def calendar_for(start, end) -> pd.DataFrame:
+    """The memoized calendar, rebuilt only when [start, end] falls outside it."""
+    global _calendar
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    if _calendar is None or start < _calendar.index[0] or end > _calendar.index[-1]:
+        if _calendar is not None:
+            start, end = min(start, _calendar.index[0]), max(end, _calendar.index[-1])
+        _calendar = build_calendar(start, end)
+    return _calendar
+
+
+def apply_calendar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add 'date' and the CALENDAR_COLUMNS by joining the raw 'Date' column on the
+    calendar dimension: dates are parsed and looked up once per distinct day
+    (entries average ~10 per day), then broadcast back to the rows. Rows
+    without a date (NaT) get missing calendar fields.
+    """
+    codes, uniques = pd.factorize(df['Date'], use_na_sentinel=False)
+    dates = pd.DatetimeIndex(pd.to_datetime(uniques))
+    known = dates.dropna()
+    calendar = calendar_for(known.min(), known.max()) if len(known) else build_calendar(EPOCH, EPOCH)
+    rows = calendar.index.get_indexer(dates.normalize())[codes]  # -1 for NaT
+
+    df['date'] = pd.Series(dates[codes], index=df.index)
+    for column in CALENDAR_COLUMNS:
+        df[column] = pd.Series(calendar[column].array.take(rows, allow_fill=True), index=df.index)
+    return df
+
+
+def _blank_notes(notes: pd.Series) -> pd.Series:
+    """Vectorized `not notes or pd.isna(notes)`."""
+    return ~notes.astype(object).fillna('').astype(bool)
+
+
+class KeywordMatcher:
+    """
+    Precompiled first-match-wins classifier over (keyword, label) pairs.
+
+    All keywords are compiled into a single lookahead alternation, so one scan
+    of a note reports every keyword occurrence. At each position the regex tries
+    the keywords in priority order; taking the lowest rank over all positions
+    reproduces the linear "first keyword in the list wins" scan.
+    """
+
+    def __init__(self, keyword_pairs):
+        self.ranks = {}
+        self.labels = []
+        for keyword, label in keyword_pairs:
+            keyword = keyword.lower()
+            if keyword not in self.ranks:
+                self.ranks[keyword] = len(self.labels)
+                self.labels.append(label)
+        alternation = '|'.join(re.escape(keyword) for keyword in self.ranks)
+        self.pattern = re.compile(f'(?=({alternation}))') if self.ranks else None
+
+    def match(self, notes_lower: str):
+        """Return the label for a single lowercased note, or None."""
+        if self.pattern is None:
+            return None
+        ranks = [self.ranks[keyword] for keyword in self.pattern.findall(notes_lower)]
+        return self.labels[min(ranks)] if ranks else None
+
+    def classify(self, notes_lower: pd.Series) -> pd.Series:
+        """Return the label for every lowercased note in one pass (None if no match)."""
+        result = np.full(len(notes_lower), None, dtype=object)
+        if self.pattern is not None and len(notes_lower):
+            # extractall yields one row per keyword occurrence, keyed by position
+            matches = notes_lower.reset_index(drop=True).str.extractall(self.pattern)[0]
+            if not matches.empty:
+                best = matches.map(self.ranks).groupby(level=0).min()
+                result[best.index.to_numpy()] = np.array(self.labels, dtype=object)[best.to_numpy()]
+        return pd.Series(result, index=notes_lower.index, dtype=object)
+
+
+SOCIAL_CONTEXT_MATCHER = KeywordMatcher(
+    (keyword, context)
+    for context, keywords in SOCIAL_CONTEXT_KEYWORDS.items()
+    for keyword in keywords
+)
+SOCIAL_ENTITY_MATCHER = KeywordMatcher(SOCIAL_ENTITY_KEYWORDS)
+
+
+def _classify_social(persona_tier2, notes_lower, blank, matcher, default):
+    """Vectorized body shared by get_social_context and get_social_entity."""
+    social = (persona_tier2 == 'Social').to_numpy()
+    result = np.where(social, default, None)
+
+    candidates = social & ~blank.to_numpy()
+    if candidates.any():
+        matched = matcher.classify(notes_lower[candidates]).to_numpy()
+        result[candidates] = np.where(pd.notna(matched), matched, default)
+    return pd.Series(result, index=persona_tier2.index, dtype=object)
+
+
+def apply_persona_mappings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derive the PERSONA_COLUMNS from the raw 'Task' and 'Notes' columns.
+
+    These are the only columns that depend on the mapping tables (see
+    mapping_hash); remap.py re-runs just this step over stored history.
+    """
+    notes = df['Notes']
+
+    # Task normalization and persona mappings
+    df['normalisedTask'] = _map_unique(df['Task'], normalise_task)
+    df['prioritisedPersona'] = _map_unique(df['normalisedTask'], get_prioritised_persona)
+    df['metaWorkLife'] = _map_unique(df['prioritisedPersona'], get_meta_work_life)
+    df['personaTier2'] = _map_unique(df['normalisedTask'], get_persona_tier2)
+
+    # Social context / entity (only for Social persona)
+    blank = _blank_notes(notes)
+    notes_lower = notes.astype(str).str.lower()
+    df['socialContext'] = _classify_social(
+        df['personaTier2'], notes_lower, blank,
+        SOCIAL_CONTEXT_MATCHER, 'Personal-Nurturing Relationships'
+    )
+    df['socialEntity'] = _classify_social(
+        df['personaTier2'], notes_lower, blank,
+        SOCIAL_ENTITY_MATCHER, 'General-Nurturing Relationships'
+    )
+
+    # Me Time breakdown
+    breakdown = _map_unique(df['normalisedTask'], ME_TIME_BREAKDOWN_MAPPING.get)
+    df['meTimeBreakdown'] = pd.Series(
+        np.where(df['personaTier2'] == 'Me Time', breakdown, None), index=df.index, dtype=object
+    )
+
+    # Commute context (only for Work)
+    commuting = ~blank & notes_lower.str.contains('commute', regex=False, na=False)
+    commute = np.where(commuting, 'commuting', 'working')
+    df['commuteContext'] = pd.Series(
+        np.where(df['personaTier2'] == 'Work Time', commute, None), index=df.index, dtype=object
+    )
+
+    return df
+
+
+def apply_transformations(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derive all QuickSight columns column-at-a-time.
+
+    Expects the raw 'Date', 'Task' and 'Notes' columns and adds the same derived
+    columns (with the same values) as the row-wise functions above. Mapping
+    lookups and date derivations run once per distinct value rather than once
+    per row.
+    """
+    notes = df['Notes']
+
+    # Parsed date and date components, joined from the calendar dimension
+    apply_calendar(df)
+
+    # Task normalization, persona mappings and note classifiers
+    apply_persona_mappings(df)
+
+    # Clean notes
+    missing = notes.isna() | notes.astype(object).eq('')
+    df['notesClean'] = pd.Series(
+        np.where(missing, None, notes.astype(str)), index=df.index, dtype=object
+    )
+
+    return df
+
+
+def transform_frame(df: pd.DataFrame, workers: int = 1) -> pd.DataFrame:
+    """
+    apply_transformations() on one core, or on year chunks across `workers`
+    processes. Every row is derived independently, so the parallel result
+    (values, dtypes and row order) is identical to the serial one.
+    """
+    # Rows without a date (NaN year) form a chunk of their own
+    codes, chunk_years = pd.factorize(pd.to_datetime(df['Date']).dt.year, use_na_sentinel=False)
+    if workers <= 1 or len(chunk_years) < 2:
+        return apply_transformations(df)
+
+    positions = [rows for rows in (np.flatnonzero(codes == code) for code in range(len(chunk_years))) if len(rows)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(positions))) as pool:
+        chunks = list(pool.map(apply_transformations, (df.iloc[rows] for rows in positions)))
+
+    # Chunks come back in submission order; put every row back where it was
+    merged = pd.concat(chunks)
+    return merged.iloc[np.argsort(np.concatenate(positions), kind='stable')]
+
+
 # ============================================
 # MAIN ETL FUNCTION
 # ============================================
 
-def convert_harvest_to_json():
+def convert_harvest_to_json(workers=1):
     """Main conversion function - replicates QuickSight transformations."""
     print(f"Reading: {INPUT_FILE}")
-    df = pd.read_excel(INPUT_FILE)
+    df = read_seed_excel(INPUT_FILE)
     print(f"Loaded {len(df)} rows")
     print(f"Date range: {df['Date'].min()} to {df['Date'].max()}")
     
     # Apply transformations
-    print("\nApplying transformations...")
-    
-    # Parse date
-    df['date'] = pd.to_datetime(df['Date'])
-    
-    # Date components
-    df['year'] = df['date'].dt.year
-    df['month'] = df['date'].dt.month
-    df['day'] = df['date'].dt.day
-    df['isoDate'] = df['date'].dt.strftime('%Y-%m-%d')
-    df['monthName'] = df['date'].dt.month.apply(lambda m: MONTH_NAMES[m - 1])
-    df['monthNum'] = df['date'].dt.month
-    df['weekNum'] = df['date'].apply(get_week_num)
-    df['dayOfWeek'] = df['date'].apply(get_tx_day)
-    df['typeOfDay'] = df['dayOfWeek'].apply(get_type_of_day)
-    
-    # Task normalization
-    df['normalisedTask'] = df['Task'].apply(normalise_task)
-    
-    # Persona mappings
-    df['prioritisedPersona'] = df['normalisedTask'].apply(get_prioritised_persona)
-    df['metaWorkLife'] = df['prioritisedPersona'].apply(get_meta_work_life)
-    df['personaTier2'] = df['normalisedTask'].apply(get_persona_tier2)
-    
-    # Social context (only for Social persona)
-    df['socialContext'] = df.apply(
-        lambda row: get_social_context(row['personaTier2'], row['Notes']), axis=1
-    )
-    df['socialEntity'] = df.apply(
-        lambda row: get_social_entity(row['personaTier2'], row['Notes']), axis=1
-    )
-    
-    # Me Time breakdown
-    df['meTimeBreakdown'] = df.apply(
-        lambda row: get_me_time_breakdown(row['personaTier2'], row['normalisedTask']), axis=1
-    )
-    
-    # Commute context (only for Work)
-    df['commuteContext'] = df.apply(
-        lambda row: get_commute_context(row['personaTier2'], row['Notes']), axis=1
-    )
+    if workers > 1:
+        print(f"\nApplying transformations (year chunks across {workers} processes)...")
+    else:
+        print("\nApplying transformations...")
     
-    # Clean notes
-    df['notesClean'] = df['Notes'].apply(clean_notes)
+    df = transform_frame(df, workers)
     
     # Handle Started At / Ended At (may be null in early data)
     df['startedAt'] = df['Started At'].apply(lambda x: str(x) if pd.notna(x) else None)
@@ -380,14 +593,21 @@ def convert_harvest_to_json():
         "entries": records
     }
     
-    # Write JSON
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(output, f, indent=2, default=str)
-    
-    print(f"\n✅ Exported {len(records)} records to {OUTPUT_FILE}")
+    print(f"\n✅ Transformed {len(records)} records")
     print(f"Date range: {output['metadata']['dateRange']['start']} to {output['metadata']['dateRange']['end']}")
     
+    # Rebuild the year-partitioned store (full rewrite, newest first like the API sync)
+    store_metadata = {
+        key: output['metadata'][key] for key in ('generatedAt', 'source', 'etlVersion', 'note')
+    }
+    store_metadata['mappingHash'] = mapping_hash()
+    records.sort(key=lambda r: r['date'], reverse=True)
+    manifest, _ = write_partitions(STORE_DIR, None, records, [], store_metadata, compact=COMPACT_EXPORT)
+    print(f"✅ Rebuilt {len(manifest['partitions'])} year partitions in {STORE_DIR}")
+    write_rollups(STORE_DIR, ROLLUP_DIR)
+    write_intervals(STORE_DIR, ROLLUP_DIR)
+    write_streaks(STORE_DIR, ROLLUP_DIR)
+    
     # Validation: Check for ERROR values
     error_count = df_output[df_output['prioritisedPersona'] == 'ERROR'].shape[0]
     if error_count > 0:
@@ -415,4 +635,7 @@ def convert_harvest_to_json():
 
 
 if __name__ == "__main__":
-    convert_harvest_to_json()
+    parser = argparse.ArgumentParser(description="Convert the Harvest XLSX export to the Personametry JSON store")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for the row transformations, one year chunk each (default: 1, serial)")
+    convert_harvest_to_json(workers=parser.parse_args().workers)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Run Instrumentation
+-------------------------------------
+Structured per-stage metrics for the sync pipeline, appended as one JSON line
+per run (data/processed/sync_runs.jsonl) and echoed to the log.
+
+- RunReport.stage(name) is a context manager recording wall time, CPU time,
+  peak RSS and RSS growth; re-entering a stage accumulates (the streaming
+  pipeline alternates fetch / transform / merge once per page)
+- RunReport.timed_iter(name, iterable) charges the time spent waiting for
+  each item to a stage (e.g. API pages)
+- FetchStats collects per-page API latency, rate-limiter waits and 429s from
+  the HTTP clients (thread-safe)
+"""
+
+import json
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+RUN_REPORT_PREFIX = "📈 RUN_REPORT "  # Log lines carrying the JSON report (grep-able in CI logs)
+
+
+def peak_rss_mb():
+    """Process peak resident set size (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class FetchStats:
+    """API-side counters filled in by the fetch clients."""
+
+    def __init__(self):
+        self.latencies = []  # Seconds per successful page request
+        self.rate_limit_wait = 0.0
+        self.throttled = 0
+        self.retries = 0
+        self.lock = threading.Lock()
+
+    def record_page(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def record_retry(self, throttled=False):
+        with self.lock:
+            if throttled:
+                self.throttled += 1
+            else:
+                self.retries += 1
+
+    def record_wait(self, seconds):
+        with self.lock:
+            self.rate_limit_wait += seconds
+
+    def to_dict(self):
+        latencies = sorted(self.latencies)
+        summary = {
+            "pages": len(latencies),
+            "rateLimitWaitSeconds": round(self.rate_limit_wait, 3),
+            "throttled": self.throttled,
+            "retries": self.retries,
+        }
+        if latencies:
+            summary["pageLatencyMs"] = {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 1),
+                "p50": round(_percentile(latencies, 0.5) * 1000, 1),
+                "p95": round(_percentile(latencies, 0.95) * 1000, 1),
+                "max": round(latencies[-1] * 1000, 1),
+            }
+        return summary
+
+
+class RunReport:
+    """Metrics for one pipeline run, keyed by stage name (in first-entered order)."""
+
+    def __init__(self, run, **context):
+        self.run = run
+        self.context = context
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.stages = {}
+        self.status = "running"
+        self.fetch = FetchStats()
+
+    def _stage(self, name):
+        return self.stages.setdefault(name, {
+            "wallSeconds": 0.0, "cpuSeconds": 0.0, "calls": 0, "rssGrowthMb": 0.0,
+        })
+
+    @contextmanager
+    def stage(self, name, **counters):
+        """Time a block; the yielded dict accumulates counters (rows=..., pages=...)."""
+        stats = self._stage(name)
+        for key, value in counters.items():
+            stats[key] = stats.get(key, 0) + value
+        rss_before = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stats
+        finally:
+            stats["wallSeconds"] += time.perf_counter() - wall
+            stats["cpuSeconds"] += time.process_time() - cpu
+            stats["calls"] += 1
+            stats["peakRssMb"] = peak_rss_mb()
+            stats["rssGrowthMb"] += stats["peakRssMb"] - rss_before
+
+    def count(self, name, **counters):
+        """Add counters to a stage without timing anything."""
+        stats = self._stage(name)
+        for key, value in counters.items():
+            stats[key] = stats.get(key, 0) + value
+
+    def timed_iter(self, name, iterable):
+        """Yield from `iterable`, charging the wait for each item to stage `name`."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def to_dict(self):
+        stages = {}
+        for name, stats in self.stages.items():
+            stats = dict(stats)
+            for key in ("wallSeconds", "cpuSeconds"):
+                stats[key] = round(stats[key], 4)
+            for key in ("peakRssMb", "rssGrowthMb"):
+                if key in stats:
+                    stats[key] = round(stats[key], 1)
+            rows = stats.get("rows")
+            if rows and stats["wallSeconds"]:
+                stats["rowsPerSecond"] = round(rows / stats["wallSeconds"])
+            stages[name] = stats
+        return {
+            "run": self.run,
+            "startedAt": self.started_at,
+            "finishedAt": datetime.now().isoformat(timespec="seconds"),
+            "status": self.status,
+            **self.context,
+            "wallSeconds": round(time.perf_counter() - self.start_wall, 4),
+            "cpuSeconds": round(time.process_time() - self.start_cpu, 4),
+            "peakRssMb": round(peak_rss_mb(), 1),
+            "stages": stages,
+            "fetch": self.fetch.to_dict(),
+        }
+
+    def write(self, path):
+        """Append the report as one JSON line to `path` and echo it to stdout."""
+        line = json.dumps(self.to_dict(), default=str)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+        print(f"{RUN_REPORT_PREFIX}{line}")
+        return line
+
+
+def load_reports(path):
+    """All run reports in a JSONL file (oldest first)."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Interval Analytics
+------------------------------------
+Precomputes the clock-time series the Work and Sleep pages otherwise derive
+by parsing startedAt / endedAt entry by entry (calculateWorkPatterns, the
+Sleep page's bedtime / wake-up / siesta stats).
+
+Clock strings ("8:05", "08:05:00", "8:05pm") are parsed once per distinct
+value into integer minutes after midnight (-1 = missing), and everything
+below is computed column-at-a-time from those minutes. One file is written
+next to the rollup cubes:
+
+    data/processed/rollups/intervals.json
+      dates                         every day with entries ("YYYY-MM-DD")
+      personas.<persona>            firstStart / lastEnd per date (minutes, null = none)
+      coverage                      overlapMinutes / gapMinutes per date (between timed entries)
+      work.lateDays                 P3 days ending at or after 19:00, by year x weekday and by week
+      sleep.nights                  overnight sleep spans (entries joined across midnight)
+      sleep.siestas                 shorter sleep spans per year
+
+Like the cubes, the file carries no timestamps, so unchanged data rewrites a
+byte-identical file.
+
+find_interval_issues() lists the individual overlapping entries and unlogged
+gaps behind the coverage series (harvest_api_sync.py writes them to
+interval_issues.json after every sync).
+
+Usage (normally run by harvest_api_sync.py / harvest_to_json.py after saving):
+    python intervals.py
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import load_entries_frame
+from json_writer import mirror_file, write_json_atomic
+from partition_store import load_manifest
+from rollups import source_hash
+
+DATA_DIR = Path(__file__).parent.parent / "processed"
+STORE_DIR = DATA_DIR / "timeentries_harvest"
+ROLLUP_DIR = DATA_DIR / "rollups"
+
+INTERVALS_VERSION = 1
+INTERVALS_FILE = "intervals.json"
+COLUMNS = ["date", "year", "weekNum", "dayOfWeek", "typeOfDay", "prioritisedPersona", "startedAt", "endedAt"]
+
+DAY_MINUTES = 24 * 60
+WORK_PERSONA = "P3 Professional"
+SLEEP_PERSONA = "P0 Life Constraints (Sleep)"
+LATE_END_MINUTES = 19 * 60  # calculateWorkPatterns' LATE_THRESHOLD
+NIGHT_SLEEP_MINUTES = 3 * 60  # Longer spans are night sleep, shorter ones siestas (Sleep page heuristic)
+SPAN_JOIN_MINUTES = 1  # Sleep entries this close (e.g. 23:59 -> 00:00) form one span
+GAP_ALERT_MINUTES = 60  # Unlogged time within a day that find_interval_issues() reports
+DAY_NAMES = ['_01 Monday', '_02 Tuesday', '_03 Wednesday', '_04 Thursday', '_05 Friday', '_06 Saturday', '_07 Sunday']
+
+CLOCK = re.compile(r'^\s*(\d{1,2}):(\d{2})(?::\d{2})?\s*([ap]m)?\s*$', re.IGNORECASE)
+
+
+def parse_clock(value) -> int:
+    """Minutes after midnight for a clock string (H:MM, HH:MM:SS, h:mmam/pm), or -1."""
+    match = CLOCK.match(str(value)) if value is not None else None
+    if not match:
+        return -1
+    hour, minute, suffix = int(match.group(1)), int(match.group(2)), match.group(3)
+    if suffix:
+        hour = hour % 12 + (12 if suffix.lower() == 'pm' else 0)
+    if minute > 59 or hour * 60 + minute > DAY_MINUTES:
+        return -1
+    return hour * 60 + minute
+
+
+def clock_minutes(values: pd.Series) -> np.ndarray:
+    """parse_clock() over a column, once per distinct value."""
+    codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=False)
+    minutes = np.array([parse_clock(None if pd.isna(value) else value) for value in uniques], dtype=np.int32)
+    return minutes[codes] if len(codes) else np.empty(0, dtype=np.int32)
+
+
+def interval_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The entries with parsed 'start' / 'end' minutes, plus absolute 'absStart' /
+    'absEnd' minutes since 1970-01-01 for timed entries (an end before the start
+    runs past midnight). Untimed entries have absStart / absEnd = -1.
+    """
+    out = df.copy()
+    out['start'] = clock_minutes(df['startedAt'])
+    out['end'] = clock_minutes(df['endedAt'])
+    codes, dates = pd.factorize(df['date'].astype(str))
+    day = pd.to_datetime(dates).to_numpy().astype('datetime64[D]').astype(np.int64)[codes]
+    out['dayNum'] = day
+
+    timed = (out['start'] >= 0).to_numpy() & (out['end'] >= 0).to_numpy()
+    start = day * DAY_MINUTES + out['start'].to_numpy()
+    end = day * DAY_MINUTES + out['end'].to_numpy()
+    end = np.where(end < start, end + DAY_MINUTES, end)
+    out['absStart'] = np.where(timed, start, -1)
+    out['absEnd'] = np.where(timed, end, -1)
+    return out
+
+
+def _day_dates(days) -> pd.DatetimeIndex:
+    """Dates for day numbers since 1970-01-01."""
+    return pd.DatetimeIndex(np.asarray(days, dtype=np.int64).astype('datetime64[D]'))
+
+
+def _minutes_list(values) -> list:
+    return [None if pd.isna(v) else int(v) for v in values]
+
+
+def daily_bounds(frame: pd.DataFrame, dates: list) -> dict:
+    """firstStart / lastEnd clock minutes per date for every persona."""
+    personas = {}
+    persona = frame['prioritisedPersona'].astype(str)
+    starts = frame['start'].where(frame['start'] >= 0)
+    ends = frame['end'].where(frame['end'] >= 0)
+    grouped = pd.DataFrame({'date': frame['date'].astype(str), 'persona': persona, 'start': starts, 'end': ends})
+    bounds = grouped.groupby(['persona', 'date'])[['start', 'end']].agg({'start': 'min', 'end': 'max'})
+    for value in sorted(persona.unique()):
+        rows = bounds.loc[value].reindex(dates)
+        personas[value] = {
+            "firstStart": _minutes_list(rows['start']),
+            "lastEnd": _minutes_list(rows['end']),
+        }
+    return personas
+
+
+def day_sweep(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Timed entries sorted by (day, start) with, for each entry, the furthest end
+    reached by the earlier entries of its day ('reach', NaN for the first) and
+    the row of the entry that reached it ('reachedBy'). One sort, O(n log n),
+    then running maxima: 'overlap' / 'gap' are the minutes the entry overlaps
+    that reach or starts after it.
+    """
+    timed = frame[frame['absStart'] >= 0].sort_values(['dayNum', 'absStart'], kind='stable')
+    day = timed['dayNum']
+    running = timed.groupby(day)['absEnd'].cummax()  # Furthest end so far, this entry included
+    holder = pd.Series(np.where(timed['absEnd'] == running, np.arange(len(timed)), np.nan), index=timed.index)
+    holder = holder.groupby(day).ffill()
+
+    timed = timed.assign(
+        reach=running.groupby(day).shift(),
+        reachedBy=holder.groupby(day).shift(),
+    )
+    timed['overlap'] = (np.minimum(timed['reach'], timed['absEnd']) - timed['absStart']).clip(lower=0).fillna(0)
+    timed['gap'] = (timed['absStart'] - timed['reach']).clip(lower=0).fillna(0)
+    return timed
+
+
+def coverage(frame: pd.DataFrame, dates: list) -> dict:
+    """
+    Minutes per date where timed entries overlap an earlier one, and minutes
+    left unlogged between consecutive timed entries (sorted by start).
+    """
+    sweep = day_sweep(frame)
+    per_day = sweep.groupby(sweep['date'].astype(str))[['overlap', 'gap']].sum().reindex(dates, fill_value=0)
+    return {
+        "overlapMinutes": per_day['overlap'].astype(int).tolist(),
+        "gapMinutes": per_day['gap'].astype(int).tolist(),
+    }
+
+
+def _clock(minutes, day_num) -> list:
+    """"HH:MM" of absolute minutes within their entry's day (past 24:00 if the entry ran over midnight)."""
+    of_day = (np.asarray(minutes, dtype=np.int64) - np.asarray(day_num, dtype=np.int64) * DAY_MINUTES).tolist()
+    return [f"{m // 60:02d}:{m % 60:02d}" for m in of_day]
+
+
+def find_interval_issues(frame: pd.DataFrame, gap_minutes=GAP_ALERT_MINUTES) -> dict:
+    """
+    Overlapping entries and unlogged gaps of at least `gap_minutes` within a
+    day, as column arrays. An overlap pairs each entry with the earlier entry
+    that reaches furthest into it; a gap runs from that reach to the entry's
+    start. Untimed entries are ignored.
+    """
+    sweep = day_sweep(frame)
+    ids = sweep['external_id'].astype(object).where(sweep['external_id'].notna(), None).to_numpy()
+    reached_by = sweep['reachedBy'].fillna(-1).astype(int).to_numpy()
+
+    def issues(mask, start, end, minutes):
+        rows = np.flatnonzero(mask.to_numpy())
+        picked = sweep.iloc[rows]
+        return {
+            "date": picked['date'].astype(str).tolist(),
+            "entry": ids[rows].tolist(),
+            "previous": ids[reached_by[rows]].tolist(),
+            "from": _clock(start.iloc[rows], picked['dayNum']),
+            "to": _clock(end.iloc[rows], picked['dayNum']),
+            "minutes": minutes.iloc[rows].astype(int).tolist(),
+        }
+
+    overlap_end = np.minimum(sweep['reach'], sweep['absEnd'])
+    return {
+        "gapThresholdMinutes": gap_minutes,
+        "overlaps": issues(sweep['overlap'] > 0, sweep['absStart'], overlap_end, sweep['overlap']),
+        "gaps": issues(sweep['gap'] >= gap_minutes, sweep['reach'], sweep['absStart'], sweep['gap']),
+    }
+
+
+def late_days(frame: pd.DataFrame) -> dict:
+    """P3 days whose last end is at or after LATE_END_MINUTES, counted like calculateWorkPatterns."""
+    work = frame[(frame['prioritisedPersona'].astype(str) == WORK_PERSONA) & (frame['end'] >= 0)]
+    days = work.groupby(work['date'].astype(str)).agg(
+        end=('end', 'max'), year=('year', 'first'), week=('weekNum', 'first'), dayOfWeek=('dayOfWeek', 'first'))
+    late = days[days['end'] >= LATE_END_MINUTES]
+
+    by_year = {}
+    weekday = pd.Categorical(late['dayOfWeek'].astype(str), categories=DAY_NAMES)
+    for year, counts in pd.crosstab(late['year'].astype(int), weekday, dropna=False).iterrows():
+        by_year[str(year)] = [int(counts[day]) for day in DAY_NAMES]
+
+    # Keyed by the entry's year and weekNum, as the dashboard groups them
+    weeks = late['year'].astype(int).astype(str) + '-W' + late['week'].astype(int).astype(str).str.zfill(2)
+    by_week = weeks.value_counts().sort_index()
+    return {
+        "thresholdMinutes": LATE_END_MINUTES,
+        "byYear": by_year,
+        "byWeek": {"periods": by_week.index.tolist(), "counts": by_week.astype(int).tolist()},
+    }
+
+
+def sleep_spans(frame: pd.DataFrame) -> pd.DataFrame:
+    """Timed sleep entries joined into spans: absStart, absEnd, minutes, startType (typeOfDay of the first entry)."""
+    sleep = frame[(frame['prioritisedPersona'].astype(str) == SLEEP_PERSONA) & (frame['absStart'] >= 0)]
+    sleep = sleep.sort_values('absStart', kind='stable')
+    reach = sleep['absEnd'].cummax().shift()
+    span = (sleep['absStart'] > reach + SPAN_JOIN_MINUTES).cumsum()
+    spans = sleep.groupby(span.to_numpy()).agg(
+        absStart=('absStart', 'min'), absEnd=('absEnd', 'max'), startType=('typeOfDay', 'first'))
+    spans['minutes'] = spans['absEnd'] - spans['absStart']
+    return spans.reset_index(drop=True)
+
+
+def sleep_series(frame: pd.DataFrame) -> dict:
+    """Night sleep spans (bedtime, wake-up, length; by wake date) and siesta counts per year."""
+    spans = sleep_spans(frame)
+    night = spans[spans['minutes'] > NIGHT_SLEEP_MINUTES]
+    nights = {
+        "wakeDate": _day_dates(night['absEnd'] // DAY_MINUTES).strftime('%Y-%m-%d').tolist(),
+        "bedtime": (night['absStart'] % DAY_MINUTES).astype(int).tolist(),
+        "wakeup": (night['absEnd'] % DAY_MINUTES).astype(int).tolist(),
+        "minutes": night['minutes'].astype(int).tolist(),
+    }
+
+    siesta = spans[spans['minutes'] <= NIGHT_SLEEP_MINUTES]
+    year = _day_dates(siesta['absStart'] // DAY_MINUTES).year.to_numpy()
+    weekend = (siesta['startType'].astype(str) == 'Weekend').to_numpy()
+    siestas = {}
+    for value in sorted(set(year.tolist())):
+        rows = year == value
+        siestas[str(value)] = {
+            "count": int(rows.sum()),
+            "weekday": int((rows & ~weekend).sum()),
+            "weekend": int((rows & weekend).sum()),
+            "minutes": int(siesta['minutes'].to_numpy()[rows].sum()),
+        }
+    return {"nightThresholdMinutes": NIGHT_SLEEP_MINUTES, "nights": nights, "siestas": siestas}
+
+
+def build_intervals(df: pd.DataFrame) -> dict:
+    """The intervals.json payload (without the store stamp) for an entries frame."""
+    frame = interval_frame(df)
+    dates = sorted(frame['date'].astype(str).unique())
+    return {
+        "version": INTERVALS_VERSION,
+        "dates": dates,
+        "personas": daily_bounds(frame, dates),
+        "coverage": coverage(frame, dates),
+        "work": {"persona": WORK_PERSONA, "lateDays": late_days(frame)},
+        "sleep": {"persona": SLEEP_PERSONA, **sleep_series(frame)},
+    }
+
+
+def write_intervals(store_dir=STORE_DIR, out_dir=ROLLUP_DIR, mirror_dir=None):
+    """Rebuild intervals.json from the partition store. Returns the written path (or None)."""
+    manifest = load_manifest(store_dir)
+    if manifest is None:
+        print(f"⚠️ No partition store at {store_dir}. Skipping interval analytics.")
+        return None
+
+    df = load_entries_frame(store_dir, columns=COLUMNS)
+    payload = {
+        **build_intervals(df),
+        "recordCount": manifest["recordCount"],
+        "dateRange": manifest["dateRange"],
+        "sourceHash": source_hash(manifest),
+    }
+    path = Path(out_dir) / INTERVALS_FILE
+    write_json_atomic(path, payload, indent=None)
+    print(f"⏱️  Wrote interval analytics for {len(payload['dates'])} days to {path}")
+
+    if mirror_dir is not None:
+        try:
+            mirror_file(path, Path(mirror_dir) / path.name)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not sync interval analytics to dashboard public folder: {e}")
+    return path
+
+
+if __name__ == "__main__":
+    write_intervals()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Streaming JSON Writer
+---------------------------------------
+Writes the {"entries", "metadata"} document one entry at a time instead of
+building the whole structure in memory and json.dump-ing it.
+
+- Entries are consumed from any iterable (one serialised entry per line)
+- recordCount / dateRange are accumulated while streaming
+- Output goes to a temp file in the target directory, then os.replace()
+  swaps it in atomically, so readers never see a half-written file
+- mirror_file() publishes a second copy via hardlink (or copy) rather than
+  serialising the data a second time
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# mkstemp creates files as 0600; published data files should be world-readable
+FILE_MODE = 0o644
+
+
+def null_constant(name):
+    """json.load parse_constant hook: NaN / Infinity tokens (invalid JSON) load as None."""
+    return None
+
+
+def _atomic_target(path: Path):
+    """Open a temp file next to `path` (same filesystem, so rename is atomic)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    return os.fdopen(fd, 'w', encoding='utf-8'), Path(tmp_name)
+
+
+def write_entries_json(path, entries, metadata=None, indent=None):
+    """
+    Stream entries to `path` as {"entries": [...], "metadata": {...}}.
+
+    Metadata is written after the entries so recordCount and dateRange can be
+    filled in from the stream. Entries must not contain NaN / Infinity
+    (ValueError), since the dashboard's JSON.parse rejects them.
+
+    Returns the final metadata dict, including a sha256 contentHash over the
+    serialised entries (independent of metadata such as timestamps).
+    """
+    path = Path(path)
+    metadata = dict(metadata or {})
+    count = 0
+    start = end = None
+    digest = hashlib.sha256()
+
+    handle, tmp_path = _atomic_target(path)
+    try:
+        with handle:
+            handle.write('{"entries": [')
+            for entry in entries:
+                text = json.dumps(entry, indent=indent, default=str, allow_nan=False)
+                handle.write('\n' if count == 0 else ',\n')
+                handle.write(text)
+                digest.update(text.encode('utf-8'))
+                digest.update(b'\n')
+                count += 1
+
+                date = entry.get('date')
+                if date:
+                    start = date if start is None or date < start else start
+                    end = date if end is None or date > end else end
+
+            metadata['recordCount'] = count
+            metadata['dateRange'] = {"start": start, "end": end}
+            metadata['contentHash'] = f"sha256:{digest.hexdigest()}"
+            handle.write('\n],\n"metadata": ')
+            handle.write(json.dumps(metadata, indent=indent, default=str))
+            handle.write('}\n')
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return metadata
+
+
+def write_json_atomic(path, data, indent=2, separators=None):
+    """Write a small JSON document (e.g. a manifest) via temp file + rename."""
+    path = Path(path)
+    handle, tmp_path = _atomic_target(path)
+    try:
+        with handle:
+            json.dump(data, handle, indent=indent, separators=separators, default=str)
+            handle.write('\n')
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def mirror_file(source, target):
+    """
+    Publish `source` at `target` without re-serialising it.
+
+    Uses a hardlink when both paths share a filesystem, otherwise falls back to
+    a byte copy. Either way the target is swapped in atomically.
+    """
+    source, target = Path(source), Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.link.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
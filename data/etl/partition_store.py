@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Year-Partitioned Entry Store
+----------------------------------------------
+Stores time entries as one JSON file per year plus a small manifest, so the
+daily sync only reads and rewrites the years its lookback window touches.
+
+Layout:
+    timeentries_harvest/
+        manifest.json           # totals, date range, per-partition stats + hashes
+        timeentries_2025.json   # {"entries": [...], "metadata": {...}}
+        timeentries_2025.arrow  # same entries, columnar (see columnar_store.py)
+        timeentries_2025.compact.json  # optional, dictionary-encoded for the dashboard (compact_store.py)
+        timeentries_2026.json
+        timeentries_2026.arrow
+
+Partition files carry no timestamps, so rewriting a partition whose entries
+did not change produces byte-identical output (and no git diff).
+
+Entries inside each partition are kept sorted by date (newest first). The
+sync merges into the entry database (entry_db.py) and exports the partitions
+it touched from there.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from columnar_store import columnar_path, write_columnar
+from compact_store import compact_path, write_compact
+from json_writer import null_constant, write_entries_json, write_json_atomic
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+RETIRED_INDEX_NAME = "index.json"  # Merge index of earlier versions, superseded by the entry database
+
+
+def partition_key(date: str) -> str:
+    """Partition key (year) for an ISO date string."""
+    return str(date)[:4]
+
+
+def partition_file(key: str) -> str:
+    return f"timeentries_{key}.json"
+
+
+def load_manifest(store_dir: Path):
+    """Return the manifest dict, or None if the store has not been created yet."""
+    path = Path(store_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_partitions(store_dir: Path, manifest, keys=None):
+    """Load entries from the given partitions (all partitions if keys is None)."""
+    entries = []
+    for partition in manifest.get("partitions", []):
+        if keys is not None and partition["key"] not in keys:
+            continue
+        with open(Path(store_dir) / partition["file"], 'r') as f:
+            entries.extend(json.load(f, parse_constant=null_constant).get("entries", []))
+    return entries
+
+
+def entries_digest(records):
+    """
+    Order-independent sha256 over the entries (a multiset digest).
+
+    Each entry is canonicalised (sorted keys, serialised like the JSON files)
+    and hashed; the sorted entry hashes are hashed again. Two lists holding the
+    same entries in a different order - e.g. after a merge re-inserts an
+    unchanged entry among its same-day neighbours - get the same digest.
+    """
+    hashes = sorted(
+        hashlib.sha256(json.dumps(r, sort_keys=True, default=str).encode('utf-8')).digest()
+        for r in records
+    )
+    return f"sha256:{hashlib.sha256(b''.join(hashes)).hexdigest()}"
+
+
+def group_by_partition(records):
+    """Split records into {partition_key: [records]} preserving order."""
+    groups = {}
+    for record in records:
+        groups.setdefault(partition_key(record['date']), []).append(record)
+    return groups
+
+
+def write_partitions(store_dir: Path, manifest, records, keys, metadata, compact=False):
+    """
+    Rewrite the partitions in `keys` from `records` and update the manifest.
+
+    `records` must contain every entry for those partitions (and may contain
+    nothing else), sorted by date descending. Partitions outside `keys` are
+    left untouched on disk. `metadata` supplies the run-level fields
+    (generatedAt, source, ...). Each partition is written as JSON and as an
+    Arrow file, and with `compact` also as a compact file. Returns (manifest,
+    written_paths); written_paths lists the JSON and compact files and the
+    manifest (what the dashboard needs).
+    """
+    store_dir = Path(store_dir)
+    groups = group_by_partition(records)
+    keys = set(keys) | set(groups)
+
+    partitions = {p["key"]: p for p in (manifest or {}).get("partitions", [])}
+    written = []
+    for key in sorted(keys, reverse=True):
+        path = store_dir / partition_file(key)
+        rows = groups.get(key, [])
+        stats = write_entries_json(path, rows, {"partition": key})
+        arrow_path = write_columnar(columnar_path(path), rows, {"partition": key})
+        partitions[key] = {
+            "key": key,
+            "file": path.name,
+            "columnarFile": arrow_path.name,
+            "recordCount": stats["recordCount"],
+            "dateRange": stats["dateRange"],
+            "contentHash": stats["contentHash"],
+        }
+        written.append(path)
+
+        compact_file = compact_path(path)
+        if compact and write_compact(compact_file, rows, {"partition": key}):
+            partitions[key]["compactFile"] = compact_file.name
+            written.append(compact_file)
+        else:
+            compact_file.unlink(missing_ok=True)  # Never leave a file that lags its partition
+
+    (store_dir / RETIRED_INDEX_NAME).unlink(missing_ok=True)
+
+    ordered = [partitions[key] for key in sorted(partitions, reverse=True)]
+    starts = [p["dateRange"]["start"] for p in ordered if p["dateRange"]["start"]]
+    ends = [p["dateRange"]["end"] for p in ordered if p["dateRange"]["end"]]
+    manifest = {
+        **metadata,
+        "version": MANIFEST_VERSION,
+        "partitioning": "year",
+        "recordCount": sum(p["recordCount"] for p in ordered),
+        "dateRange": {
+            "start": min(starts) if starts else None,
+            "end": max(ends) if ends else None
+        },
+        "partitions": ordered,
+    }
+    manifest_path = store_dir / MANIFEST_NAME
+    write_json_atomic(manifest_path, manifest)
+    written.append(manifest_path)
+
+    return manifest, written
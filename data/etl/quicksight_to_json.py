@@ -12,12 +12,15 @@ Input:
 
 Output:
     ../data/processed/timeentries.json
+    ../data/processed/timeentries.arrow  (columnar copy for analysis scripts)
 """
 
 import pandas as pd
 import json
 from datetime import datetime
 from pathlib import Path
+from columnar_store import columnar_path, write_columnar
+from seed_cache import read_seed_excel
 
 # Configuration
 INPUT_FILE = Path(__file__).parent.parent.parent / "seedfiles" / "personametry_quicksight_export_2018_to_2024_timetracking_v2.xlsx"
@@ -37,7 +40,7 @@ def parse_date(date_str: str) -> str:
 def convert_quicksight_to_json():
     """Main conversion function."""
     print(f"Reading: {INPUT_FILE}")
-    df = pd.read_excel(INPUT_FILE)
+    df = read_seed_excel(INPUT_FILE)
     print(f"Loaded {len(df)} rows")
     
     # Parse dates and extract components
@@ -109,6 +112,8 @@ def convert_quicksight_to_json():
         json.dump(output, f, indent=2, default=str)
     
     print(f"Exported {len(records)} records to {OUTPUT_FILE}")
+    arrow_file = write_columnar(columnar_path(OUTPUT_FILE), records, output["metadata"])
+    print(f"Exported columnar copy to {arrow_file}")
     print(f"Date range: {output['metadata']['dateRange']['start']} to {output['metadata']['dateRange']['end']}")
     
     # Print summary statistics
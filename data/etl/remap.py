@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Persona Remap
+-------------------------------
+Re-derives the persona columns (harvest_to_json.PERSONA_COLUMNS) of stored
+entries after TASK_NORMALIZATION, PERSONA_MAPPING, the keyword tables etc.
+change, without refetching from Harvest or re-reading the XLSX seed
+(`python harvest_api_sync.py --remap`).
+
+- The manifest records the mapping_hash() its entries were derived with;
+  when it matches the current tables there is nothing to do
+- Columns are derived once per distinct (task, notes) pair with the same
+  vectorized code as the sync (apply_persona_mappings) and broadcast back
+- Partitions are pre-scanned from their Arrow files (task, notes and the
+  persona columns only); only partitions holding rows that now map
+  differently are loaded as JSON, patched and rewritten
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import read_table
+from harvest_to_json import PERSONA_COLUMNS, apply_persona_mappings
+from partition_store import load_partitions
+
+SCAN_COLUMNS = ['task', 'notes'] + PERSONA_COLUMNS
+
+
+def derive_persona_columns(frame: pd.DataFrame) -> pd.DataFrame:
+    """PERSONA_COLUMNS for a frame with 'task' and 'notes' columns (same index)."""
+    inputs = pd.DataFrame({
+        'Task': frame['task'].astype(object),
+        'Notes': frame['notes'].astype(object),
+    })
+    codes, uniques = pd.factorize(pd.MultiIndex.from_frame(inputs))
+    derived = apply_persona_mappings(uniques.to_frame(index=False, name=['Task', 'Notes']))
+    return pd.DataFrame(
+        {column: derived[column].to_numpy(dtype=object)[codes] for column in PERSONA_COLUMNS},
+        index=frame.index,
+    )
+
+
+def stale_rows(frame: pd.DataFrame):
+    """
+    (mask, derived): rows whose stored PERSONA_COLUMNS differ from what the
+    current tables produce, and the freshly derived columns for every row.
+    """
+    derived = derive_persona_columns(frame)
+    stale = np.zeros(len(frame), dtype=bool)
+    for column in PERSONA_COLUMNS:
+        fresh = derived[column].to_numpy()
+        if column not in frame:
+            stale |= pd.notna(fresh)
+            continue
+        stored = frame[column].astype(object).to_numpy()
+        stale |= ~((stored == fresh) | (pd.isna(stored) & pd.isna(fresh)))
+    return stale, derived
+
+
+def remap_records(records) -> int:
+    """Re-derive PERSONA_COLUMNS of entry dicts in place. Returns how many entries changed."""
+    if not records:
+        return 0
+    frame = pd.DataFrame(
+        {column: [record.get(column) for record in records] for column in SCAN_COLUMNS},
+        dtype=object,
+    )
+    stale, derived = stale_rows(frame)
+    positions = np.flatnonzero(stale)
+    for position, values in zip(positions, derived.to_numpy()[positions]):
+        records[position].update(
+            (column, None if pd.isna(value) else value) for column, value in zip(PERSONA_COLUMNS, values)
+        )
+    return len(positions)
+
+
+def stale_partitions(store_dir: Path, manifest):
+    """Keys of the partitions holding entries that map differently now (newest first)."""
+    keys = []
+    for partition in manifest.get("partitions", []):
+        if partition.get("columnarFile"):
+            frame = read_table(Path(store_dir) / partition["columnarFile"], SCAN_COLUMNS).to_pandas()
+        else:
+            # Written before Arrow files existed
+            frame = pd.DataFrame(load_partitions(store_dir, manifest, [partition["key"]]), columns=SCAN_COLUMNS)
+        if len(frame) and stale_rows(frame)[0].any():
+            keys.append(partition["key"])
+    return keys
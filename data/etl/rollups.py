@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Aggregate Rollups
+-----------------------------------
+Precomputes the totals the dashboard otherwise derives from every raw entry
+(groupByPersona / groupByYear / groupByMonth / groupByWeek / groupByDay).
+
+One small JSON cube per grain is written to data/processed/rollups/:
+
+    rollup_day.json    periods = "YYYY-MM-DD"
+    rollup_week.json   periods = ISO week "YYYY-Www" (+ weekStart Monday dates)
+    rollup_month.json  periods = "YYYY-MM"
+    rollup_year.json   periods = "YYYY"
+
+Each cube holds dense, period-aligned series of hours and entry counts for the
+total and for every value of prioritisedPersona, metaWorkLife and
+personaTier2. Cubes carry no timestamps, so unchanged data rewrites
+byte-identical files.
+
+Usage (normally run by harvest_api_sync.py / harvest_to_json.py after saving):
+    python rollups.py
+"""
+
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+
+from columnar_store import load_entries_frame
+from json_writer import mirror_file, write_json_atomic
+from partition_store import load_manifest
+
+DATA_DIR = Path(__file__).parent.parent / "processed"
+STORE_DIR = DATA_DIR / "timeentries_harvest"
+ROLLUP_DIR = DATA_DIR / "rollups"
+
+ROLLUP_VERSION = 1
+GRAINS = ("day", "week", "month", "year")
+DIMENSIONS = ("prioritisedPersona", "metaWorkLife", "personaTier2")
+COLUMNS = ["date", "year", "month", "hours", *DIMENSIONS]
+
+
+def rollup_file(grain: str) -> str:
+    return f"rollup_{grain}.json"
+
+
+def period_keys(df: pd.DataFrame) -> dict:
+    """Period label per entry for every grain (computed once per distinct date)."""
+    codes, dates = pd.factorize(df['date'])
+    parsed = pd.to_datetime(pd.Series(dates))
+    iso = parsed.dt.isocalendar()
+    weeks = iso['year'].astype(str) + '-W' + iso['week'].astype(str).str.zfill(2)
+    return {
+        "day": df['date'].astype(str),
+        "week": pd.Series(weeks.to_numpy()[codes], index=df.index),
+        # Month/year follow the entry's own year/month fields, like the dashboard
+        "month": df['year'].astype(int).astype(str) + '-' + df['month'].astype(int).astype(str).str.zfill(2),
+        "year": df['year'].astype(int).astype(str),
+    }
+
+
+def _series(hours, entries) -> dict:
+    return {
+        "hours": [round(v, 4) for v in hours.tolist()],
+        "entries": entries.astype(int).tolist(),
+    }
+
+
+def build_cube(df: pd.DataFrame, period: pd.Series, grain: str) -> dict:
+    """Dense hours/entries series per period for the total and each dimension value."""
+    df = df.assign(period=period.to_numpy())
+    periods = sorted(df['period'].unique())
+
+    totals = df.groupby('period')['hours'].agg(hours='sum', entries='count').reindex(periods)
+    cube = {
+        "version": ROLLUP_VERSION,
+        "grain": grain,
+        "periods": periods,
+    }
+    if grain == "week":
+        starts = pd.to_datetime([p + '-1' for p in periods], format='%G-W%V-%u')
+        cube["weekStart"] = [d.strftime('%Y-%m-%d') for d in starts]
+    cube["total"] = _series(totals['hours'], totals['entries'])
+
+    cube["dimensions"] = {}
+    for dimension in DIMENSIONS:
+        # periods x values matrices, one column per dimension value
+        grouped = (
+            df.groupby(['period', df[dimension].astype(str)], observed=True)['hours']
+            .agg(hours='sum', entries='count')
+            .unstack(fill_value=0)
+            .reindex(periods, fill_value=0)
+        )
+        values = sorted(grouped['hours'].columns)
+        cube["dimensions"][dimension] = {
+            value: _series(grouped['hours'][value], grouped['entries'][value]) for value in values
+        }
+    return cube
+
+
+def build_rollups(df: pd.DataFrame) -> dict:
+    """{grain: cube} for all GRAINS."""
+    keys = period_keys(df)
+    return {grain: build_cube(df, keys[grain], grain) for grain in GRAINS}
+
+
+def source_hash(manifest) -> str:
+    """Fingerprint of the store contents the rollups were built from."""
+    digest = hashlib.sha256()
+    for partition in manifest.get("partitions", []):
+        digest.update(f"{partition['key']}:{partition['contentHash']}\n".encode('utf-8'))
+    return f"sha256:{digest.hexdigest()}"
+
+
+def write_rollups(store_dir=STORE_DIR, out_dir=ROLLUP_DIR, mirror_dir=None):
+    """Rebuild every cube from the partition store. Returns the written paths."""
+    manifest = load_manifest(store_dir)
+    if manifest is None:
+        print(f"⚠️ No partition store at {store_dir}. Skipping rollups.")
+        return []
+
+    df = load_entries_frame(store_dir, columns=COLUMNS)
+    stamp = {
+        "recordCount": manifest["recordCount"],
+        "dateRange": manifest["dateRange"],
+        "sourceHash": source_hash(manifest),
+    }
+
+    written = []
+    for grain, cube in build_rollups(df).items():
+        path = Path(out_dir) / rollup_file(grain)
+        write_json_atomic(path, {**cube, **stamp}, indent=None)
+        written.append(path)
+    print(f"📦 Wrote {len(written)} rollup cubes to {out_dir}")
+
+    if mirror_dir is not None:
+        try:
+            for path in written:
+                mirror_file(path, Path(mirror_dir) / path.name)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not sync rollups to dashboard public folder: {e}")
+    return written
+
+
+if __name__ == "__main__":
+    write_rollups()
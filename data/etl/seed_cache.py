@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Seed XLSX Cache
+---------------------------------
+The seed converters (harvest_to_json.py, quicksight_to_json.py) read
+multi-year XLSX exports that take 5-15 s to parse through openpyxl. Each sheet
+is converted once into an Arrow IPC file under data/cache/seed/ and later runs
+memory-map that file instead.
+
+- Cache files are stamped with the workbook's size, mtime and sha256. A
+  size + mtime match is a hit without reading the workbook; otherwise the
+  content hash decides (a touched-but-unchanged file is re-stamped, not
+  re-parsed)
+- Cold reads stream rows from openpyxl in read-only mode (values only, no
+  Cell objects) and hand them to pandas' own TextParser, so the DataFrame is
+  identical to pd.read_excel()
+- Sheets whose columns Arrow cannot type (mixed objects) are returned
+  uncached
+
+Usage:
+    from seed_cache import read_seed_excel
+    df = read_seed_excel(INPUT_FILE)
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pyarrow as pa
+
+from columnar_store import METADATA_KEY, read_metadata, read_table, write_table
+
+SEED_CACHE_DIR = Path(__file__).parent.parent / "cache" / "seed"
+SEED_CACHE_VERSION = 1
+
+
+def file_hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def cache_path(path, sheet=0, cache_dir=SEED_CACHE_DIR) -> Path:
+    return Path(cache_dir) / f"{Path(path).stem}.sheet-{sheet}.arrow"
+
+
+def _cell(value):
+    # Same conversion pandas' openpyxl reader applies per cell
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def read_excel_streaming(path, sheet=0):
+    """pd.read_excel(path, sheet_name=sheet) via a read-only, values-only openpyxl pass."""
+    from pandas.io.parsers import TextParser  # Imported on use: seed_cache loads with every ETL script
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        worksheet = workbook.worksheets[sheet] if isinstance(sheet, int) else workbook[sheet]
+        data = [[_cell(value) for value in row] for row in worksheet.iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+    # Trailing blank rows (formatted but empty cells) are dropped, as in pandas
+    while data and all(value == "" for value in data[-1]):
+        data.pop()
+    return TextParser(data, header=0).read()
+
+
+def _stamp(path, sheet, content_hash):
+    stat = Path(path).stat()
+    return {
+        "cacheVersion": SEED_CACHE_VERSION,
+        "source": Path(path).name,
+        "sheet": sheet,
+        "size": stat.st_size,
+        "mtimeNs": stat.st_mtime_ns,
+        "contentHash": content_hash,
+    }
+
+
+def _with_stamp(table, stamp):
+    metadata = {**(table.schema.metadata or {}), METADATA_KEY: json.dumps(stamp)}
+    return table.replace_schema_metadata(metadata)
+
+
+def _frame(table):
+    df = table.to_pandas()
+    # Arrow nulls come back as None in object columns (e.g. datetime.time); read_excel has NaN
+    for column in [name for name, dtype in df.dtypes.items() if dtype == object]:
+        df[column] = df[column].where(df[column].notna(), np.nan)
+    return df
+
+
+def cache_status(path, sheet=0, cache_dir=SEED_CACHE_DIR):
+    """"hit", "stale-stamp" (same content, new size/mtime stamp needed) or "miss"."""
+    cached = cache_path(path, sheet, cache_dir)
+    if not cached.exists():
+        return "miss"
+    stamp = read_metadata(cached)
+    if stamp.get("cacheVersion") != SEED_CACHE_VERSION or stamp.get("sheet") != sheet:
+        return "miss"
+    stat = Path(path).stat()
+    if stamp.get("size") == stat.st_size and stamp.get("mtimeNs") == stat.st_mtime_ns:
+        return "hit"
+    if stamp.get("size") == stat.st_size and stamp.get("contentHash") == file_hash(path):
+        return "stale-stamp"
+    return "miss"
+
+
+def read_seed_excel(path, sheet=0, cache_dir=SEED_CACHE_DIR):
+    """Drop-in for pd.read_excel(path) that serves repeat reads from the seed cache."""
+    path = Path(path)
+    cached = cache_path(path, sheet, cache_dir)
+    start = time.perf_counter()
+    status = cache_status(path, sheet, cache_dir)
+
+    if status != "miss":
+        table = read_table(cached)
+        if status == "stale-stamp":
+            write_table(cached, _with_stamp(table, _stamp(path, sheet, file_hash(path))))
+        df = _frame(table)
+        print(f"⚡ Loaded {len(df)} rows from seed cache {cached.name} "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return df
+
+    df = read_excel_streaming(path, sheet)
+    print(f"🐢 Parsed {path.name} in {time.perf_counter() - start:.1f}s (seed cache cold)")
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        print(f"⚠️  Warning: Could not cache {path.name}: {e}")
+        return df
+    write_table(cached, _with_stamp(table, _stamp(path, sheet, file_hash(path))))
+    print(f"💾 Cached to {cached}")
+    return df
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Activity Streaks
+----------------------------------
+Precomputes runs of consecutive days with time logged per prioritisedPersona
+and personaTier2 value, which the dashboard's streak charts and consistency
+metrics otherwise rebuild from every raw entry.
+
+    data/processed/rollups/streaks.json
+      dimensions.<dimension>.<value>
+        runs        run-length encoding of active days: start dates + lengths
+        histogram   number of runs per run length (lengths / counts)
+        longest     longest run (length, start, end; the latest on ties)
+        current     run still alive at the store's last date (ended on it or
+                    the day before), else null
+      workload      runs of the Work page's burnout streaks (calculateWorkPatterns):
+        highWorkload  P3 days with at least 10 hours logged
+        lateEnd       P3 days whose last entry ends at or after 21:00
+
+A day is active for a value when its entries for that value total more than
+zero hours. Runs are found column-at-a-time: distinct (value, day) pairs are
+sorted, and a new run starts wherever the value changes or the day number
+does not follow the previous one (diff / cumsum). Workload runs are encoded
+the same way, with the condition in place of the value; single days are kept
+so window updates can join them, and the dashboard drops runs under 2 days.
+
+After a sync only the changed date window is read: stored runs that do not
+touch it are kept as they are, and runs that do are re-encoded from their
+known days outside the window plus the window's fresh entries. A full rebuild
+happens when there is no usable previous file (missing, another version, or
+built from a different store than the one the sync started from).
+
+Usage (normally run by harvest_api_sync.py / harvest_to_json.py after saving):
+    python streaks.py
+"""
+
+import json
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import load_entries_frame
+from intervals import clock_minutes
+from json_writer import mirror_file, write_json_atomic
+from partition_store import load_manifest, partition_key
+from rollups import source_hash
+
+DATA_DIR = Path(__file__).parent.parent / "processed"
+STORE_DIR = DATA_DIR / "timeentries_harvest"
+ROLLUP_DIR = DATA_DIR / "rollups"
+
+STREAKS_VERSION = 2
+STREAKS_FILE = "streaks.json"
+DIMENSIONS = ("prioritisedPersona", "personaTier2")
+COLUMNS = ["date", "hours", *DIMENSIONS, "endedAt"]
+
+WORK_PERSONA = "P3 Professional"
+WORKLOAD = ("highWorkload", "lateEnd")
+HIGH_WORKLOAD_HOURS = 10.0  # calculateWorkPatterns' HIGH_WORK_THRESHOLD
+LATE_END_MINUTES = 21 * 60  # calculateWorkPatterns' LATE_END_STREAK_THRESHOLD
+
+EPOCH = date(1970, 1, 1)
+
+
+def day_number(iso_date) -> int:
+    return (date.fromisoformat(str(iso_date)) - EPOCH).days
+
+
+def iso_day(day) -> str:
+    return (EPOCH + timedelta(days=int(day))).isoformat()
+
+
+def active_days(df: pd.DataFrame, dimension: str) -> pd.DataFrame:
+    """Distinct (value, day number) pairs with hours logged, sorted by value then day."""
+    codes, dates = pd.factorize(df['date'].astype(str))
+    days = pd.to_datetime(dates).to_numpy().astype('datetime64[D]').astype(np.int64)
+    pairs = pd.DataFrame({'value': df[dimension].astype(str).to_numpy(), 'day': days[codes] if len(codes) else codes})
+    pairs = pairs[(df['hours'].fillna(0) > 0).to_numpy() & df[dimension].notna().to_numpy()]
+    return pairs.drop_duplicates().sort_values(['value', 'day'], kind='stable').reset_index(drop=True)
+
+
+def workload_days(df: pd.DataFrame) -> pd.DataFrame:
+    """Distinct (condition, day number) pairs of WORKLOAD conditions met by the day's P3 entries."""
+    work = df[(df['prioritisedPersona'].astype(str) == WORK_PERSONA).to_numpy()]
+    daily = pd.DataFrame({
+        'date': work['date'].astype(str).to_numpy(),
+        'hours': work['hours'].fillna(0).to_numpy(),
+        'end': clock_minutes(work['endedAt']),
+    }).groupby('date').agg(hours=('hours', 'sum'), end=('end', 'max'))
+    days = pd.to_datetime(daily.index).to_numpy().astype('datetime64[D]').astype(np.int64)
+    met = {
+        'highWorkload': (daily['hours'] >= HIGH_WORKLOAD_HOURS).to_numpy(),
+        'lateEnd': (daily['end'] >= LATE_END_MINUTES).to_numpy(),
+    }
+    return pd.DataFrame({
+        'value': np.repeat(list(met), [int(mask.sum()) for mask in met.values()]),
+        'day': np.concatenate([days[mask] for mask in met.values()]),
+    }).sort_values(['value', 'day'], kind='stable').reset_index(drop=True)
+
+
+def encode_runs(pairs: pd.DataFrame) -> dict:
+    """{value: (start day numbers, lengths)} from sorted distinct (value, day) pairs."""
+    if pairs.empty:
+        return {}
+    value, day = pairs['value'].to_numpy(), pairs['day'].to_numpy()
+    new_run = np.ones(len(pairs), dtype=bool)
+    new_run[1:] = (value[1:] != value[:-1]) | (np.diff(day) != 1)
+    run = np.cumsum(new_run) - 1
+    starts = day[new_run]
+    lengths = np.bincount(run)
+    values = value[new_run]
+    return {
+        key: (starts[values == key], lengths[values == key])
+        for key in pd.unique(values)
+    }
+
+
+def merge_window(runs, window_runs, lo, hi) -> dict:
+    """
+    Stored `runs` with the days lo..hi (day numbers) replaced by `window_runs`
+    (encoded from the window's current entries). Runs touching the window or
+    adjacent to it are re-encoded from their days outside it plus the window's.
+    """
+    merged = {}
+    for value in sorted(set(runs) | set(window_runs)):
+        starts, lengths = runs.get(value, (np.empty(0, np.int64), np.empty(0, np.int64)))
+        ends = starts + lengths - 1
+        touching = (ends >= lo - 1) & (starts <= hi + 1)
+
+        days = [np.arange(s, s + n) for s, n in zip(starts[touching], lengths[touching])]
+        days = np.concatenate(days) if days else np.empty(0, np.int64)
+        days = days[(days < lo) | (days > hi)]
+        if value in window_runs:
+            w_starts, w_lengths = window_runs[value]
+            days = np.concatenate([days] + [np.arange(s, s + n) for s, n in zip(w_starts, w_lengths)])
+
+        fresh = encode_runs(pd.DataFrame({'value': value, 'day': np.unique(days)})).get(value)
+        all_starts, all_lengths = [starts[~touching]], [lengths[~touching]]
+        if fresh is not None:
+            all_starts.append(fresh[0])
+            all_lengths.append(fresh[1])
+        starts, lengths = np.concatenate(all_starts), np.concatenate(all_lengths)
+        if len(starts):
+            order = np.argsort(starts, kind='stable')
+            merged[value] = (starts[order], lengths[order])
+    return merged
+
+
+def summarise(starts, lengths, last_day) -> dict:
+    """The streaks.json entry for one value's runs."""
+    ends = starts + lengths - 1
+    histogram_lengths, counts = np.unique(lengths, return_counts=True)
+    longest = len(lengths) - 1 - int(np.argmax(lengths[::-1]))  # Latest of the longest
+
+    def run(i):
+        return {"length": int(lengths[i]), "start": iso_day(starts[i]), "end": iso_day(ends[i])}
+
+    current = int(np.argmax(ends))
+    return {
+        "runs": {"start": [iso_day(d) for d in starts], "length": lengths.astype(int).tolist()},
+        "histogram": {"lengths": histogram_lengths.astype(int).tolist(), "counts": counts.astype(int).tolist()},
+        "longest": run(longest),
+        "current": run(current) if ends[current] >= last_day - 1 else None,
+    }
+
+
+def _run_list(starts, lengths) -> dict:
+    return {"start": [iso_day(d) for d in starts], "length": lengths.astype(int).tolist()}
+
+
+def build_streaks(runs_by_dimension, last_date) -> dict:
+    """
+    The streaks.json payload (without the store stamp) from {dimension: {value: runs}},
+    with the workload runs under the "workload" key.
+    """
+    last_day = day_number(last_date) if last_date else 0
+    empty = (np.empty(0, np.int64), np.empty(0, np.int64))
+    return {
+        "version": STREAKS_VERSION,
+        "lastDate": last_date,
+        "dimensions": {
+            dimension: {
+                value: summarise(starts, lengths, last_day)
+                for value, (starts, lengths) in sorted(runs_by_dimension[dimension].items())
+            }
+            for dimension in DIMENSIONS
+        },
+        "workload": {
+            "persona": WORK_PERSONA,
+            **{value: _run_list(*runs_by_dimension["workload"].get(value, empty)) for value in WORKLOAD},
+        },
+    }
+
+
+def full_runs(df: pd.DataFrame) -> dict:
+    """{dimension: {value: runs}} of the entries in `df`, workload runs included."""
+    runs = {dimension: encode_runs(active_days(df, dimension)) for dimension in DIMENSIONS}
+    runs["workload"] = encode_runs(workload_days(df))
+    return runs
+
+
+def _decode(run_list):
+    starts = np.array([day_number(d) for d in run_list["start"]], dtype=np.int64)
+    return starts, np.array(run_list["length"], dtype=np.int64)
+
+
+def stored_runs(payload) -> dict:
+    """{dimension: {value: (starts, lengths)}} decoded from a streaks.json payload."""
+    runs = {}
+    for dimension in DIMENSIONS:
+        runs[dimension] = {
+            value: _decode(entry["runs"])
+            for value, entry in payload["dimensions"].get(dimension, {}).items()
+        }
+    runs["workload"] = {
+        value: _decode(payload["workload"][value])
+        for value in WORKLOAD if payload["workload"][value]["start"]
+    }
+    return runs
+
+
+def _load_previous(path, previous_hash):
+    """The previous payload if it was built from the store the sync started from, else None."""
+    if previous_hash is None or not Path(path).exists():
+        return None
+    try:
+        with open(path, "r") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get("version") != STREAKS_VERSION or payload.get("sourceHash") != previous_hash:
+        return None
+    return payload
+
+
+def write_streaks(store_dir=STORE_DIR, out_dir=ROLLUP_DIR, mirror_dir=None, window=None, previous_hash=None):
+    """
+    Update streaks.json after a save. With `window` (first and last ISO date
+    whose entries changed) and the `previous_hash` (rollups.source_hash) of the
+    store before the save, only the window's partitions are read; otherwise
+    every run is rebuilt. Returns the written path (or None).
+    """
+    manifest = load_manifest(store_dir)
+    if manifest is None:
+        print(f"⚠️ No partition store at {store_dir}. Skipping streaks.")
+        return None
+
+    path = Path(out_dir) / STREAKS_FILE
+    previous = _load_previous(path, previous_hash) if window else None
+    if previous is not None:
+        lo, hi = day_number(window[0]), day_number(window[1])
+        keys = {str(year) for year in range(int(partition_key(window[0])), int(partition_key(window[1])) + 1)}
+        df = load_entries_frame(store_dir, columns=COLUMNS, keys=keys)
+        df = df[(df['date'].astype(str) >= window[0]) & (df['date'].astype(str) <= window[1])]
+        runs = stored_runs(previous)
+        fresh = full_runs(df)
+        runs = {dimension: merge_window(runs[dimension], fresh[dimension], lo, hi) for dimension in runs}
+        mode = f"window {window[0]}..{window[1]}"
+    else:
+        runs = full_runs(load_entries_frame(store_dir, columns=COLUMNS))
+        mode = "full rebuild"
+
+    payload = {
+        **build_streaks(runs, manifest["dateRange"]["end"]),
+        "recordCount": manifest["recordCount"],
+        "dateRange": manifest["dateRange"],
+        "sourceHash": source_hash(manifest),
+    }
+    write_json_atomic(path, payload, indent=None)
+    print(f"🔥 Updated activity streaks ({mode}) in {path}")
+
+    if mirror_dir is not None:
+        try:
+            mirror_file(path, Path(mirror_dir) / path.name)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not sync streaks to dashboard public folder: {e}")
+    return path
+
+
+if __name__ == "__main__":
+    write_streaks()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Personametry ETL: Synthetic Harvest Data
+----------------------------------------
+Deterministic generator of realistic Harvest time entries for benchmarks and
+scale tests (see benchmark_etl.py).
+
+- Task names are the real ones (TASK_NORMALIZATION keys and the normalised
+  tasks of PERSONA_MAPPING), weighted roughly like the actual history
+- Days are laid out back to back from 00:00 (sleep, work, family, ...) with
+  ~ENTRIES_PER_DAY entries, newest day first
+- Notes are mostly empty; social notes name people from
+  SOCIAL_ENTITY_KEYWORDS / SOCIAL_CONTEXT_KEYWORDS and some work notes mention
+  commutes, so the keyword classifiers do real work
+- Output as Harvest API v2 pages (api_pages) or as the XLSX export frame
+  (xlsx_frame) that harvest_to_json.py reads
+"""
+
+import datetime
+import random
+
+import pandas as pd
+
+from harvest_to_json import (
+    PERSONA_MAPPING,
+    SOCIAL_CONTEXT_KEYWORDS,
+    SOCIAL_ENTITY_KEYWORDS,
+    TASK_NORMALIZATION,
+)
+
+ENTRIES_PER_DAY = 10
+PER_PAGE = 2000  # Harvest's maximum page size
+END_DATE = datetime.date(2026, 10, 16)
+
+SLEEP = '[Individual] Rest n Sleep'
+WORK = '[Professional] Service Provider - Work/Job'
+SOCIAL = '[Friend] Social'
+
+# Rough share of entries per normalised task in the real history
+TASK_WEIGHTS = {
+    SLEEP: 14,
+    WORK: 20,
+    '[Family-Man] Family Time (#Father #Brother #Son #Relatives)': 18,
+    '[Husband] Marital/Wife #Husband': 10,
+    '[Individual] Me Time (Bootup, Nothing, PC/Surfing, Journalling, Hobbies, Blogging, DIY, Netflix, Silence - Alone Time)': 14,
+    '[Individual] Spirituality': 10,
+    '[Individual] Health, Fitness & Wellbeing': 6,
+    '[Individual] Knowledge-Base - Books/Video/Podcasts': 4,
+    SOCIAL: 4,
+}
+
+SOCIAL_NOTES = [f"Dinner with {keyword}" for keyword, _ in SOCIAL_ENTITY_KEYWORDS] + [
+    f"Coffee - {keyword}" for keywords in SOCIAL_CONTEXT_KEYWORDS.values() for keyword in keywords
+] + ["Braai with the neighbours", "Eid visits"]
+WORK_NOTES = ["commute to office", "Commute home", "1:1s", "design review", "on-call"]
+OTHER_NOTES = ["", "gym", "reading", "school run", "netflix", "jummah", "DIY shelves"]
+
+
+def _task_pool():
+    """(raw task name, weight) pairs: normalised tasks plus their legacy aliases."""
+    aliases = {}
+    for raw, normalised in TASK_NORMALIZATION.items():
+        aliases.setdefault(normalised, []).append(raw)
+    pool = []
+    for normalised in PERSONA_MAPPING:
+        weight = TASK_WEIGHTS.get(normalised, 1)
+        names = [normalised] + aliases.get(normalised, [])
+        # Legacy aliases get a small share of their normalised task's weight
+        pool.append((normalised, weight * 0.8))
+        pool.extend((raw, weight * 0.2 / (len(names) - 1)) for raw in names[1:])
+    return pool
+
+
+def _notes(rng, task):
+    if task == SOCIAL:
+        return rng.choice(SOCIAL_NOTES) if rng.random() < 0.8 else None
+    if task == WORK:
+        return rng.choice(WORK_NOTES) if rng.random() < 0.15 else None
+    return (rng.choice(OTHER_NOTES) or None) if rng.random() < 0.05 else None
+
+
+def _clock(minutes):
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+def generate_entries(count, end_date=END_DATE, seed=0, start_id=10**9):
+    """`count` Harvest API v2 time entry dicts, newest day first."""
+    rng = random.Random(seed)
+    names, weights = zip(*_task_pool())
+    entries = []
+    day = end_date
+    while len(entries) < count:
+        tasks = rng.choices(names, weights, k=ENTRIES_PER_DAY - 1)
+        tasks.insert(0, SLEEP)
+        minute = 0
+        for task in tasks[:count - len(entries)]:
+            hours = 7.5 if task == SLEEP else round(rng.choice([0.25, 0.5, 1, 1.5, 2]), 2)
+            if task == WORK and day.weekday() < 5:
+                hours = round(rng.uniform(2, 5), 2)
+            length = min(int(hours * 60), 24 * 60 - 1 - minute)
+            entry_id = start_id + len(entries)
+            entries.append({
+                'id': entry_id,
+                'spent_date': day.isoformat(),
+                'hours': hours,
+                'notes': _notes(rng, task),
+                'started_time': _clock(minute),
+                'ended_time': _clock(minute + length),
+                'client': {'name': 'Personametry'},
+                'project': {'name': 'Life'},
+                'task': {'name': task},
+                'updated_at': f"{day.isoformat()}T23:00:00Z",
+            })
+            minute += length
+        day -= datetime.timedelta(days=1)
+    return entries
+
+
+def api_pages(entries, per_page=PER_PAGE):
+    """Wrap entries in /v2/time_entries page responses."""
+    total_pages = max(1, -(-len(entries) // per_page))
+    return [
+        {
+            'time_entries': entries[(page - 1) * per_page:page * per_page],
+            'per_page': per_page,
+            'page': page,
+            'total_pages': total_pages,
+            'total_entries': len(entries),
+            'next_page': page + 1 if page < total_pages else None,
+        }
+        for page in range(1, total_pages + 1)
+    ]
+
+
+def xlsx_frame(entries):
+    """The same entries shaped like the Harvest XLSX export (as pd.read_excel returns it)."""
+    def clock_time(value):
+        hour, minute = map(int, value.split(':'))
+        return datetime.time(hour % 24, minute)
+
+    return pd.DataFrame({
+        'Date': pd.to_datetime([e['spent_date'] for e in entries]),
+        'Client': [e['client']['name'] for e in entries],
+        'Project': [e['project']['name'] for e in entries],
+        'Task': [e['task']['name'] for e in entries],
+        'Notes': [e['notes'] for e in entries],
+        'Hours': [float(e['hours']) for e in entries],
+        'Started At': [clock_time(e['started_time']) for e in entries],
+        'Ended At': [clock_time(e['ended_time']) for e in entries],
+    })
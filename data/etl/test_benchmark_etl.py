@@ -0,0 +1,47 @@
+import unittest
+
+from benchmark_etl import STAGES, compare, run_stage
+from harvest_api_sync import transform_api_data
+from harvest_to_json import apply_transformations
+from synthetic_harvest import api_pages, generate_entries, xlsx_frame
+
+
+class TestSyntheticHarvest(unittest.TestCase):
+    def test_entries_are_deterministic_and_map_to_real_personas(self):
+        entries = generate_entries(2000)
+        self.assertEqual(entries, generate_entries(2000))
+        self.assertEqual(len({e['id'] for e in entries}), 2000)
+        self.assertEqual([e['spent_date'] for e in entries], sorted((e['spent_date'] for e in entries), reverse=True))
+
+        df = transform_api_data(entries, verbose=False)
+        self.assertFalse((df['prioritisedPersona'] == 'ERROR').any())
+        self.assertGreater(df['socialEntity'].nunique(), 5)
+        self.assertIn('commuting', set(df['commuteContext']))
+
+        frame = xlsx_frame(entries)
+        apply_transformations(frame)
+        self.assertEqual(frame['prioritisedPersona'].tolist(), df['prioritisedPersona'].tolist())
+
+    def test_api_pages(self):
+        pages = api_pages(generate_entries(25), per_page=10)
+        self.assertEqual([len(p['time_entries']) for p in pages], [10, 10, 5])
+        self.assertEqual([p['next_page'] for p in pages], [2, 3, None])
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_every_stage_runs(self):
+        for stage in STAGES:
+            result = run_stage(stage, 140, repeat=1)
+            self.assertEqual(result['rows'], 140)
+            self.assertGreater(result['rowsPerSecond'], 0)
+            self.assertGreater(result['peakRssMb'], 0)
+
+    def test_compare_flags_slowdowns_and_memory_growth(self):
+        baseline = {'rowsPerSecond': 1000, 'peakRssMb': 100.0}
+        self.assertEqual(compare({'rowsPerSecond': 800, 'peakRssMb': 110.0}, baseline), [])
+        self.assertEqual(len(compare({'rowsPerSecond': 700, 'peakRssMb': 130.0}, baseline)), 2)
+        self.assertEqual(compare({'rowsPerSecond': 1, 'peakRssMb': 1.0}, None), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
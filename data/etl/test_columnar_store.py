@@ -0,0 +1,71 @@
+import datetime
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from columnar_store import columnar_path, load_entries_frame, read_metadata, read_table, write_columnar
+from json_writer import write_json_atomic
+from partition_store import load_manifest, write_partitions
+
+
+def entry(date, persona='P3 Professional', hours=1.5, external_id=None, **extra):
+    return {
+        'date': date, 'year': int(date[:4]), 'month': int(date[5:7]), 'day': int(date[8:]),
+        'dayOfWeek': '_03 Wednesday', 'monthName': 'Jan', 'prioritisedPersona': persona,
+        'hours': hours, 'notes': None, 'external_id': external_id, **extra,
+    }
+
+
+class TestColumnarStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_with_dictionary_encoded_categoricals(self):
+        records = [entry('2025-01-02'), entry('2025-01-01', 'P0 Life Constraints (Sleep)', 7.0, '42')]
+        path = write_columnar(columnar_path(self.dir / 'timeentries.json'), records, {'source': 'test'})
+        self.assertEqual(path.name, 'timeentries.arrow')
+        self.assertEqual(read_metadata(path), {'source': 'test'})
+        self.assertEqual(str(read_table(path).schema.field('prioritisedPersona').type),
+                         'dictionary<values=string, indices=int32, ordered=0>')
+
+        df = load_entries_frame(self.dir / 'timeentries.json')
+        self.assertIsInstance(df['prioritisedPersona'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['prioritisedPersona'].tolist(), ['P3 Professional', 'P0 Life Constraints (Sleep)'])
+        self.assertEqual(df['hours'].tolist(), [1.5, 7.0])
+        self.assertEqual(df['date'].tolist(), ['2025-01-02', '2025-01-01'])
+        self.assertTrue(df['notes'].isna().all())
+        self.assertEqual(df['external_id'].tolist()[1], '42')
+
+    def test_non_string_values_are_stringified_like_json(self):
+        path = write_columnar(self.dir / 'x.arrow', [entry('2025-01-01', startedAt=datetime.time(9, 30))])
+        self.assertEqual(load_entries_frame(path)['startedAt'].tolist(), ['09:30:00'])
+
+    def test_partition_store_loads_all_partitions_in_manifest_order(self):
+        records = [entry('2026-02-01'), entry('2025-06-01', 'P2 Family'), entry('2024-03-03')]
+        write_partitions(self.dir, None, records, [], {'source': 'test'})
+        manifest = load_manifest(self.dir)
+        self.assertEqual([p['columnarFile'] for p in manifest['partitions']],
+                         ['timeentries_2026.arrow', 'timeentries_2025.arrow', 'timeentries_2024.arrow'])
+
+        df = load_entries_frame(self.dir, columns=['date', 'prioritisedPersona'])
+        self.assertEqual(list(df.columns), ['date', 'prioritisedPersona'])
+        self.assertEqual(df['date'].tolist(), ['2026-02-01', '2025-06-01', '2024-03-03'])
+        self.assertEqual(df.groupby('prioritisedPersona', observed=True).size().to_dict(),
+                         {'P2 Family': 1, 'P3 Professional': 2})
+
+        # Partitions written before Arrow files existed fall back to their JSON
+        (self.dir / 'timeentries_2025.arrow').unlink()
+        for partition in manifest['partitions']:
+            partition.pop('columnarFile')
+        write_json_atomic(self.dir / 'manifest.json', manifest)
+        self.assertEqual(load_entries_frame(self.dir)['date'].tolist(), ['2026-02-01', '2025-06-01', '2024-03-03'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import datetime
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from compact_store import STRING_COLUMNS, compact_payload, date_fields, decode_compact
+from harvest_api_sync import transform_api_data
+from partition_store import load_manifest, load_partitions, write_partitions
+from synthetic_harvest import generate_entries
+
+
+def records_for(entries):
+    records = transform_api_data(entries, verbose=False).to_dict('records')
+    records.sort(key=lambda r: r['date'], reverse=True)
+    return records
+
+
+class TestCompactStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_matches_the_json_entries(self):
+        records = records_for(generate_entries(2000))
+        del records[0]['external_id']  # Legacy row without a Harvest ID
+        payload = compact_payload(records)
+
+        self.assertEqual(payload['count'], 2000)
+        self.assertNotIn('weekNum', payload['columns'])
+        self.assertEqual(decode_compact(json.loads(json.dumps(payload))), records)
+        # Strings are stored once, most frequent first
+        codes = [code for column in STRING_COLUMNS for code in payload['columns'][column] if code >= 0]
+        counts = [codes.count(code) for code in range(len(payload['strings']))]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def test_iso_week_at_year_boundaries(self):
+        self.assertEqual(date_fields('2021-01-03')['weekNum'], 53)
+        self.assertEqual(date_fields('2025-12-29')['weekNum'], 1)
+        self.assertEqual(date_fields('2025-12-29')['dayOfWeek'], '_01 Monday')
+
+    def test_rows_with_inconsistent_derived_fields_are_not_encoded(self):
+        records = records_for(generate_entries(50))
+        records[3] = dict(records[3], weekNum=0)
+        self.assertIsNone(compact_payload(records))
+
+    def test_partitions_list_their_compact_file(self):
+        records = records_for(generate_entries(600)) + records_for(
+            generate_entries(30, end_date=datetime.date(2025, 3, 31), start_id=1))
+        manifest, written = write_partitions(self.dir, None, records, [], {}, compact=True)
+        self.assertEqual([p['compactFile'] for p in manifest['partitions']],
+                         ['timeentries_2026.compact.json', 'timeentries_2025.compact.json'])
+        self.assertIn(self.dir / 'timeentries_2025.compact.json', written)
+        for partition in manifest['partitions']:
+            with open(self.dir / partition['compactFile']) as f:
+                self.assertEqual(decode_compact(json.load(f)), load_partitions(self.dir, manifest, [partition['key']]))
+
+        # Rewritten without compact output: the stale file goes and the manifest stops listing it
+        manifest, _ = write_partitions(self.dir, manifest, records[600:], ['2025'], {})
+        self.assertNotIn('compactFile', manifest['partitions'][1])
+        self.assertFalse((self.dir / 'timeentries_2025.compact.json').exists())
+        self.assertIn('compactFile', load_manifest(self.dir)['partitions'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import harvest_api_sync
+from entry_db import EntryDB
+from harvest_api_sync import DatabaseMerge, build_composite_key, open_entry_db, transform_api_data
+from partition_store import load_manifest, load_partitions
+from synthetic_harvest import generate_entries
+
+
+def records_for(entries):
+    return transform_api_data(entries, verbose=False).to_dict('records')
+
+
+class TestEntryDB(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.db_file = root / 'entries.sqlite'
+        self.store = root / 'store'
+        self.patches = [
+            patch.object(harvest_api_sync, 'STORE_DIR', self.store),
+            patch.object(harvest_api_sync, 'DB_FILE', self.db_file),
+            patch.object(harvest_api_sync, 'DASHBOARD_DATA_DIR', root / 'dashboard'),
+        ]
+        for p in self.patches:
+            p.start()
+        # 80 days up to 2026-10-16, then 4 days up to 2025-03-31
+        self.records = records_for(generate_entries(800))
+        self.records += records_for(generate_entries(40, end_date=harvest_api_sync.datetime(2025, 3, 31).date(), start_id=1))
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def save(self, records, manifest=None, keys=()):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return harvest_api_sync.save_data(records, manifest, keys)
+
+    def test_lookups_use_the_indexes(self):
+        db = EntryDB(':memory:')
+        db.rebuild(self.records, build_composite_key, 'run-1')
+        plans = {
+            'max date': "SELECT MAX(date) FROM entries",
+            'by id': "SELECT date FROM entries WHERE external_id IN ('1000000005')",
+            'legacy overlap': "SELECT date FROM entries WHERE composite_key IN ('[]') AND external_id IS NULL AND seq <= 5",
+            'partition': "SELECT entry FROM entries WHERE date BETWEEN '2025' AND '2025-99' ORDER BY date DESC, seq",
+            'persona': "SELECT SUM(hours) FROM entries WHERE prioritisedPersona = 'P3 Professional' AND date < '2026'",
+        }
+        for name, sql in plans.items():
+            plan = ' '.join(row[-1] for row in db.query(f"EXPLAIN QUERY PLAN {sql}"))
+            self.assertIn('INDEX', plan, name)
+            self.assertNotIn('SCAN entries', plan.replace('SCAN entries USING', ''), name)
+
+        self.assertEqual(db.max_date(), '2026-10-16')
+        self.assertEqual(db.partition('2025'), self.records[800:])
+        self.assertEqual(len(db.ids()), 840)
+
+    def test_save_reports_partitions_not_files(self):
+        out = io.StringIO()
+        with patch.object(harvest_api_sync, 'COMPACT_EXPORT', True), contextlib.redirect_stdout(out):
+            harvest_api_sync.save_data(self.records)
+        self.assertIn(f"Exported {len(self.records)} records to 2 partitions", out.getvalue())
+
+    def test_rebuilt_only_when_stamp_lags_the_manifest(self):
+        manifest = self.save(self.records)
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = open_entry_db(manifest)
+        self.assertEqual(db.stamp, manifest['generatedAt'])
+        self.assertEqual([row for key in ('2026', '2025') for row in db.partition(key)],
+                         load_partitions(self.store, manifest))
+        db.close()
+
+        with patch.object(EntryDB, 'rebuild', side_effect=AssertionError('rebuilt')):
+            open_entry_db(manifest).close()
+
+        # Store rewritten behind the database's back (XLSX rebuild, --remap, git pull)
+        manifest = self.save(self.records[:800], manifest, ['2025'])
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = open_entry_db(load_manifest(self.store))
+        self.assertEqual(db.count(), 800)
+
+    def test_uncommitted_run_leaves_the_database_unchanged(self):
+        manifest = self.save(self.records)
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = open_entry_db(manifest)
+        merge = DatabaseMerge(db)
+        edited = transform_api_data([dict(e, notes='edited') for e in generate_entries(10)], verbose=False)
+        merge.add(edited)
+        with contextlib.redirect_stdout(io.StringIO()):
+            merge.delete({'1000000100'})
+            final = merge.finish()
+        self.assertEqual(sum(r['notes'] == 'edited' for r in final), 10)
+        self.assertEqual(len(final), 799)
+        db.close()  # Crash before the export committed
+
+        db = EntryDB(self.db_file)
+        self.assertEqual(db.count(), 840)
+        self.assertEqual(db.partition('2026'), self.records[:800])
+        self.assertEqual(db.stamp, manifest['generatedAt'])
+
+
+if __name__ == '__main__':
+    unittest.main()
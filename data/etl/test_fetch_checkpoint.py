@@ -0,0 +1,89 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import harvest_api_sync
+import harvest_async
+from fetch_checkpoint import PageCheckpoint, clear_checkpoints
+from test_harvest_fetch import PER_PAGE, TOTAL_PAGES, StandInHarvest, StandInServerMixin
+
+QUERY = {'from_date': '2025-01-01'}
+CLIENTS = {
+    'threads': lambda checkpoint: harvest_api_sync.iter_time_entry_pages(workers=2, checkpoint=checkpoint, **QUERY),
+    'async': lambda checkpoint: harvest_async.iter_time_entry_pages(concurrency=2, checkpoint=checkpoint, **QUERY),
+}
+
+
+class TestFetchCheckpoint(StandInServerMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        StandInHarvest.throttle_page = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.patches.append(patch.object(harvest_api_sync, 'MAX_RETRIES', 0))
+        self.patches[-1].start()
+
+    def tearDown(self):
+        super().tearDown()
+        self.tmp.cleanup()
+
+    def fetch(self, client, store='run-1'):
+        """Entry IDs fetched by one run, and the pages it requested."""
+        StandInHarvest.requests_seen = []
+        checkpoint = PageCheckpoint(self.root, QUERY, store=store)
+        ids = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                for page in CLIENTS[client](checkpoint):
+                    ids += [entry['id'] for entry in page]
+            except Exception:
+                pass
+        return ids, sorted(StandInHarvest.requests_seen), checkpoint
+
+    def test_rerun_resumes_after_the_last_good_page(self):
+        for client in CLIENTS:
+            with self.subTest(client=client):
+                StandInHarvest.fail_page = 4
+                ids, first_requests, _ = self.fetch(client)
+                self.assertEqual(ids, self.expected_ids()[:9])
+
+                StandInHarvest.fail_page = None
+                ids, requests_seen, checkpoint = self.fetch(client)
+                self.assertEqual(ids, self.expected_ids())
+                # Every page was downloaded successfully exactly once across both runs
+                succeeded = [page for page in first_requests if page != 4] + requests_seen
+                self.assertEqual(sorted(succeeded), list(range(1, TOTAL_PAGES + 1)))
+                self.assertEqual(sorted(checkpoint.replayed), [page for page in first_requests if page != 4])
+                self.assertEqual(self.fetch(client)[1], [])  # Complete: replayed without requests
+                clear_checkpoints(self.root)
+
+    def test_checkpoint_of_another_store_version_is_ignored(self):
+        StandInHarvest.fail_page = 4
+        self.fetch('threads')
+        StandInHarvest.fail_page = None
+        ids, requests_seen, checkpoint = self.fetch('threads', store='run-2')
+        self.assertEqual(requests_seen, list(range(1, TOTAL_PAGES + 1)))
+        self.assertEqual(checkpoint.replayed, [])
+
+    def test_all_pages_are_refetched_when_results_shifted(self):
+        for client in CLIENTS:
+            with self.subTest(client=client):
+                StandInHarvest.fail_page = 4
+                self.fetch(client)
+                StandInHarvest.fail_page = None
+                # Entries were logged since: the result set grew by a page
+                StandInHarvest.total_pages = TOTAL_PAGES + 1
+                StandInHarvest.total_entries += PER_PAGE
+                ids, requests_seen, checkpoint = self.fetch(client)
+                self.assertEqual(set(ids), set(self.expected_ids(TOTAL_PAGES + 1)))
+                self.assertEqual(set(requests_seen), set(range(1, TOTAL_PAGES + 2)))
+                self.assertEqual(checkpoint.replayed, [])
+                self.assertEqual(self.fetch(client)[1], [])  # The new pages were spilled too
+                clear_checkpoints(self.root)
+                StandInHarvest.total_pages, StandInHarvest.total_entries = TOTAL_PAGES, TOTAL_PAGES * PER_PAGE
+
+if __name__ == '__main__':
+    unittest.main()
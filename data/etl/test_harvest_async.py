@@ -0,0 +1,94 @@
+import asyncio
+import time
+import unittest
+
+import harvest_api_sync
+import harvest_async
+from harvest_async import AdaptiveLimiter
+from instrumentation import FetchStats
+from test_harvest_fetch import TOTAL_PAGES, StandInHarvest, StandInServerMixin
+
+
+class TestAsyncFetch(StandInServerMixin, unittest.TestCase):
+    def test_pipelined_fetch_keeps_page_order(self):
+        entries = harvest_async.fetch_time_entries('2025-01-01', concurrency=8)
+        self.assertEqual([e['id'] for e in entries], self.expected_ids())
+        self.assertGreater(StandInHarvest.max_in_flight, 1)
+        self.assertEqual(StandInHarvest.requests_seen.count(3), 2)
+
+    def test_page_iterator_streams_in_order(self):
+        stats = FetchStats()
+        pages = list(harvest_async.iter_time_entry_pages('2025-01-01', concurrency=4, stats=stats))
+        self.assertEqual(len(pages), TOTAL_PAGES)
+        self.assertEqual([e['id'] for page in pages for e in page], self.expected_ids())
+        self.assertEqual((stats.to_dict()['pages'], stats.throttled), (TOTAL_PAGES, 1))
+
+    def test_throughput_beats_sequential_sync_client(self):
+        StandInHarvest.latency = 0.1
+        StandInHarvest.throttle_page = None
+
+        start = time.monotonic()
+        sync_entries = harvest_api_sync.fetch_time_entries('2025-01-01', workers=1)
+        sync_elapsed = time.monotonic() - start
+
+        start = time.monotonic()
+        async_entries = harvest_async.fetch_time_entries('2025-01-01', concurrency=8)
+        async_elapsed = time.monotonic() - start
+
+        self.assertEqual(async_entries, sync_entries)
+        self.assertLess(async_elapsed, sync_elapsed / 1.5)
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def test_throttle_halves_window_and_success_grows_it(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(max_concurrency=8, capacity=1000, period=1)
+            await limiter.acquire()
+            await limiter.release(throttled_for=0)
+            self.assertEqual(limiter.limit, 4)
+            for _ in range(20):
+                await limiter.acquire()
+                await limiter.release()
+            self.assertGreater(limiter.limit, 4)
+            self.assertLessEqual(limiter.limit, 8)
+
+        asyncio.run(scenario())
+
+    def test_caps_requests_in_flight(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(max_concurrency=2)
+            peak = 0
+
+            async def request():
+                nonlocal peak
+                await limiter.acquire()
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+                await limiter.release()
+
+            await asyncio.gather(*(request() for _ in range(6)))
+            return peak
+
+        self.assertEqual(asyncio.run(scenario()), 2)
+
+    def test_never_exceeds_capacity_in_any_window(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(max_concurrency=8, capacity=5, period=0.3)
+            sent = []
+            for _ in range(12):
+                await limiter.acquire()
+                sent.append(time.monotonic())
+                await limiter.release()
+            return sent
+
+        sent = asyncio.run(scenario())
+        self.assertTrue(all(later - earlier >= 0.29 for earlier, later in zip(sent, sent[5:])))
+
+    def test_backoff_is_jittered_exponential(self):
+        delays = [harvest_api_sync.backoff_delay(3) for _ in range(50)]
+        self.assertTrue(all(0 <= d <= harvest_api_sync.BASE_DELAY * 8 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
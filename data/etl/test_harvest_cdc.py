@@ -0,0 +1,244 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import harvest_api_sync
+from instrumentation import load_reports
+from partition_store import load_manifest, load_partitions
+from streaks import write_streaks
+from test_merge import reference_merge
+
+
+class FakeHarvest:
+    """In-memory /v2/time_entries honouring the from/to/updated_since filters."""
+
+    def __init__(self):
+        self.entries = {}
+        self.clock = 0
+        self.calls = []
+
+    def put(self, entry_id, spent_date, notes='run'):
+        self.clock += 1
+        self.entries[entry_id] = {
+            'id': entry_id,
+            'spent_date': spent_date,
+            'hours': 1.0,
+            'notes': notes,
+            'task': {'name': '[Individual] Health, Fitness'},
+            'started_time': '7:00',
+            'ended_time': '8:00',
+            'updated_at': f"2026-10-{self.clock:02d}T08:00:00Z",
+        }
+
+    def pages(self, from_date=None, workers=None, updated_since=None, per_page=2, stats=None, checkpoint=None,
+              to_date=None):
+        self.calls.append({'from_date': from_date, 'to_date': to_date, 'updated_since': updated_since})
+        matches = [
+            dict(e) for e in self.entries.values()
+            if (not from_date or e['spent_date'] >= from_date)
+            and (not to_date or e['spent_date'] <= to_date)
+            and (not updated_since or e['updated_at'] > updated_since)
+        ]
+        yield matches[:per_page]
+        for start in range(per_page, len(matches), per_page):
+            yield matches[start:start + per_page]
+
+
+class TestChangeDataCapture(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp_root = Path(self.tmp.name)
+        self.reports = root / 'sync_runs.jsonl'
+        self.store = root / 'store'
+        self.issues = root / 'interval_issues.json'
+        self.harvest = FakeHarvest()
+        # The recent reconciliation window starts on 2026-09-02 whatever today is
+        self.today = harvest_api_sync.datetime.now().strftime('%Y-%m-%d')
+        recent_days = (harvest_api_sync.datetime.now() - harvest_api_sync.datetime(2026, 9, 1)).days
+        self.patches = [
+            patch.object(harvest_api_sync, 'RECONCILE_RECENT_DAYS', recent_days),
+            patch.object(harvest_api_sync, 'STORE_DIR', self.store),
+            patch.object(harvest_api_sync, 'DB_FILE', root / 'entries.sqlite'),
+            patch.object(harvest_api_sync, 'OUTPUT_FILE', root / 'legacy.json'),
+            patch.object(harvest_api_sync, 'DASHBOARD_DATA_DIR', root / 'dashboard'),
+            patch.object(harvest_api_sync, 'ROLLUP_DIR', root / 'rollups'),
+            patch.object(harvest_api_sync, 'RUN_REPORT_FILE', root / 'sync_runs.jsonl'),
+            patch.object(harvest_api_sync, 'CHECKPOINT_DIR', root / 'checkpoint'),
+            patch.object(harvest_api_sync, 'ISSUES_FILE', self.issues),
+            patch.object(harvest_api_sync, 'iter_time_entry_pages', self.harvest.pages),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def sync(self, *argv):
+        self.harvest.calls = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            harvest_api_sync.main(list(argv))
+        manifest = load_manifest(self.store)
+        return manifest, load_partitions(self.store, manifest)
+
+    def test_incremental_cycle(self):
+        self.harvest.put(1, '2025-03-01')
+        self.harvest.put(2, '2026-10-01')
+        self.harvest.put(3, '2026-10-02')
+
+        # First run: no high-water mark yet, so the default lookback is used
+        manifest, entries = self.sync()
+        self.assertEqual(self.harvest.calls[0]['updated_since'], None)
+        self.assertEqual(manifest['sync']['updatedSince'], '2026-10-03T08:00:00Z')
+        self.assertEqual(len(entries), 3)
+
+        # Next run has a store to reconcile: the recent window, plus an older slice
+        # (2026-06-04..2026-09-01) that holds no stored IDs and so is not fetched
+        manifest, entries = self.sync()
+        self.assertEqual(self.harvest.calls[1:], [{'from_date': '2026-09-02', 'to_date': self.today, 'updated_since': None}])
+        self.assertIn('lastReconciledAt', manifest['sync'])
+        self.assertEqual(manifest['sync']['reconcileBefore'], '2026-06-04')
+
+        # Quiet day: one updated_since query, nothing rewritten
+        self.sync()
+        self.assertEqual(self.harvest.calls, [{'from_date': None, 'to_date': None, 'updated_since': '2026-10-03T08:00:00Z'}])
+        self.assertEqual(load_manifest(self.store)['generatedAt'], manifest['generatedAt'])
+
+        # An edit to an old entry is picked up without widening any window
+        self.harvest.put(1, '2025-03-01', notes='edited')
+        manifest, entries = self.sync()
+        self.assertEqual(manifest['sync']['updatedSince'], '2026-10-04T08:00:00Z')
+        edited = next(e for e in entries if e['external_id'] == '1')
+        self.assertEqual(edited['notes'], 'edited')
+        self.assertEqual(len(entries), 3)
+
+        # Deletions only show up through ID reconciliation
+        del self.harvest.entries[2]
+        manifest, entries = self.sync()
+        self.assertEqual(len(entries), 3)
+        manifest, entries = self.sync('--reconcile')
+        self.assertEqual(sorted(e['external_id'] for e in entries), ['1', '3'])
+        self.assertEqual(self.harvest.calls[-1]['from_date'], '2026-09-02')
+        self.assertEqual(manifest['sync']['reconcileBefore'], '2026-03-06')
+
+        # Every run appended one report line
+        reports = load_reports(self.reports)
+        self.assertEqual([r['status'] for r in reports], ['ok', 'no-changes', 'no-changes', 'ok', 'no-changes', 'ok'])
+        self.assertEqual(reports[2]['query'], {'updated_since': '2026-10-03T08:00:00Z'})
+        self.assertEqual(reports[0]['stages']['fetch']['rows'], 3)
+        self.assertEqual(reports[-1]['stages']['reconcile']['deleted'], 1)
+        self.assertEqual(reports[-1]['recordCount'], 2)
+        # Streaks were updated for each run's window only, yet match a full rebuild
+        with open(self.tmp_root / 'rollups' / 'streaks.json') as f:
+            streaks = json.load(f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            rebuilt = write_streaks(self.store, self.tmp_root / 'full')
+        with open(rebuilt) as f:
+            self.assertEqual(streaks, json.load(f))
+        self.assertEqual(set(reports[0]['stages']), {'load', 'fetch', 'transform', 'merge', 'save', 'rollups', 'intervals', 'streaks', 'validate'})
+
+    def test_identical_refetch_writes_nothing(self):
+        self.harvest.put(1, '2025-03-01')
+        self.harvest.put(2, '2026-10-01')
+        self.harvest.put(3, '2026-10-01')
+        self.sync()
+        manifest, _ = self.sync()  # Reconciles (first run had no index to reconcile against)
+        files = {path.name: path.stat().st_mtime_ns for path in self.store.iterdir()}
+
+        # Entries 2 and 3 are both logged 07:00-08:00 on the same day
+        with open(self.issues) as f:
+            issues = json.load(f)
+        self.assertEqual(issues['counts'], {'overlaps': 1, 'gaps': 0})
+        self.assertEqual(sorted([issues['overlaps']['entry'][0], issues['overlaps']['previous'][0]]), ['2', '3'])
+        self.assertEqual(issues['overlaps']['minutes'], [60])
+
+        # Touched in Harvest without any change: fetched again, but nothing is rewritten
+        self.harvest.put(2, '2026-10-01')
+        self.sync()
+        self.assertEqual({path.name: path.stat().st_mtime_ns for path in self.store.iterdir()}, files)
+        self.assertEqual(load_reports(self.reports)[-1]['status'], 'no-changes')
+        self.assertEqual(load_reports(self.reports)[-1]['stages']['fetch']['rows'], 1)
+
+        # A real edit rewrites only its own partition
+        self.harvest.put(3, '2026-10-01', notes='edited')
+        manifest, entries = self.sync()
+        changed = {name for name, mtime in files.items() if (self.store / name).stat().st_mtime_ns != mtime}
+        self.assertEqual(changed, {'timeentries_2026.json', 'timeentries_2026.arrow', 'timeentries_2026.compact.json',
+                                   'manifest.json'})
+        self.assertEqual(next(e for e in entries if e['external_id'] == '3')['notes'], 'edited')
+        self.assertEqual(manifest['sync']['updatedSince'], '2026-10-05T08:00:00Z')
+
+    def test_streamed_pages_match_full_scan_merge(self):
+        for i in range(12):
+            self.harvest.put(100 + i, f"2026-0{i % 3 + 1}-0{i % 9 + 1}")
+        self.sync()
+        stored = load_partitions(self.store, load_manifest(self.store))
+
+        for i in range(0, 12, 3):
+            self.harvest.put(100 + i, f"2025-12-0{i % 9 + 1}", notes='moved')
+        for i in range(5):
+            self.harvest.put(200 + i, f"2026-0{i % 3 + 1}-1{i}")
+        changed = list(self.harvest.pages(updated_since='2026-10-12T08:00:00Z', per_page=100))[0]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            new_records = harvest_api_sync.transform_api_data(changed).to_dict('records')
+        expected, _, _ = reference_merge(stored, new_records)
+        _, entries = self.sync()
+        self.assertEqual(entries, json.loads(json.dumps(expected)))
+
+    def test_reconciliation_schedule(self):
+        self.assertTrue(harvest_api_sync.reconciliation_due({}))
+        state = {'lastReconciledAt': '2026-10-10T06:00:00'}
+        now = harvest_api_sync.datetime(2026, 10, 16, 6, 0)
+        self.assertFalse(harvest_api_sync.reconciliation_due(state, now))
+        now = harvest_api_sync.datetime(2026, 10, 17, 6, 0)
+        self.assertTrue(harvest_api_sync.reconciliation_due(state, now))
+
+
+class TestReconciliationWindows(unittest.TestCase):
+    def test_reconcile_windows_rotate_through_history(self):
+        windows = harvest_api_sync.reconcile_windows
+        today = harvest_api_sync.datetime(2026, 10, 17).date()
+        stored = {'1': '2026-01-10', '2': '2026-10-01'}
+
+        # Recent 90 days, then older slices walking back to the oldest stored date
+        self.assertEqual(windows(stored, {}, today),
+                         ([('2026-07-20', '2026-10-17'), ('2026-04-21', '2026-07-19')], '2026-04-21'))
+        self.assertEqual(windows(stored, {'reconcileBefore': '2026-04-21'}, today),
+                         ([('2026-07-20', '2026-10-17'), ('2026-01-21', '2026-04-20')], '2026-01-21'))
+        self.assertEqual(windows(stored, {'reconcileBefore': '2026-01-21'}, today),
+                         ([('2026-07-20', '2026-10-17'), ('2026-01-10', '2026-01-20')], '2026-01-10'))
+        # ...and wrapping around once it gets there
+        self.assertEqual(windows(stored, {'reconcileBefore': '2026-01-10'}, today),
+                         ([('2026-07-20', '2026-10-17'), ('2026-04-21', '2026-07-19')], '2026-04-21'))
+
+        # Young stores are covered by the recent window alone
+        self.assertEqual(windows({'2': '2026-10-01'}, {'reconcileBefore': '2026-04-21'}, today),
+                         ([('2026-10-01', '2026-10-17')], None))
+        self.assertEqual(windows({}, {}, today), ([], None))
+
+    def test_deletions_only_reported_inside_fetched_windows(self):
+        harvest = FakeHarvest()
+        harvest.put(1, '2026-01-10')
+        harvest.put(2, '2026-10-01')
+        stored = {'1': '2026-01-10', '2': '2026-10-01', '3': '2026-01-12', '4': '2025-06-01', '5': '2026-10-02'}
+        windows = [('2026-07-20', '2026-10-17'), ('2026-01-10', '2026-01-20')]
+        with contextlib.redirect_stdout(io.StringIO()):
+            deleted = harvest_api_sync.find_deleted_ids(stored, harvest.pages, windows, live_ids={'5'})
+        self.assertEqual(deleted, {'3'})
+        self.assertEqual([(c['from_date'], c['to_date']) for c in harvest.calls], windows)
+
+        # A window Harvest returns nothing for is skipped rather than emptied
+        del harvest.entries[1]
+        with contextlib.redirect_stdout(io.StringIO()):
+            deleted = harvest_api_sync.find_deleted_ids(stored, harvest.pages, windows)
+        self.assertEqual(deleted, {'5'})
+
+
+if __name__ == '__main__':
+    unittest.main()
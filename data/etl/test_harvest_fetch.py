@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import harvest_api_sync
+from harvest_api_sync import RateLimiter, fetch_time_entries, iter_time_entry_pages
+from instrumentation import FetchStats
+
+TOTAL_PAGES = 6
+PER_PAGE = 3
+
+
+class StandInHarvest(BaseHTTPRequestHandler):
+    """Minimal /v2/time_entries stand-in: paged entries, one 429, slow responses."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    throttled = False
+    requests_seen = []
+    total_pages = TOTAL_PAGES
+    throttle_page = 3
+    fail_page = None  # Always answers 500
+    total_entries = TOTAL_PAGES * PER_PAGE
+    latency = 0.05
+
+    def do_GET(self):
+        cls = type(self)
+        page = int(parse_qs(urlparse(self.path).query)['page'][0])
+        with cls.lock:
+            cls.requests_seen.append(page)
+            if page == cls.fail_page:
+                self.send_response(500)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if page == cls.throttle_page and not cls.throttled:
+                cls.throttled = True
+                self.send_response(429)
+                self.send_header('Retry-After', '0')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(cls.latency)
+        entries = [{'id': page * 100 + i, 'spent_date': '2025-01-01'} for i in range(PER_PAGE)]
+        body = json.dumps({
+            'time_entries': entries,
+            'total_pages': cls.total_pages,
+            'total_entries': cls.total_entries,
+            'next_page': page + 1 if page < (cls.total_pages or TOTAL_PAGES) else None,
+        }).encode()
+        with cls.lock:
+            cls.in_flight -= 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServerMixin:
+    """Runs StandInHarvest on a free local port and points the sync script at it."""
+
+    def setUp(self):
+        StandInHarvest.in_flight = StandInHarvest.max_in_flight = 0
+        StandInHarvest.throttled = False
+        StandInHarvest.requests_seen = []
+        StandInHarvest.total_pages = TOTAL_PAGES
+        StandInHarvest.throttle_page = 3
+        StandInHarvest.fail_page = None
+        StandInHarvest.total_entries = TOTAL_PAGES * PER_PAGE
+        StandInHarvest.latency = 0.05
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHarvest)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{self.server.server_port}/v2/time_entries"
+        self.patches = [
+            patch.object(harvest_api_sync, 'HARVEST_API_URL', url),
+            patch.dict(os.environ, {'HARVEST_ACCESS_TOKEN': 't', 'HARVEST_ACCOUNT_ID': '1'}),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def expected_ids(self, pages=TOTAL_PAGES):
+        return [page * 100 + i for page in range(1, pages + 1) for i in range(PER_PAGE)]
+
+
+class TestFetchTimeEntries(StandInServerMixin, unittest.TestCase):
+
+    def test_concurrent_fetch_keeps_page_order(self):
+        entries = fetch_time_entries('2025-01-01', workers=4)
+        self.assertEqual([e['id'] for e in entries], self.expected_ids())
+        self.assertGreater(StandInHarvest.max_in_flight, 1)
+        # Page 3 was throttled once and retried
+        self.assertEqual(StandInHarvest.requests_seen.count(3), 2)
+
+    def test_pages_are_yielded_before_the_fetch_completes(self):
+        pages = iter_time_entry_pages('2025-01-01', workers=2)
+        first = next(pages)
+        self.assertEqual([e['id'] for e in first], self.expected_ids()[:3])
+        self.assertLess(len(StandInHarvest.requests_seen), TOTAL_PAGES + 1)
+        rest = [e['id'] for page in pages for e in page]
+        self.assertEqual(rest, self.expected_ids()[3:])
+
+    def test_fetch_stats_record_latency_and_throttling(self):
+        stats = FetchStats()
+        pages = list(iter_time_entry_pages('2025-01-01', workers=2, stats=stats))
+        self.assertEqual(len(pages), TOTAL_PAGES)
+        summary = stats.to_dict()
+        self.assertEqual(summary['pages'], TOTAL_PAGES)
+        self.assertEqual(summary['throttled'], 1)
+        self.assertGreaterEqual(summary['pageLatencyMs']['p50'], 50)
+
+    def test_follows_next_page_without_total_pages(self):
+        StandInHarvest.total_pages = None
+        entries = fetch_time_entries('2025-01-01', workers=4)
+        self.assertEqual([e['id'] for e in entries], self.expected_ids())
+        self.assertEqual(StandInHarvest.max_in_flight, 1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_blocks_once_budget_is_spent(self):
+        limiter = RateLimiter(capacity=2, period=0.2)
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+        self.assertGreater(limiter.waited, 0)
+
+    def test_never_exceeds_capacity_in_any_window(self):
+        limiter = RateLimiter(capacity=5, period=0.3)
+        sent = []
+        for _ in range(12):
+            limiter.acquire()
+            sent.append(time.monotonic())
+        # Starts with a burst of 5 at most, not a full bucket plus its refill
+        self.assertTrue(all(later - earlier >= 0.29 for earlier, later in zip(sent, sent[5:])))
+
+    def test_pause_delays_next_request(self):
+        limiter = RateLimiter(capacity=10, period=1)
+        limiter.pause(0.1)
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
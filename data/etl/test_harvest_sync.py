@@ -1,14 +1,10 @@
-
+import json
 import unittest
-import sys
-from unittest.mock import MagicMock
-
-# Mock requests and pandas before importing harvest_api_sync
-sys.modules["requests"] = MagicMock()
-sys.modules["pandas"] = MagicMock()
 
+import harvest_api_sync
 from harvest_api_sync import clean_nans
 
+
 class TestHarvestSync(unittest.TestCase):
     def test_clean_nans_float(self):
         self.assertIsNone(clean_nans(float('nan')))
@@ -30,5 +26,20 @@ class TestHarvestSync(unittest.TestCase):
         expected = [{'a': None}, [None, 2]]
         self.assertEqual(clean_nans(data), expected)
 
+class TestTransformOutputIsJsonReady(unittest.TestCase):
+    def test_records_need_no_clean_nans_pass(self):
+        entries = [
+            {'id': 1, 'spent_date': '2026-10-01', 'hours': 1.0, 'notes': None,
+             'task': {'name': '[Friend] Social'}, 'started_time': None, 'ended_time': '9:00'},
+            {'id': 2, 'spent_date': '2026-10-02', 'hours': 2.5, 'notes': 'dinner with nofal',
+             'task': {'name': '[Individual] Rest n Sleep'}},
+        ]
+        records = harvest_api_sync.transform_api_data(entries, verbose=False).to_dict('records')
+        self.assertEqual(records, clean_nans(records))
+        json.dumps(records, default=str, allow_nan=False)  # Raises on NaN
+        self.assertIsNone(records[0]['notes'])
+        self.assertEqual(records[1]['socialEntity'], None)
+        self.assertEqual(records[0]['socialEntity'], 'General-Nurturing Relationships')
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from instrumentation import RUN_REPORT_PREFIX, RunReport, load_reports
+
+
+class TestRunReport(unittest.TestCase):
+    def test_stages_accumulate_and_report_appends_json_lines(self):
+        report = RunReport('test', client='threads')
+        pages = report.timed_iter('fetch', iter([[1, 2], [3]]))
+        for page in pages:
+            report.count('fetch', rows=len(page), pages=1)
+            with report.stage('transform', rows=len(page)):
+                time.sleep(0.01)
+        with report.stage('save') as save:
+            save['partitions'] = 2
+        report.status = 'ok'
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'runs.jsonl'
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                report.write(path)
+                report.write(path)
+            reports = load_reports(path)
+
+        self.assertTrue(out.getvalue().startswith(RUN_REPORT_PREFIX))
+        self.assertEqual(len(reports), 2)
+        data = reports[0]
+        self.assertEqual((data['run'], data['status'], data['client']), ('test', 'ok', 'threads'))
+        self.assertEqual(list(data['stages']), ['fetch', 'transform', 'save'])
+        self.assertEqual(data['stages']['fetch']['rows'], 3)
+        self.assertEqual(data['stages']['fetch']['calls'], 3)  # two pages + exhaustion
+        transform = data['stages']['transform']
+        self.assertEqual((transform['rows'], transform['calls']), (3, 2))
+        self.assertGreaterEqual(transform['wallSeconds'], 0.02)
+        self.assertGreater(transform['rowsPerSecond'], 0)
+        self.assertEqual(data['stages']['save']['partitions'], 2)
+        self.assertGreater(data['peakRssMb'], 0)
+        self.assertEqual(data['fetch']['pages'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
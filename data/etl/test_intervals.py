@@ -0,0 +1,106 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from harvest_api_sync import transform_api_data
+from intervals import (
+    COLUMNS, INTERVALS_FILE, build_intervals, find_interval_issues, interval_frame, parse_clock, write_intervals,
+)
+from partition_store import write_partitions
+from synthetic_harvest import SLEEP, WORK, generate_entries
+
+
+def entry(entry_id, day, task, started, ended):
+    return {'id': entry_id, 'spent_date': day, 'hours': 1.0, 'notes': None,
+            'started_time': started, 'ended_time': ended, 'task': {'name': task}}
+
+
+def frame(entries):
+    return transform_api_data(entries, verbose=False)[COLUMNS + ['external_id']]
+
+
+class TestParseClock(unittest.TestCase):
+    def test_formats(self):
+        self.assertEqual(parse_clock('8:05'), 485)
+        self.assertEqual(parse_clock('08:05:00'), 485)  # datetime.time from the XLSX export
+        self.assertEqual(parse_clock('8:05pm'), 1205)
+        self.assertEqual(parse_clock('12:15am'), 15)
+        self.assertEqual(parse_clock('24:00'), 1440)
+        for value in ('', None, 'nan', '9', '25:00', '7:75'):
+            self.assertEqual(parse_clock(value), -1, value)
+
+
+class TestBuildIntervals(unittest.TestCase):
+    def setUp(self):
+        # Monday 6 Jan 2025: overlapping work ending late, then sleep running into Tuesday
+        self.result = build_intervals(frame([
+            entry(1, '2025-01-06', WORK, '9:00', '12:00'),
+            entry(2, '2025-01-06', WORK, '11:30', '20:15'),
+            entry(3, '2025-01-06', SLEEP, '22:30', '23:59'),
+            entry(4, '2025-01-07', SLEEP, '0:00', '6:30'),
+            entry(5, '2025-01-07', WORK, '8:00', '17:00'),
+            entry(6, '2025-01-11', SLEEP, '14:00', '15:00'),
+            entry(7, '2025-01-11', WORK, '', ''),
+        ]))
+
+    def test_daily_bounds_and_coverage(self):
+        self.assertEqual(self.result['dates'], ['2025-01-06', '2025-01-07', '2025-01-11'])
+        work = self.result['personas']['P3 Professional']
+        self.assertEqual(work['firstStart'], [540, 480, None])
+        self.assertEqual(work['lastEnd'], [1215, 1020, None])
+        self.assertEqual(self.result['coverage']['overlapMinutes'], [30, 0, 0])
+        self.assertEqual(self.result['coverage']['gapMinutes'], [135, 90, 0])
+
+    def test_late_days(self):
+        late = self.result['work']['lateDays']
+        self.assertEqual(late['byYear'], {'2025': [1, 0, 0, 0, 0, 0, 0]})
+        self.assertEqual(late['byWeek'], {'periods': ['2025-W02'], 'counts': [1]})
+
+    def test_sleep_is_joined_across_midnight(self):
+        sleep = self.result['sleep']
+        self.assertEqual(sleep['nights'], {'wakeDate': ['2025-01-07'], 'bedtime': [1350], 'wakeup': [390], 'minutes': [480]})
+        self.assertEqual(sleep['siestas'], {'2025': {'count': 1, 'weekday': 0, 'weekend': 1, 'minutes': 60}})
+
+
+class TestIntervalIssues(unittest.TestCase):
+    def test_overlaps_and_gaps_name_both_entries(self):
+        issues = find_interval_issues(interval_frame(frame([
+            entry(1, '2025-01-06', WORK, '9:00', '17:00'),
+            entry(2, '2025-01-06', WORK, '10:00', '11:00'),  # Inside entry 1
+            entry(3, '2025-01-06', WORK, '16:30', '18:00'),  # Overlaps 1, not 2
+            entry(4, '2025-01-06', SLEEP, '21:00', '23:59'),
+            entry(5, '2025-01-07', SLEEP, '0:00', '6:00'),
+            entry(6, '2025-01-07', WORK, '6:30', '7:00'),
+        ])), gap_minutes=60)
+        self.assertEqual(issues['overlaps'], {
+            'date': ['2025-01-06', '2025-01-06'], 'entry': ['2', '3'], 'previous': ['1', '1'],
+            'from': ['10:00', '16:30'], 'to': ['11:00', '17:00'], 'minutes': [60, 30],
+        })
+        # 18:00 -> 21:00 is reported; the 30 minutes on the 7th are under the threshold
+        self.assertEqual(issues['gaps'], {
+            'date': ['2025-01-06'], 'entry': ['4'], 'previous': ['3'],
+            'from': ['18:00'], 'to': ['21:00'], 'minutes': [180],
+        })
+
+
+class TestWriteIntervals(unittest.TestCase):
+    def test_written_from_the_store_without_timestamps(self):
+        records = transform_api_data(generate_entries(400), verbose=False).to_dict('records')
+        with tempfile.TemporaryDirectory() as tmp:
+            store, out = Path(tmp) / 'store', Path(tmp) / 'rollups'
+            manifest, _ = write_partitions(store, None, records, [], {})
+            path = write_intervals(store, out, mirror_dir=Path(tmp) / 'public')
+            first = path.read_bytes()
+            write_intervals(store, out)
+            self.assertEqual(path.read_bytes(), first)
+            self.assertEqual((Path(tmp) / 'public' / INTERVALS_FILE).read_bytes(), first)
+
+            payload = json.loads(first)
+            self.assertEqual(payload['recordCount'], manifest['recordCount'])
+            self.assertEqual(len(payload['dates']), 40)
+            self.assertEqual(len(payload['sleep']['nights']['wakeDate']), len(payload['sleep']['nights']['minutes']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from json_writer import write_entries_json, mirror_file
+
+
+class TestJsonWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_streams_generator_with_metadata(self):
+        entries = ({'date': d, 'hours': 1.0} for d in ['2024-01-02', '2023-12-31', '', '2024-02-01'])
+        path = self.dir / 'out.json'
+
+        metadata = write_entries_json(path, entries, {'source': 'test'})
+
+        data = json.loads(path.read_text())
+        self.assertEqual(len(data['entries']), 4)
+        self.assertEqual(data['metadata'], metadata)
+        self.assertEqual(metadata['recordCount'], 4)
+        self.assertEqual(metadata['dateRange'], {'start': '2023-12-31', 'end': '2024-02-01'})
+        self.assertEqual(metadata['source'], 'test')
+
+    def test_nan_refused_and_empty_input(self):
+        path = self.dir / 'out.json'
+        write_entries_json(path, [{'date': None, 'v': None}])
+
+        # NaN is refused rather than written as invalid JSON
+        with self.assertRaises(ValueError):
+            write_entries_json(path, [{'date': None, 'v': float('nan')}])
+        self.assertEqual(json.loads(path.read_text())['entries'], [{'date': None, 'v': None}])
+
+        write_entries_json(path, [])
+        data = json.loads(path.read_text())
+        self.assertEqual(data['entries'], [])
+        self.assertEqual(data['metadata']['dateRange'], {'start': None, 'end': None})
+
+    def test_failed_write_keeps_previous_file(self):
+        path = self.dir / 'out.json'
+        write_entries_json(path, [{'date': '2024-01-01'}])
+
+        def broken():
+            yield {'date': '2024-01-02'}
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            write_entries_json(path, broken())
+        self.assertEqual(json.loads(path.read_text())['metadata']['recordCount'], 1)
+        self.assertEqual(sorted(p.name for p in self.dir.iterdir()), ['out.json'])
+
+    def test_mirror_file(self):
+        source = self.dir / 'a.json'
+        target = self.dir / 'nested' / 'b.json'
+        write_entries_json(source, [{'date': '2024-01-01'}])
+        target.parent.mkdir()
+        target.write_text('stale')
+
+        mirror_file(source, target)
+
+        self.assertEqual(target.read_text(), source.read_text())
+        self.assertTrue(os.path.samefile(source, target))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import contextlib
+import io
+import random
+import unittest
+
+import pandas as pd
+
+from entry_db import EntryDB
+from harvest_api_sync import DatabaseMerge, build_composite_key
+
+
+def reference_merge(existing, new_records):
+    """The original full-scan merge, kept as the parity reference."""
+    new_ids, new_keys, deduped = set(), set(), []
+    stats = dict(dup_ids=0, dup_keys=0, legacy=0, overwritten=0, preserved=0, overlap=0)
+    for record in new_records:
+        record_id = str(record.get('external_id')) if record.get('external_id') else None
+        key = build_composite_key(record)
+        if record_id:
+            if record_id in new_ids:
+                stats['dup_ids'] += 1
+                continue
+            new_ids.add(record_id)
+        elif key in new_keys:
+            stats['dup_keys'] += 1
+            continue
+        new_keys.add(key)
+        deduped.append(record)
+
+    final = []
+    for row in existing:
+        row_id = str(row.get('external_id')) if row.get('external_id') else None
+        if row_id and row_id in new_ids:
+            stats['overwritten'] += 1
+            continue
+        if not row_id and build_composite_key(row) in new_keys:
+            stats['overlap'] += 1
+            continue
+        final.append(row)
+        stats['legacy' if not row_id else 'preserved'] += 1
+    final.extend(deduped)
+    final.sort(key=lambda x: x['date'], reverse=True)
+    return final, stats, len(deduped)
+
+
+def reference_stats(existing, final, stats, added):
+    """The stats block the full-scan merge printed."""
+    return (
+        "\n📊 Hybrid Deduplication Stats:\n"
+        f"   - Existing Handled:   {len(existing)}\n"
+        f"   - Overwritten (ID):   {stats['overwritten']} (Old versions replaced by fresh API data)\n"
+        f"   - Preserved (Legacy): {stats['legacy']}\n"
+        f"   - Preserved (Modern): {stats['preserved']}\n"
+        f"   - Legacy Overlap:     {stats['overlap']} (Legacy rows removed via composite key)\n"
+        f"   - New Batch Added:    {added}\n"
+        f"   - Duplicate New IDs:  {stats['dup_ids']}\n"
+        f"   - Duplicate New Keys: {stats['dup_keys']}\n"
+        f"   - Final Total:        {len(final)}\n"
+    )
+
+
+def make_row(rnd, date, external_id):
+    return {
+        'date': date,
+        'task': rnd.choice(['[Friend] Social', '[Individual] Rest n Sleep', '[Husband] Marital/Wife #Husband']),
+        'hours': rnd.choice([0.5, 1.0, 7.25]),
+        'startedAt': rnd.choice(['', '9:05', '23:10']),
+        'endedAt': rnd.choice(['', '10:00']),
+        'notes': rnd.choice([None, 'braai', 'coffee']),
+        'notesClean': None,
+        'external_id': external_id,
+    }
+
+
+def make_case(seed):
+    rnd = random.Random(seed)
+    dates = sorted({f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}" for _ in range(25)})
+    existing = []
+    for i in range(300):
+        external_id = str(5000 + i) if rnd.random() < 0.6 else None
+        existing.append(make_row(rnd, rnd.choice(dates), external_id))
+    existing.sort(key=lambda x: x['date'], reverse=True)
+
+    new_records = []
+    window = dates[-6:]
+    for row in existing:
+        if row['date'] in window and rnd.random() < 0.5:
+            # Re-fetched legacy row (composite match) or re-fetched modern row (possibly edited)
+            fresh = dict(row, external_id=row['external_id'] or str(9000 + len(new_records)))
+            if rnd.random() < 0.3:
+                fresh['notes'] = 'edited'
+            new_records.append(fresh)
+    moved = next(r for r in existing if r['external_id'] and r['date'] not in window)
+    new_records.append(dict(moved, date=window[-1]))
+    for _ in range(20):
+        new_records.append(make_row(rnd, rnd.choice(window + ['2025-12-31']), str(rnd.randint(7000, 7010))))
+    for _ in range(5):
+        new_records.append(make_row(rnd, window[-1], None))
+    new_records.append(dict(new_records[0]))
+    rnd.shuffle(new_records)
+    return existing, new_records
+
+
+class TestDatabaseMerge(unittest.TestCase):
+    def run_merge(self, existing, frame, page_size=7):
+        """DatabaseMerge of `frame` in pages of `page_size`; returns the merge, result and printed stats."""
+        db = EntryDB(':memory:')
+        db.rebuild(existing, build_composite_key, 'run-1')
+        merge = DatabaseMerge(db)
+        for start in range(0, len(frame), page_size):
+            merge.add(frame.iloc[start:start + page_size])
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            final = merge.finish()
+        return merge, final, out.getvalue()
+
+    def test_parity_with_full_scan_merge(self):
+        for seed in range(10):
+            existing, new_records = make_case(seed)
+            # As transform_api_data hands rows over: missing values are None, not NaN
+            frame = pd.DataFrame(new_records).astype(object)
+            frame = frame.where(frame.notna(), None)
+            expected, stats, added = reference_merge(existing, frame.to_dict('records'))
+
+            merge, final, printed = self.run_merge(existing, frame)
+            self.assertEqual(final, expected, f"seed {seed}")
+            self.assertIn(f"Overwritten (ID):   {stats['overwritten']} ", printed)
+            self.assertIn(f"Preserved (Legacy): {stats['legacy']}\n", printed)
+            self.assertIn(f"Preserved (Modern): {stats['preserved']}\n", printed)
+            self.assertIn(f"Legacy Overlap:     {stats['overlap']} ", printed)
+            self.assertIn(f"New Batch Added:    {added}\n", printed)
+            self.assertIn(f"Duplicate New IDs:  {stats['dup_ids']}\n", printed)
+            self.assertIn(f"Duplicate New Keys: {stats['dup_keys']}\n", printed)
+
+            # The partition as it was before the run stays available; rollback restores it
+            self.assertEqual(merge.partition('2025'), existing)
+            merge.rollback()
+            self.assertEqual(merge.db.partition('2025'), existing)
+
+    def test_stats_cover_the_whole_store(self):
+        # Older years the batch never touches still count, as in the full-scan merge
+        existing, new_records = make_case(4)
+        rnd = random.Random(4)
+        older = [make_row(rnd, f"{year}-06-{day:02d}", str(year * 100 + day) if day % 3 else None)
+                 for year in (2023, 2024) for day in range(1, 29)]
+        existing = existing + sorted(older, key=lambda x: x['date'], reverse=True)
+        frame = pd.DataFrame(new_records).astype(object)
+        frame = frame.where(frame.notna(), None)
+        expected, stats, added = reference_merge(existing, frame.to_dict('records'))
+
+        _, _, printed = self.run_merge(existing, frame)
+        self.assertEqual(printed, reference_stats(existing, expected, stats, added))
+
+    def test_page_size_does_not_change_the_result(self):
+        existing, new_records = make_case(3)
+        frame = pd.DataFrame(new_records).astype(object)
+        frame = frame.where(frame.notna(), None)
+        _, single, single_printed = self.run_merge(existing, frame, page_size=len(frame))
+        _, paged, paged_printed = self.run_merge(existing, frame, page_size=1)
+        self.assertEqual(paged, single)
+        self.assertEqual(paged_printed, single_printed)
+
+    def test_empty_existing(self):
+        _, new_records = make_case(1)
+        frame = pd.DataFrame(new_records).astype(object)
+        _, final, _ = self.run_merge([], frame.where(frame.notna(), None))
+        self.assertEqual([r['date'] for r in final], sorted((r['date'] for r in final), reverse=True))
+
+if __name__ == '__main__':
+    unittest.main()
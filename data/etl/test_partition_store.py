@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from partition_store import entries_digest, load_manifest, load_partitions, write_partitions
+
+
+def entry(date, hours=1.0, external_id=None):
+    return {'date': date, 'hours': hours, 'external_id': external_id}
+
+
+class TestPartitionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        records = [entry('2025-01-02'), entry('2024-12-31'), entry('2024-06-01'), entry('2023-03-03')]
+        self.manifest, _ = write_partitions(self.dir, None, records, [], {'source': 'test'})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_manifest_summarises_partitions(self):
+        manifest = load_manifest(self.dir)
+        self.assertEqual([p['key'] for p in manifest['partitions']], ['2025', '2024', '2023'])
+        self.assertEqual(manifest['recordCount'], 4)
+        self.assertEqual(manifest['dateRange'], {'start': '2023-03-03', 'end': '2025-01-02'})
+        self.assertEqual(manifest['source'], 'test')
+        self.assertEqual(len(load_partitions(self.dir, manifest)), 4)
+        self.assertEqual(load_partitions(self.dir, manifest, ['2024']), [entry('2024-12-31'), entry('2024-06-01')])
+
+    def test_only_touched_partitions_are_rewritten(self):
+        (self.dir / 'index.json').write_text('{}')  # Merge index left by an earlier version
+        untouched = (self.dir / 'timeentries_2023.json').stat().st_mtime_ns
+        before = {p['key']: p['contentHash'] for p in self.manifest['partitions']}
+
+        manifest, written = write_partitions(
+            self.dir, self.manifest, [entry('2025-01-03'), entry('2025-01-02')], ['2025'], {}
+        )
+
+        self.assertEqual([p.name for p in written], ['timeentries_2025.json', 'manifest.json'])
+        self.assertEqual((self.dir / 'timeentries_2023.json').stat().st_mtime_ns, untouched)
+        after = {p['key']: p['contentHash'] for p in manifest['partitions']}
+        self.assertNotEqual(after['2025'], before['2025'])
+        self.assertEqual(after['2024'], before['2024'])
+        self.assertEqual(manifest['recordCount'], 5)
+        self.assertEqual(manifest['dateRange']['end'], '2025-01-03')
+        self.assertFalse((self.dir / 'index.json').exists())
+
+    def test_identical_rewrite_is_byte_identical(self):
+        path = self.dir / 'timeentries_2024.json'
+        original = path.read_bytes()
+        write_partitions(self.dir, self.manifest, [entry('2024-12-31'), entry('2024-06-01')], ['2024'], {})
+        self.assertEqual(path.read_bytes(), original)
+
+    def test_nan_tokens_in_old_files_load_as_none(self):
+        path = self.dir / 'timeentries_2023.json'
+        path.write_text('{"entries": [{"date": "2023-03-03", "hours": NaN, "notes": NaN}], "metadata": {}}')
+        self.assertEqual(load_partitions(self.dir, self.manifest, ['2023']),
+                         [{'date': '2023-03-03', 'hours': None, 'notes': None}])
+
+    def test_entries_digest_ignores_order_but_not_content(self):
+        records = [entry('2024-12-31', external_id='1'), entry('2024-12-31', external_id='2')]
+        stored = load_partitions(self.dir, self.manifest, ['2024']) + records
+        self.assertEqual(entries_digest(stored), entries_digest(list(reversed(stored))))
+        self.assertEqual(entries_digest([{'b': 1, 'a': None}]), entries_digest([{'a': None, 'b': 1}]))
+        self.assertNotEqual(entries_digest(stored), entries_digest(stored + [stored[0]]))
+        self.assertNotEqual(entries_digest(records), entries_digest([records[0], entry('2024-12-31', 1.5, '2')]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import contextlib
+import datetime
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import harvest_api_sync
+from harvest_api_sync import transform_api_data
+from harvest_to_json import PERSONA_COLUMNS, PERSONA_MAPPING, TASK_NORMALIZATION, mapping_hash
+from instrumentation import load_reports
+from partition_store import load_manifest, load_partitions
+from remap import remap_records
+from synthetic_harvest import generate_entries
+
+BLOGGING = '[Individual] Blogging'
+SPIRITUALITY = '[Individual] Spirituality'
+KNOWLEDGE = '[Individual] Knowledge-Base - Books/Video/Podcasts'
+
+
+def records_for(entries):
+    return transform_api_data(entries, verbose=False).to_dict('records')
+
+
+class TestRemapRecords(unittest.TestCase):
+    def test_only_rows_that_map_differently_change(self):
+        records = records_for(generate_entries(600))
+        originals = [dict(record) for record in records]
+        self.assertEqual(remap_records(records), 0)
+
+        with patch.dict(PERSONA_MAPPING, {SPIRITUALITY: 'P2 Individual'}):
+            changed = remap_records(records)
+            expected = records_for(generate_entries(600))
+
+        spiritual = [i for i, r in enumerate(originals) if r['normalisedTask'] == SPIRITUALITY]
+        self.assertGreater(len(spiritual), 0)
+        self.assertEqual(changed, len(spiritual))
+        self.assertEqual(records, expected)
+        for i, (before, after) in enumerate(zip(originals, records)):
+            if i not in spiritual:
+                self.assertEqual(before, after)
+
+    def test_hash_covers_every_table(self):
+        current = mapping_hash()
+        with patch.dict(TASK_NORMALIZATION, {BLOGGING: KNOWLEDGE}):
+            self.assertNotEqual(mapping_hash(), current)
+        self.assertEqual(mapping_hash(), current)
+
+
+class TestRemapMode(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.store = root / 'store'
+        self.reports = root / 'sync_runs.jsonl'
+        self.patches = [
+            patch.object(harvest_api_sync, 'STORE_DIR', self.store),
+            patch.object(harvest_api_sync, 'DB_FILE', root / 'entries.sqlite'),
+            patch.object(harvest_api_sync, 'OUTPUT_FILE', root / 'legacy.json'),
+            patch.object(harvest_api_sync, 'DASHBOARD_DATA_DIR', root / 'dashboard'),
+            patch.object(harvest_api_sync, 'ROLLUP_DIR', root / 'rollups'),
+            patch.object(harvest_api_sync, 'RUN_REPORT_FILE', self.reports),
+        ]
+        for p in self.patches:
+            p.start()
+
+        # Blogging (an alias of Me Time) only occurs in 2025
+        self.entries = generate_entries(30) + generate_entries(30, end_date=datetime.date(2025, 6, 30), start_id=1)
+        self.entries[-1] = dict(self.entries[-1], task={'name': BLOGGING})
+        with contextlib.redirect_stdout(io.StringIO()):
+            harvest_api_sync.save_data(records_for(self.entries), mapping=mapping_hash())
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def remap(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            harvest_api_sync.main(['--remap'])
+        return load_manifest(self.store), load_reports(self.reports)[-1]
+
+    def test_current_mappings_read_nothing(self):
+        before = {path.name: path.stat().st_mtime_ns for path in self.store.iterdir()}
+        with patch('harvest_api_sync.stale_partitions', side_effect=AssertionError('scanned')):
+            _, report = self.remap()
+        self.assertEqual(report['status'], 'no-changes')
+        self.assertEqual({path.name: path.stat().st_mtime_ns for path in self.store.iterdir()}, before)
+
+    def test_changed_mapping_rewrites_only_affected_partitions(self):
+        stored = {p['key']: p for p in load_manifest(self.store)['partitions']}
+        untouched = (self.store / stored['2026']['file']).stat().st_mtime_ns
+
+        with patch.dict(TASK_NORMALIZATION, {BLOGGING: KNOWLEDGE}):
+            manifest, report = self.remap()
+            self.assertEqual(manifest['mappingHash'], mapping_hash())
+            expected = records_for(self.entries)
+            self.assertEqual(self.remap()[1]['status'], 'no-changes')
+
+        self.assertEqual(report['status'], 'ok')
+        self.assertEqual(report['stages']['remap']['changed'], 1)
+        self.assertEqual(report['stages']['save']['partitions'], 1)
+        self.assertEqual((self.store / stored['2026']['file']).stat().st_mtime_ns, untouched)
+        self.assertNotEqual(manifest['partitions'][1]['contentHash'], stored['2025']['contentHash'])
+
+        entries = load_partitions(self.store, manifest)
+        self.assertEqual(entries, expected)
+        self.assertEqual(entries[-1]['prioritisedPersona'], 'P2 Individual')
+        self.assertEqual(entries[-1]['meTimeBreakdown'], 'Learning')
+        self.assertEqual({column for column in PERSONA_COLUMNS if column in entries[-1]}, set(PERSONA_COLUMNS))
+
+    def test_store_without_hash_is_scanned_once(self):
+        manifest = load_manifest(self.store)
+        with contextlib.redirect_stdout(io.StringIO()):
+            harvest_api_sync.save_data([], manifest, mapping='sha256:legacy')
+        manifest, report = self.remap()
+        self.assertEqual(report['status'], 'no-changes')
+        self.assertEqual(report['stages']['scan']['rows'], 60)
+        self.assertEqual(manifest['mappingHash'], mapping_hash())
+
+
+if __name__ == '__main__':
+    unittest.main()
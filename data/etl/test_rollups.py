@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+
+from partition_store import write_partitions
+from rollups import build_rollups, load_manifest, source_hash, write_rollups
+
+
+def entry(date, persona, tier2, hours, meta='Life'):
+    return {
+        'date': date, 'year': int(date[:4]), 'month': int(date[5:7]), 'hours': hours,
+        'prioritisedPersona': persona, 'metaWorkLife': meta, 'personaTier2': tier2,
+    }
+
+
+ENTRIES = [
+    entry('2025-01-01', 'P3 Professional', 'Work', 8.0, 'Work'),
+    entry('2025-01-01', 'P0 Life Constraints (Sleep)', 'Sleep', 7.5),
+    entry('2024-12-30', 'P0 Life Constraints (Sleep)', 'Sleep', 6.25),  # ISO week 2025-W01
+    entry('2024-12-29', 'P2 Individual', 'Health', 1.0),
+    entry('2024-06-15', 'P3 Professional', 'Work', 2.5, 'Work'),
+]
+
+
+def reference(entries, key):
+    """Plain Python grouping, the way the dashboard does it."""
+    totals = defaultdict(lambda: [0.0, 0])
+    for e in entries:
+        bucket = totals[(key(e), e['prioritisedPersona'])]
+        bucket[0] += e['hours']
+        bucket[1] += 1
+    return totals
+
+
+class TestRollups(unittest.TestCase):
+    def setUp(self):
+        self.cubes = build_rollups(pd.DataFrame(ENTRIES))
+
+    def assert_matches(self, grain, key):
+        cube = self.cubes[grain]
+        expected = reference(ENTRIES, key)
+        for persona, series in cube['dimensions']['prioritisedPersona'].items():
+            for i, period in enumerate(cube['periods']):
+                hours, count = expected.get((period, persona), (0.0, 0))
+                self.assertAlmostEqual(series['hours'][i], hours)
+                self.assertEqual(series['entries'][i], count)
+
+    def test_grains_match_plain_grouping(self):
+        self.assert_matches('day', lambda e: e['date'])
+        self.assert_matches('month', lambda e: e['date'][:7])
+        self.assert_matches('year', lambda e: e['date'][:4])
+        self.assert_matches('week', lambda e: '%d-W%02d' % pd.Timestamp(e['date']).isocalendar()[:2])
+
+    def test_iso_weeks_and_totals(self):
+        week = self.cubes['week']
+        self.assertEqual(week['periods'], ['2024-W24', '2024-W52', '2025-W01'])
+        self.assertEqual(week['weekStart'], ['2024-06-10', '2024-12-23', '2024-12-30'])
+        self.assertEqual(week['total']['hours'], [2.5, 1.0, 21.75])
+        self.assertEqual(self.cubes['year']['dimensions']['metaWorkLife']['Work']['hours'], [2.5, 8.0])
+        self.assertEqual(sorted(self.cubes['month']['dimensions']['personaTier2']), ['Health', 'Sleep', 'Work'])
+
+    def test_write_rollups_from_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store, out = Path(tmp) / 'store', Path(tmp) / 'rollups'
+            write_partitions(store, None, ENTRIES, [], {'source': 'test'})
+            paths = write_rollups(store, out, mirror_dir=Path(tmp) / 'public')
+            self.assertEqual([p.name for p in paths],
+                             ['rollup_day.json', 'rollup_week.json', 'rollup_month.json', 'rollup_year.json'])
+            self.assertTrue((Path(tmp) / 'public' / 'rollup_year.json').exists())
+
+            first = paths[0].read_bytes()
+            write_rollups(store, out)
+            self.assertEqual(paths[0].read_bytes(), first)
+            self.assertIn(source_hash(load_manifest(store)).encode(), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import datetime
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import openpyxl
+import pandas as pd
+
+import seed_cache
+from seed_cache import cache_path, cache_status, read_excel_streaming, read_seed_excel
+
+
+def write_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+ROWS = [
+    ['Date', 'Task', 'Notes', 'Hours', 'Started At', 'Billable Rate'],
+    [datetime.datetime(2022, 7, 31), '[Individual] Rest n Sleep', None, 7.5, datetime.time(22, 0), 0.0],
+    [datetime.datetime(2022, 7, 30), '[Husband] Marital/Wife #Husband', 'dinner', 2.0, None, 0.0],
+    [datetime.datetime(2022, 7, 29), '[Friend] Social', 'N/A', 1.25, datetime.time(18, 30), 0.0],
+]
+
+
+class TestSeedCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.xlsx = self.dir / 'seed.xlsx'
+        self.cache = self.dir / 'cache'
+        write_workbook(self.xlsx, ROWS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_streaming_reader_matches_read_excel(self):
+        pd.testing.assert_frame_equal(read_excel_streaming(self.xlsx), pd.read_excel(self.xlsx))
+
+    def test_second_read_is_served_from_cache(self):
+        cold = read_seed_excel(self.xlsx, cache_dir=self.cache)
+        self.assertTrue(cache_path(self.xlsx, cache_dir=self.cache).exists())
+        self.assertEqual(cache_status(self.xlsx, cache_dir=self.cache), 'hit')
+
+        with patch.object(seed_cache, 'read_excel_streaming', side_effect=AssertionError('cache missed')):
+            warm = read_seed_excel(self.xlsx, cache_dir=self.cache)
+        pd.testing.assert_frame_equal(warm, cold)
+        pd.testing.assert_frame_equal(warm, pd.read_excel(self.xlsx))
+
+    def test_touched_file_is_restamped_and_changed_file_reparsed(self):
+        read_seed_excel(self.xlsx, cache_dir=self.cache)
+        stat = self.xlsx.stat()
+        os.utime(self.xlsx, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(cache_status(self.xlsx, cache_dir=self.cache), 'stale-stamp')
+        with patch.object(seed_cache, 'read_excel_streaming', side_effect=AssertionError('cache missed')):
+            read_seed_excel(self.xlsx, cache_dir=self.cache)
+        self.assertEqual(cache_status(self.xlsx, cache_dir=self.cache), 'hit')
+
+        write_workbook(self.xlsx, ROWS + [[datetime.datetime(2022, 7, 28), '[Friend] Social', None, 3.0, None, 0.0]])
+        self.assertEqual(cache_status(self.xlsx, cache_dir=self.cache), 'miss')
+        self.assertEqual(len(read_seed_excel(self.xlsx, cache_dir=self.cache)), 4)
+        self.assertEqual(len(read_seed_excel(self.xlsx, cache_dir=self.cache)), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
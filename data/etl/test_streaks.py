@@ -0,0 +1,102 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from harvest_api_sync import transform_api_data
+from partition_store import load_manifest, write_partitions
+from rollups import source_hash
+from streaks import STREAKS_FILE, write_streaks
+from synthetic_harvest import SLEEP, WORK, generate_entries
+
+
+def entry(entry_id, day, task, hours=1.0, ended=''):
+    return {'id': entry_id, 'spent_date': day, 'hours': hours, 'notes': None,
+            'started_time': '', 'ended_time': ended, 'task': {'name': task}}
+
+
+def records_for(entries):
+    records = transform_api_data(entries, verbose=False).to_dict('records')
+    records.sort(key=lambda r: r['date'], reverse=True)
+    return records
+
+
+class TestStreaks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.store = self.root / 'store'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, out='rollups', **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            path = write_streaks(self.store, self.root / out, **kwargs)
+        with open(path) as f:
+            return json.load(f)
+
+    def test_runs_histogram_longest_and_current(self):
+        days = ['2025-01-01', '2025-01-02', '2025-01-03', '2025-01-05', '2025-01-07', '2025-01-08', '2025-01-09']
+        entries = [entry(i, day, WORK) for i, day in enumerate(days)]
+        entries.append(entry(99, '2025-01-04', WORK, hours=0))  # Zero hours: not active
+        entries.append(entry(100, '2025-01-10', SLEEP))
+        write_partitions(self.store, None, records_for(entries), [], {})
+
+        work = self.write()['dimensions']['prioritisedPersona']['P3 Professional']
+        self.assertEqual(work['runs'], {'start': ['2025-01-01', '2025-01-05', '2025-01-07'], 'length': [3, 1, 3]})
+        self.assertEqual(work['histogram'], {'lengths': [1, 3], 'counts': [1, 2]})
+        self.assertEqual(work['longest'], {'length': 3, 'start': '2025-01-07', 'end': '2025-01-09'})
+        # Last logged day is the 10th: a run ending the day before is still current
+        self.assertEqual(work['current'], {'length': 3, 'start': '2025-01-07', 'end': '2025-01-09'})
+
+    def test_workload_runs(self):
+        entries = [
+            entry(1, '2025-01-01', WORK, 6, '13:00'), entry(2, '2025-01-01', WORK, 5, '21:15'),
+            entry(3, '2025-01-02', WORK, 10, '18:00'),
+            entry(4, '2025-01-03', WORK, 4, '22:00'),
+            entry(5, '2025-01-04', SLEEP, 12, '23:00'),  # Not work
+            entry(6, '2025-01-05', WORK, 12, '9:30pm'),
+        ]
+        write_partitions(self.store, None, records_for(entries), [], {})
+
+        workload = self.write()['workload']
+        self.assertEqual(workload['persona'], 'P3 Professional')
+        self.assertEqual(workload['highWorkload'], {'start': ['2025-01-01', '2025-01-05'], 'length': [2, 1]})
+        self.assertEqual(workload['lateEnd'], {'start': ['2025-01-01', '2025-01-03', '2025-01-05'], 'length': [1, 1, 1]})
+
+    def test_window_update_matches_full_rebuild(self):
+        records = records_for(generate_entries(600))  # 60 days up to 2026-10-16
+        manifest, _ = write_partitions(self.store, None, records, [], {})
+        self.write()
+
+        # Split the sleep run, drop a whole day and log work on two more days
+        lo, hi = '2026-09-20', '2026-09-27'
+        changed = [r for r in records if not (r['date'] == '2026-09-23' and r['prioritisedPersona'] == 'P0 Life Constraints (Sleep)')]
+        changed = [r for r in changed if r['date'] != '2026-09-25']
+        changed += records_for([entry(1, '2026-09-20', WORK), entry(2, '2026-09-27', WORK),
+                                entry(3, '2026-09-21', WORK, 10, '21:00'), entry(4, '2026-09-22', WORK, 10, '22:30')])
+        changed.sort(key=lambda r: r['date'], reverse=True)
+        write_partitions(self.store, manifest, changed, ['2026'], {})
+
+        updated = self.write(window=(lo, hi), previous_hash=source_hash(manifest))
+        self.assertEqual(updated, self.write(out='full'))
+        self.assertIn('2026-09-21', updated['workload']['highWorkload']['start'])
+        sleep = updated['dimensions']['prioritisedPersona']['P0 Life Constraints (Sleep)']
+        # 08-18..09-22, 09-24, 09-26..10-16
+        self.assertEqual(sleep['histogram'], {'lengths': [1, 21, 36], 'counts': [1, 1, 1]})
+
+    def test_previous_file_of_another_store_is_rebuilt(self):
+        manifest, _ = write_partitions(self.store, None, records_for(generate_entries(100)), [], {})
+        first = self.write()
+        with open(self.root / 'rollups' / STREAKS_FILE, 'w') as f:
+            json.dump({**first, 'dimensions': {}}, f)  # Tampered / stale
+        rebuilt = self.write(window=('2026-10-16', '2026-10-16'), previous_hash='sha256:other')
+        self.assertEqual(rebuilt, first)
+        self.assertEqual(rebuilt['sourceHash'], source_hash(load_manifest(self.store)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+import contextlib
+import datetime
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+import harvest_to_json
+from harvest_to_json import (
+    apply_transformations,
+    apply_calendar,
+    build_calendar,
+    CALENDAR_COLUMNS,
+    transform_frame,
+    KeywordMatcher,
+    SOCIAL_ENTITY_KEYWORDS,
+    normalise_task,
+    get_prioritised_persona,
+    get_meta_work_life,
+    get_persona_tier2,
+    get_tx_day,
+    get_type_of_day,
+    get_week_num,
+    get_social_context,
+    get_social_entity,
+    get_me_time_breakdown,
+    get_commute_context,
+    clean_notes,
+    MONTH_NAMES,
+)
+from synthetic_harvest import generate_entries, xlsx_frame
+
+
+def build_frame():
+    """Raw rows covering every mapping branch and the awkward notes values."""
+    rows = [
+        ('2016-01-03', 'zz [Community Member] Community NBHW Patrols', 'Patrol with Nofal and Hamza'),
+        ('2016-01-04', '[Friend] Social', 'Coffee with hamza, then nofal'),
+        ('2020-12-31', '[Friend] Social', 'Mentoring session with Asanda'),
+        ('2021-01-01', '[Friend] Social', 'NETWORKING event (Rayner)'),
+        ('2021-01-02', '[Friend] Social', ''),
+        ('2021-01-03', '[Friend] Social', None),
+        ('2021-01-04', '[Friend] Social', 'dinner at home'),
+        ('2022-06-15', '[Professional] Service Provider - Work/Job', 'Commute to office'),
+        ('2022-06-16', '[Consultant] New Client Engagements', 'Client meeting'),
+        ('2022-06-17', '[Professional] Service Provider - Work/Job', None),
+        ('2023-03-01', '[Individual] Blogging', 'Wrote a post'),
+        ('2023-03-02', '[Individual] Rest n Sleep', None),
+        ('2023-03-03', '[Individual] Health & Fitness - Cycling n Running', 'Ride'),
+        ('2024-02-29', '[Husband] Marital/Wife #Husband', 'Date night'),
+        ('2024-12-30', 'Unknown Task', 'mentor'),
+        ('2025-01-05', '[Father] Relationship with SK', 'Park'),
+    ]
+    return pd.DataFrame(rows, columns=['Date', 'Task', 'Notes'])
+
+
+def row_wise(df):
+    """The original per-row derivation, used as the parity reference."""
+    out = pd.DataFrame(index=df.index)
+    date = pd.to_datetime(df['Date'])
+    out['monthName'] = date.dt.month.apply(lambda m: MONTH_NAMES[m - 1])
+    out['weekNum'] = date.apply(get_week_num)
+    out['dayOfWeek'] = date.apply(get_tx_day)
+    out['typeOfDay'] = out['dayOfWeek'].apply(get_type_of_day)
+    out['normalisedTask'] = df['Task'].apply(normalise_task)
+    out['prioritisedPersona'] = out['normalisedTask'].apply(get_prioritised_persona)
+    out['metaWorkLife'] = out['prioritisedPersona'].apply(get_meta_work_life)
+    out['personaTier2'] = out['normalisedTask'].apply(get_persona_tier2)
+    pairs = list(zip(out['personaTier2'], df['Notes'], out['normalisedTask']))
+    out['socialContext'] = [get_social_context(t, n) for t, n, _ in pairs]
+    out['socialEntity'] = [get_social_entity(t, n) for t, n, _ in pairs]
+    out['meTimeBreakdown'] = [get_me_time_breakdown(t, task) for t, _, task in pairs]
+    out['commuteContext'] = [get_commute_context(t, n) for t, n, _ in pairs]
+    out['notesClean'] = df['Notes'].apply(clean_notes)
+    return out
+
+
+class TestApplyTransformations(unittest.TestCase):
+    def test_parity_with_row_wise_functions(self):
+        raw = build_frame()
+        expected = row_wise(raw)
+        actual = apply_transformations(raw.copy())
+
+        for column in expected.columns:
+            for i, (want, got) in enumerate(zip(expected[column], actual[column])):
+                if pd.isna(want):
+                    self.assertTrue(pd.isna(got), f"{column}[{i}]: expected null, got {got!r}")
+                else:
+                    self.assertEqual(want, got, f"{column}[{i}]")
+
+    def test_first_keyword_wins(self):
+        df = apply_transformations(build_frame())
+        # 'nofal' precedes 'hamza' in SOCIAL_ENTITY_KEYWORDS regardless of note order
+        self.assertEqual(df['socialEntity'][1], 'Joburg Friends')
+        self.assertEqual(df['socialEntity'][2], 'Asanda')
+        self.assertEqual(df['socialContext'][3], 'Professional-Networking')
+
+    def test_non_social_rows_are_null(self):
+        df = apply_transformations(build_frame())
+        self.assertIsNone(df['socialEntity'][7])
+        self.assertIsNone(df['commuteContext'][0])
+        self.assertEqual(df['commuteContext'][7], 'commuting')
+        self.assertEqual(df['commuteContext'][9], 'working')
+
+
+class TestCalendar(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(harvest_to_json, '_calendar', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_calendar_matches_row_wise_functions(self):
+        calendar = build_calendar('2020-12-20', '2021-01-10')  # ISO week 53 into week 1
+        for day, row in calendar.iterrows():
+            self.assertEqual(row['weekNum'], get_week_num(day))
+            self.assertEqual(row['dayOfWeek'], get_tx_day(day))
+            self.assertEqual(row['typeOfDay'], get_type_of_day(get_tx_day(day)))
+            self.assertEqual(row['monthName'], MONTH_NAMES[day.month - 1])
+            self.assertEqual(row['isoDate'], day.strftime('%Y-%m-%d'))
+
+    def test_join_keeps_timestamps_and_reuses_the_calendar(self):
+        df = apply_calendar(pd.DataFrame({'Date': [pd.Timestamp('2021-01-03 08:30'), pd.Timestamp('2021-01-04'), pd.Timestamp('2021-01-03')]}))
+        self.assertEqual(df['date'][0], pd.Timestamp('2021-01-03 08:30'))
+        self.assertEqual(list(df['isoDate']), ['2021-01-03', '2021-01-04', '2021-01-03'])
+        self.assertEqual(list(df['weekNum']), [53, 1, 53])
+
+        calendar = harvest_to_json._calendar
+        apply_calendar(pd.DataFrame({'Date': ['2021-01-04']}))
+        self.assertIs(harvest_to_json._calendar, calendar)  # Covered: not rebuilt
+
+        df = apply_calendar(pd.DataFrame({'Date': ['2016-01-03', '2021-01-04']}))
+        self.assertEqual(list(df['dayOfWeek']), ['_07 Sunday', '_01 Monday'])
+        self.assertEqual(harvest_to_json._calendar.index[0], pd.Timestamp('2016-01-03'))
+        self.assertEqual(harvest_to_json._calendar.index[-1], pd.Timestamp('2021-01-04'))
+
+    def test_missing_dates_get_missing_fields(self):
+        df = apply_calendar(pd.DataFrame({'Date': [pd.Timestamp('2021-01-04'), pd.NaT]}))
+        self.assertEqual(df['isoDate'][0], '2021-01-04')
+        for column in CALENDAR_COLUMNS:
+            self.assertTrue(pd.isna(df[column][1]), column)  # Not the last calendar day's values
+        self.assertTrue(apply_calendar(pd.DataFrame({'Date': [pd.NaT]}))[CALENDAR_COLUMNS].isna().all(axis=None))
+
+
+class TestParallelTransform(unittest.TestCase):
+    def test_matches_serial_transform(self):
+        raw = build_frame().sample(frac=1, random_state=7)  # Years interleaved, unsorted index
+        serial = apply_transformations(raw.copy())
+        pd.testing.assert_frame_equal(transform_frame(raw.copy(), workers=3), serial)
+
+    def test_undated_rows_match_serial_transform(self):
+        raw = build_frame()
+        raw.loc[raw.index[[3, 8]], 'Date'] = None
+        serial = apply_transformations(raw.copy())
+        pd.testing.assert_frame_equal(transform_frame(raw.copy(), workers=3), serial)
+
+    def test_conversion_output_is_identical_to_serial_run(self):
+        entries = []
+        for offset, end in enumerate([datetime.date(2025, 3, 1), datetime.date(2024, 7, 1), datetime.date(2023, 3, 1)]):
+            entries += generate_entries(200, end_date=end, seed=offset, start_id=offset * 1000)
+        frame = xlsx_frame(entries)
+
+        runs = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for workers in (1, 2):
+                out = Path(tmp) / str(workers)
+                stdout = io.StringIO()
+                with patch.object(harvest_to_json, 'read_seed_excel', lambda path: frame.copy()), \
+                        patch.object(harvest_to_json, 'STORE_DIR', out / 'store'), \
+                        patch.object(harvest_to_json, 'ROLLUP_DIR', out / 'rollups'), \
+                        contextlib.redirect_stdout(stdout):
+                    harvest_to_json.convert_harvest_to_json(workers=workers)
+                partitions = {path.name: path.read_bytes() for path in (out / 'store').glob('timeentries_*.json')}
+                runs[workers] = (stdout.getvalue().split('=== Summary by Persona ===')[1], partitions)
+
+        self.assertEqual(runs[2], runs[1])
+        self.assertIn('=== Summary by MetaWorkLife ===', runs[2][0])
+        self.assertEqual(len(runs[2][1]), 3 * 2)  # JSON + compact file per year
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_priority_not_position_decides(self):
+        matcher = KeywordMatcher([('nofal', 'Joburg Friends'), ('hamza', 'Uni Friends')])
+        self.assertEqual(matcher.match('hamza met nofal'), 'Joburg Friends')
+        self.assertEqual(matcher.match('just hamza'), 'Uni Friends')
+        self.assertIsNone(matcher.match('nobody'))
+
+    def test_overlapping_keywords(self):
+        # 'leon' starts inside 'napoleon'; 'mentoring' and 'mentor' share a start
+        matcher = KeywordMatcher([('mentor', 'A'), ('napoleon', 'B'), ('leon', 'C')])
+        self.assertEqual(matcher.match('napoleon mentoring'), 'A')
+        self.assertEqual(matcher.match('napoleon'), 'B')
+
+    def test_classify_matches_linear_scan(self):
+        matcher = KeywordMatcher(SOCIAL_ENTITY_KEYWORDS)
+        notes = pd.Series(
+            ['lunch with justin and asanda', 'uncle ab braai', 'iby.', 'none here', 'wayne & rayner'],
+            index=[10, 11, 12, 13, 14],
+        )
+        expected = [
+            next((entity for keyword, entity in SOCIAL_ENTITY_KEYWORDS if keyword in note), None)
+            for note in notes
+        ]
+        self.assertEqual(list(matcher.classify(notes)), expected)
+        self.assertEqual(list(matcher.classify(notes).index), [10, 11, 12, 13, 14])
+
+
+if __name__ == '__main__':
+    unittest.main()